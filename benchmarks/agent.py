@@ -0,0 +1,53 @@
+from benchmarks.pool import percentiles
+from homelink_python.agent import HomeLinkAgent, forwardToAgent
+from homelink_python.cli import CLI_PASSWORD, HomeLinkConfig, runDirect
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+import argparse
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-invocation CLI latency: direct session vs resident agent")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer()
+        server.start()
+        keyProvider = SharedKeyProvider()
+        keyProvider.getKeypair()
+
+        config = HomeLinkConfig()
+        config.hostId = "bench"
+        config.serverAddress = "127.0.0.1"
+        config.serverPort = str(server.port)
+
+        # runDirect() loads the persistent key itself, just like a fresh CLI process.
+        os.environ["HOMELINK_AGENT_SOCKET"] = os.path.join(home, "agent.sock")
+        direct = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            runDirect(config, "bench", [])
+            direct.append(time.perf_counter() - start)
+
+        agent = HomeLinkAgent(config, CLI_PASSWORD, keyProvider=keyProvider)
+        agent.start()
+        forwardToAgent("bench", [])
+        forwarded = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            forwardToAgent("bench", [])
+            forwarded.append(time.perf_counter() - start)
+
+        agent.stop()
+        server.stop()
+
+    print(f"direct {percentiles(direct)}")
+    print(f"agent  {percentiles(forwarded)}")
+
+if __name__ == "__main__":
+    main()
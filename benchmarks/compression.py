@@ -0,0 +1,79 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.compression import availableCodecs
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+LINK_SPEEDS_MBIT = (10, 100, 1000)
+
+def makePayloads(sizeMb: int) -> dict:
+    size = sizeMb << 20
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        line = json.dumps({"ts": 1700000000 + i, "level": "info", "path": f"/api/items/{i % 977}", "status": 200, "ms": i % 113}) + "\n"
+        lines.append(line)
+        total += len(line)
+        i += 1
+
+    return {"json": "".join(lines).encode("UTF-8")[:size], "random": os.urandom(size)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed vs raw file upload against a local mock server")
+    parser.add_argument("--size-mb", type=int, default=16)
+    parser.add_argument("--codecs", nargs="+", default=None, help="Codecs to try (default: every installed codec)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer(directory=os.path.join(home, "server"))
+        server.start()
+        keyProvider = SharedKeyProvider()
+
+        codecs = [None] + (args.codecs or list(availableCodecs()))
+
+        print(f"{'payload':<8} {'codec':<6} {'ratio':>6} {'cpu s/MB':>9} {'loopback':>9}  " + "  ".join(f"{speed:>5} Mbit/s" for speed in LINK_SPEEDS_MBIT))
+        for name, data in makePayloads(args.size_mb).items():
+            localPath = os.path.join(home, name)
+            with open(localPath, "wb") as localFile:
+                localFile.write(data)
+
+            for codec in codecs:
+                client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider, compression=codec and [codec])
+                client.connect()
+                client.login("password")
+
+                recorder = metrics.enableMetrics()
+                start = time.perf_counter()
+                client.writeFile("bench", "bench", localPath, "copy")
+                elapsed = time.perf_counter() - start
+                metrics.disableMetrics()
+                client.logout()
+                client.destruct()
+
+                labels = (("codec", codec),)
+                bytesIn = recorder.counter("compression_bytes_in_total", labels) or len(data)
+                bytesOut = recorder.counter("compression_bytes_out_total", labels) or len(data)
+                histogram = recorder.histogram("compression_seconds", labels)
+                cpuSeconds = histogram.sum if histogram else 0.0
+
+                # On a link slower than the sender, the transfer takes as
+                # long as the wire bytes or the compression CPU, whichever
+                # is larger, since the two run on different threads.
+                projected = [max(bytesOut * 8 / (speed * 1e6), cpuSeconds) for speed in LINK_SPEEDS_MBIT]
+                print(
+                    f"{name:<8} {codec or 'none':<6} {bytesIn / bytesOut:6.2f} {cpuSeconds / args.size_mb:9.4f} {elapsed:8.2f}s  "
+                    + "  ".join(f"{seconds:10.2f}s" for seconds in projected)
+                )
+
+        server.stop()
+
+if __name__ == "__main__":
+    main()
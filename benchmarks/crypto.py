@@ -0,0 +1,42 @@
+from homelink_python.security import *
+
+import timeit
+
+def compare(name: str, freeFunction, contextMethod, number: int):
+    freeTime = min(timeit.repeat(freeFunction, number=number, repeat=5)) / number
+    contextTime = min(timeit.repeat(contextMethod, number=number, repeat=5)) / number
+    print(f"{name:<22} free {freeTime * 1e6:9.1f} us   context {contextTime * 1e6:9.1f} us   x{freeTime / contextTime:.2f}")
+
+def main():
+    keypair = generateRSAKeys()
+    serverPublicKey = getRSAPublicKey(keypair)
+    aesKey = randomBytes(32)
+    sessionKey = randomBytes(16).hex()
+    context = CryptoContext(serverPublicKey, aesKey, sessionKey, keypair)
+
+    passwordData = randomBytes(192)
+    encryptedPasswordData = rsaEncrypt(passwordData, serverPublicKey)
+    commandData = randomBytes(224)
+    iv = randomBytes(16)
+    blocks = [randomBytes(8192) for _ in range(64)]
+    encryptedBlocks = context.aesEncryptBatch(blocks)
+
+    compare("rsaEncrypt", lambda: rsaEncrypt(passwordData, serverPublicKey), lambda: context.rsaEncrypt(passwordData), 200)
+    compare("rsaDecrypt", lambda: rsaDecrypt(encryptedPasswordData, keypair), lambda: context.rsaDecrypt(encryptedPasswordData), 50)
+    compare("encryptSessionKey", lambda: encryptSessionKey(sessionKey, aesKey), context.encryptSessionKey, 5000)
+    compare("aesEncrypt (224 B)", lambda: aesEncrypt(commandData, aesKey, iv), lambda: context.aesEncrypt(commandData, iv), 5000)
+    compare(
+        "aesEncrypt x64 (8 KB)",
+        lambda: [aesEncrypt(block, aesKey, randomBytes(16)) for block in blocks],
+        lambda: context.aesEncryptBatch(blocks),
+        20,
+    )
+    compare(
+        "aesDecrypt x64 (8 KB)",
+        lambda: [aesDecrypt(data, aesKey, iv, tag) for data, iv, tag in encryptedBlocks],
+        lambda: context.aesDecryptBatch(encryptedBlocks),
+        20,
+    )
+
+if __name__ == "__main__":
+    main()
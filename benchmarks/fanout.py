@@ -0,0 +1,44 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+import argparse
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribute one file to many services against a local mock server")
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--destinations", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer(directory=os.path.join(home, "server"))
+        server.start()
+        client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, SharedKeyProvider())
+        client.connect()
+        client.login("password")
+
+        localPath = os.path.join(home, "bundle")
+        with open(localPath, "wb") as localFile:
+            localFile.write(os.urandom(args.size_mb << 20))
+        destinations = [("bench", f"service{i}") for i in range(args.destinations)]
+
+        start = time.perf_counter()
+        status = all(client.writeFile(hostId, serviceId, localPath, "bundle") for hostId, serviceId in destinations)
+        elapsed = time.perf_counter() - start
+        print(f"writeFile loop       {elapsed:7.2f}s   {args.size_mb * args.destinations / elapsed:7.1f} MB/s delivered   status={status}")
+
+        start = time.perf_counter()
+        results = client.writeFileToMany(destinations, localPath, "bundle")
+        elapsed = time.perf_counter() - start
+        print(f"writeFileToMany      {elapsed:7.2f}s   {args.size_mb * args.destinations / elapsed:7.1f} MB/s delivered   status={all(results.values())}")
+
+        client.logout()
+        client.destruct()
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import processKeyProvider
+
+import argparse
+import gc
+import multiprocessing
+import os
+import tracemalloc
+
+def serve(portQueue, stopEvent):
+    from homelink_python.mockserver import MockHomeLinkServer
+
+    server = MockHomeLinkServer(services={("bench", "bench"): "password"})
+    server.start()
+    portQueue.put(server.port)
+    stopEvent.wait()
+    server.stop()
+
+def openFiles() -> int:
+    return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else -1
+
+def login(port: int, keyProvider) -> HomeLinkClient:
+    client = HomeLinkClient("bench", "bench", "127.0.0.1", port, keyProvider)
+    client.connect()
+    client.login("password")
+    return client
+
+def measure(port: int, sessions: int, keyProvider, suspend: bool = False) -> tuple[float, int]:
+    # The server runs in another process, so everything traced here belongs
+    # to the idle client sessions; a first session outside the trace loads
+    # the modules and fills the shared key caches.
+    login(port, keyProvider).destruct()
+    gc.collect()
+    filesBefore = openFiles()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    clients = []
+    for _ in range(sessions):
+        client = login(port, keyProvider)
+        if suspend:
+            client.suspend()
+        clients.append(client)
+
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    files = openFiles() - filesBefore
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    for client in clients:
+        client.destruct()
+
+    return total / sessions, files
+
+def main():
+    parser = argparse.ArgumentParser(description="Traced memory and descriptors per idle logged-in HomeLinkClient")
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    portQueue = context.Queue()
+    stopEvent = context.Event()
+    serverProcess = context.Process(target=serve, args=(portQueue, stopEvent), daemon=True)
+    serverProcess.start()
+    port = portQueue.get()
+
+    try:
+        keyProvider = processKeyProvider()
+        keyProvider.getKeypair()
+        for name, suspend in (("connected", False), ("suspended", True)):
+            perSession, files = measure(port, args.sessions, keyProvider, suspend)
+            print(f"{name:<10} {perSession / 1024:8.2f} KiB/session  {files} descriptors for {args.sessions} sessions")
+    finally:
+        stopEvent.set()
+        serverProcess.join()
+
+if __name__ == "__main__":
+    main()
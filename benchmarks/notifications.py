@@ -0,0 +1,45 @@
+from homelink_python.notifications import NotificationDispatcher
+from homelink_python.packet import AsyncEventType
+
+import argparse
+import time
+
+def inline(events: int, handlerSeconds: float) -> tuple[float, int]:
+    calls = 0
+    start = time.perf_counter()
+    for _ in range(events):
+        time.sleep(handlerSeconds)
+        calls += 1
+    return time.perf_counter() - start, calls
+
+def dispatched(events: int, tags: int, handlerSeconds: float, window: float) -> tuple[float, float, int, int]:
+    dispatcher = NotificationDispatcher(coalesceWindow=window)
+    dispatcher.subscribe(AsyncEventType.FILE_EVENT, lambda notification: time.sleep(handlerSeconds))
+
+    start = time.perf_counter()
+    for i in range(events):
+        dispatcher.dispatch(AsyncEventType.FILE_EVENT, i % tags, i)
+    readerSeconds = time.perf_counter() - start
+    dispatcher.drain()
+    elapsed = time.perf_counter() - start
+    dispatcher.close()
+
+    return readerSeconds, elapsed, dispatcher.dispatched, dispatcher.dropped
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification burst delivery: inline callbacks vs the dispatcher")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--handler-ms", type=float, default=1.0)
+    parser.add_argument("--window-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    handlerSeconds = args.handler_ms / 1000
+    elapsed, calls = inline(args.events, handlerSeconds)
+    print(f"inline      reader blocked {elapsed:8.3f} s  total {elapsed:8.3f} s  handler calls {calls}")
+
+    readerSeconds, elapsed, calls, dropped = dispatched(args.events, args.tags, handlerSeconds, args.window_ms / 1000)
+    print(f"dispatcher  reader blocked {readerSeconds:8.3f} s  total {elapsed:8.3f} s  handler calls {calls}  dropped {dropped}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from homelink_python.packet import *
+
+import timeit
+
+def measure(name: str, function, number: int = 100000):
+    elapsed = min(timeit.repeat(function, number=number, repeat=5)) / number
+    print(f"{name:<32} {elapsed * 1e9:8.0f} ns")
+
+def main():
+    commandPacket = CommandPacket(1, bytes(80), bytes(256))
+    commandData = CommandPacket.serialize(commandPacket)
+    asyncNotificationPacket = AsyncNotificationPacket(AsyncEventType.FILE_EVENT, 1)
+    asyncNotificationData = AsyncNotificationPacket.serialize(asyncNotificationPacket)
+
+    measure("CommandPacket.serialize", lambda: CommandPacket.serialize(commandPacket))
+    measure("CommandPacket.deserialize", lambda: CommandPacket.deserialize(commandData))
+    measure("AsyncNotificationPacket.serialize", lambda: AsyncNotificationPacket.serialize(asyncNotificationPacket))
+    measure("AsyncNotificationPacket.deserialize", lambda: AsyncNotificationPacket.deserialize(asyncNotificationData))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from homelink_python.security import randomBytes
+from homelink_python.transfer import recvFile, sendFile
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+def transfer(localPath: str, directory: str, aesKey: bytes, workers: int) -> float:
+    sender, receiver = socket.socketpair()
+    sendThread = threading.Thread(target=sendFile, args=(sender, localPath, "out", aesKey, None, workers))
+    start = time.perf_counter()
+    sendThread.start()
+    recvFile(receiver, directory, aesKey, False, workers)
+    elapsed = time.perf_counter() - start
+    sendThread.join()
+    sender.close()
+    receiver.close()
+
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end sendFile/recvFile throughput by crypto worker count")
+    parser.add_argument("--size-mb", type=int, default=128)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    aesKey = bytes(randomBytes(32))
+    with tempfile.TemporaryDirectory() as directory:
+        localPath = os.path.join(directory, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(os.urandom(args.size_mb << 20))
+
+        for workers in args.workers:
+            elapsed = min(transfer(localPath, directory, aesKey, workers) for _ in range(args.runs))
+            print(f"workers {workers:<3} {args.size_mb / elapsed:8.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+import argparse
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs pipelined command throughput against a local mock server")
+    parser.add_argument("--commands", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer()
+        server.start()
+
+        client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, SharedKeyProvider())
+        client.connect()
+        client.login("password")
+
+        start = time.perf_counter()
+        for _ in range(args.commands):
+            client.ping()
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        futures = client.submitCommands(["PING"] * args.commands)
+        results = [future.result() for future in futures]
+        pipelined = time.perf_counter() - start
+
+        client.logout()
+        client.destruct()
+        server.stop()
+
+    print(f"sequential {args.commands / sequential:10.0f} commands/s")
+    print(f"pipelined  {args.commands / pipelined:10.0f} commands/s   ({sum(results)}/{len(results)} ok)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.pool import HomeLinkClientPool
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {p50 * 1000:8.2f} ms   p99 {p99 * 1000:8.2f} ms   mean {statistics.mean(samples) * 1000:8.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled vs cold command latency against a local mock server")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer(services={("bench", "bench"): "password"})
+        server.start()
+        keyProvider = SharedKeyProvider()
+        keyProvider.getKeypair()
+
+        cold = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider)
+            client.connect()
+            client.login("password")
+            client.ping()
+            client.logout()
+            client.destruct()
+            cold.append(time.perf_counter() - start)
+
+        pool = HomeLinkClientPool("127.0.0.1", server.port, keyProvider=keyProvider)
+        pooled = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            with pool.session("bench", "bench", "password") as client:
+                client.ping()
+            pooled.append(time.perf_counter() - start)
+
+        pool.close()
+        server.stop()
+
+    print(f"cold   {percentiles(cold)}")
+    print(f"pooled {percentiles(pooled)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from homelink_python.security import randomBytes
+from homelink_python.transfer import recvFile, sendFile
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+def receive(localPath: str, remotePaths: list, directory: str, aesKey: bytes, fsync: bool) -> float:
+    sender, receiver = socket.socketpair()
+    def send():
+        for remotePath in remotePaths:
+            sendFile(sender, localPath, remotePath, aesKey)
+
+    sendThread = threading.Thread(target=send)
+    start = time.perf_counter()
+    sendThread.start()
+    for _ in remotePaths:
+        recvFile(receiver, directory, aesKey, fsync)
+    elapsed = time.perf_counter() - start
+    sendThread.join()
+    sender.close()
+    receiver.close()
+
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive-side file sink throughput over a socketpair")
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+
+    aesKey = bytes(randomBytes(32))
+    with tempfile.TemporaryDirectory() as directory:
+        largePath = os.path.join(directory, "large")
+        with open(largePath, "wb") as localFile:
+            localFile.write(os.urandom(args.size_mb << 20))
+        smallPath = os.path.join(directory, "small")
+        with open(smallPath, "wb") as localFile:
+            localFile.write(os.urandom(1024))
+
+        for fsync in (False, True):
+            elapsed = receive(largePath, ["large"], os.path.join(directory, "out"), aesKey, fsync)
+            print(f"large file   fsync={fsync!s:<5} {args.size_mb / elapsed:10.1f} MB/s")
+
+            remotePaths = [f"tree/d{i % 7}/e{i % 5}/f{i % 3}/file{i}" for i in range(args.files)]
+            elapsed = receive(smallPath, remotePaths, os.path.join(directory, f"out{fsync}"), aesKey, fsync)
+            print(f"small files  fsync={fsync!s:<5} {args.files / elapsed:10.0f} files/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.resumption import MemorySessionCache
+
+from benchmarks.pool import percentiles
+
+import argparse
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs resumed reconnect latency against a local mock server")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer()
+        server.start()
+        keyProvider = SharedKeyProvider()
+        keyProvider.getKeypair()
+        sessionCache = MemorySessionCache()
+
+        full = []
+        resumed = []
+        for samples, cache in [(full, None), (resumed, sessionCache)]:
+            for _ in range(args.requests):
+                client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider, cache)
+                start = time.perf_counter()
+                client.connect()
+                client.login("password")
+                samples.append(time.perf_counter() - start)
+                client.destruct()
+
+        server.stop()
+
+    print(f"full connect + login     {percentiles(full)}")
+    print(f"resumed connect + login  {percentiles(resumed[1:])}")
+
+if __name__ == "__main__":
+    main()
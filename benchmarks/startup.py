@@ -0,0 +1,68 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CLI_IMPORT_BUDGET_MS = 20.0
+CLI_CONFIGURE_BUDGET_MS = 40.0
+
+def importTime(module: str, env: dict) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, capture_output=True, text=True, check=True
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+
+    raise RuntimeError(f"No import time reported for {module}")
+
+def runTime(args: list, env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], env=env, capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+def loadedModules(env: dict) -> set:
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, homelink_python.cli; print(' '.join(sys.modules))"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return set(result.stdout.split())
+
+def main():
+    parser = argparse.ArgumentParser(description="homelink_python_cli cold start time against a fixed budget")
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env["HOMELINK_PYTHON_CLI_CONFIG"] = os.path.join(directory, "cli.conf")
+        open(env["HOMELINK_PYTHON_CLI_CONFIG"], "w").close()
+
+        cliImport = statistics.median(importTime("homelink_python.cli", env) for _ in range(args.runs))
+        clientImport = statistics.median(importTime("homelink_python.client", env) for _ in range(args.runs))
+        interpreter = statistics.median(runTime(["-c", "pass"], env) for _ in range(args.runs))
+        configure = statistics.median(
+            runTime(["-m", "homelink_python.cli", "--configure", "--host-id=bench"], env) for _ in range(args.runs)
+        )
+        heavyModules = sorted(
+            module for module in loadedModules(env) if module.split(".")[0] in ("Crypto", "asyncio", "concurrent")
+        )
+
+    configureOverhead = configure - interpreter
+    print(f"import homelink_python.cli     {cliImport:8.1f} ms   budget {CLI_IMPORT_BUDGET_MS:.0f} ms")
+    print(f"import homelink_python.client  {clientImport:8.1f} ms")
+    print(f"cli --configure (wall)         {configure:8.1f} ms   interpreter alone {interpreter:.1f} ms")
+    print(f"cli --configure (over python)  {configureOverhead:8.1f} ms   budget {CLI_CONFIGURE_BUDGET_MS:.0f} ms")
+    print(f"heavy modules loaded by cli    {', '.join(heavyModules) or 'none'}")
+
+    if cliImport > CLI_IMPORT_BUDGET_MS or configureOverhead > CLI_CONFIGURE_BUDGET_MS or heavyModules:
+        print("Startup budget exceeded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
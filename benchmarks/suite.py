@@ -0,0 +1,177 @@
+from homelink_python import __version__
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import *
+from homelink_python.security import generateRSAKeys
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+REGRESSION_TOLERANCE = 0.25
+
+def result(value: float, unit: str, higherIsBetter: bool) -> dict:
+    return {"value": value, "unit": unit, "higherIsBetter": higherIsBetter}
+
+def timeSamples(function, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def benchmarkRsaKeygen(args) -> dict:
+    return {"rsa_keygen": result(timeSamples(generateRSAKeys, args.keygen_samples) * 1000, "ms", False)}
+
+def benchmarkPackets(args) -> dict:
+    commandPacket = CommandPacket(1, bytes(80), bytes(256))
+    commandData = CommandPacket.serialize(commandPacket)
+
+    def perCall(function) -> float:
+        return min(timeit.repeat(function, number=args.packet_iterations, repeat=5)) / args.packet_iterations * 1e9
+
+    return {
+        "packet_encode": result(perCall(lambda: CommandPacket.serialize(commandPacket)), "ns", False),
+        "packet_decode": result(perCall(lambda: CommandPacket.deserialize(commandData)), "ns", False),
+    }
+
+def benchmarkSessions(args, server: MockHomeLinkServer, keyProvider) -> dict:
+    connectTimes = []
+    loginTimes = []
+    for _ in range(args.sessions):
+        client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider)
+
+        start = time.perf_counter()
+        client.connect()
+        connectTimes.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        client.login("password")
+        loginTimes.append(time.perf_counter() - start)
+
+        client.logout()
+        client.destruct()
+
+    return {
+        "connect_handshake": result(statistics.median(connectTimes) * 1000, "ms", False),
+        "login": result(statistics.median(loginTimes) * 1000, "ms", False),
+    }
+
+def benchmarkCommands(args, server: MockHomeLinkServer, keyProvider) -> dict:
+    client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider)
+    client.connect()
+    client.login("password")
+
+    start = time.perf_counter()
+    for _ in range(args.commands):
+        client.ping()
+    sequential = args.commands / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for future in client.submitCommands(["PING"] * args.commands):
+        future.result()
+    pipelined = args.commands / (time.perf_counter() - start)
+
+    client.logout()
+    client.destruct()
+
+    return {
+        "command_throughput": result(sequential, "commands/s", True),
+        "command_throughput_pipelined": result(pipelined, "commands/s", True),
+    }
+
+def benchmarkFileTransfer(args, server: MockHomeLinkServer, keyProvider, directory: str) -> dict:
+    localPath = os.path.join(directory, "source")
+    with open(localPath, "wb") as localFile:
+        for _ in range(args.size_mb):
+            localFile.write(os.urandom(1 << 20))
+
+    client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider)
+    client.connect()
+    client.login("password")
+    elapsed = timeSamples(lambda: client.writeFile("bench", "bench", localPath, "copy"), args.transfer_samples)
+    client.logout()
+    client.destruct()
+
+    return {"file_transfer": result(args.size_mb / elapsed, "MB/s", True)}
+
+def compareResults(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["value"]:
+            continue
+
+        ratio = current["value"] / previous["value"]
+        change = ratio - 1 if current["higherIsBetter"] else 1 / ratio - 1
+        flag = "REGRESSION" if change < -tolerance else ""
+        print(f"{name:<30} {previous['value']:12.2f} -> {current['value']:12.2f} {current['unit']:<11} {change:+7.1%} {flag}")
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="HomeLink client benchmark suite against a local mock server")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Results file from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--keygen-samples", type=int, default=5)
+    parser.add_argument("--packet-iterations", type=int, default=100000)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--commands", type=int, default=1000)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--transfer-samples", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    results.update(benchmarkRsaKeygen(args))
+    results.update(benchmarkPackets(args))
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer(directory=os.path.join(home, "server"))
+        server.start()
+        keyProvider = SharedKeyProvider()
+        keyProvider.getKeypair()
+
+        try:
+            results.update(benchmarkSessions(args, server, keyProvider))
+            results.update(benchmarkCommands(args, server, keyProvider))
+            results.update(benchmarkFileTransfer(args, server, keyProvider, home))
+        finally:
+            server.stop()
+
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "results": results,
+    }
+    with open(args.output, "w") as outputFile:
+        json.dump(report, outputFile, indent=2)
+
+    for name, current in results.items():
+        print(f"{name:<30} {current['value']:12.2f} {current['unit']}")
+    print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as baselineFile:
+            baseline = json.load(baselineFile)
+        if compareResults(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
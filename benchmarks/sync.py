@@ -0,0 +1,62 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+def transfer(label: str, function, *args):
+    recorder = metrics.enableMetrics()
+    start = time.perf_counter()
+    status = function(*args)
+    elapsed = time.perf_counter() - start
+    metrics.disableMetrics()
+
+    sent = recorder.counter("bytes_sent_total")
+    print(f"{label:<28} {elapsed:7.2f}s   {sent / (1 << 20):10.2f} MB on the wire   status={status}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta sync of a mostly unchanged file against a local mock server")
+    parser.add_argument("--size-mb", type=int, default=128)
+    parser.add_argument("--edits", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        server = MockHomeLinkServer(directory=os.path.join(home, "server"))
+        server.start()
+        client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, SharedKeyProvider())
+        client.connect()
+        client.login("password")
+
+        localPath = os.path.join(home, "source")
+        data = bytearray(os.urandom(args.size_mb << 20))
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        transfer("initial syncFile", client.syncFile, "bench", "bench", localPath, "copy")
+
+        # Scattered in-place edits plus one insertion that shifts the rest.
+        random.seed(1)
+        for _ in range(args.edits):
+            offset = random.randrange(len(data) - 100)
+            data[offset:offset + 100] = os.urandom(100)
+        offset = random.randrange(len(data))
+        data[offset:offset] = b"inserted line\n"
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        transfer("writeFile after edits", client.writeFile, "bench", "bench", localPath, "full")
+        transfer("syncFile after edits", client.syncFile, "bench", "bench", localPath, "copy")
+        transfer("syncFile unchanged", client.syncFile, "bench", "bench", localPath, "copy")
+
+        client.logout()
+        client.destruct()
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.transport import TransportOptions
+
+import argparse
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+PROFILES = {
+    "default": TransportOptions(),
+    "no-nodelay": TransportOptions(nodelay=False),
+    "no-keepalive": TransportOptions(keepalive=False),
+    "small-buffers": TransportOptions(sendBufferSize=4096, receiveBufferSize=4096),
+    "io-timeout": TransportOptions(ioTimeout=5.0),
+}
+
+def commandLatency(server: MockHomeLinkServer, keyProvider, options: TransportOptions, commands: int) -> list:
+    client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider, transportOptions=options)
+    client.connect()
+    client.login("password")
+
+    timings = []
+    for _ in range(commands):
+        start = time.perf_counter()
+        client.ping()
+        timings.append(time.perf_counter() - start)
+
+    client.logout()
+    client.destruct()
+    return timings
+
+def writeThroughput(server: MockHomeLinkServer, keyProvider, options: TransportOptions, localPath: str, sizeMb: int) -> float:
+    client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, keyProvider, transportOptions=options)
+    client.connect()
+    client.login("password")
+
+    start = time.perf_counter()
+    client.writeFile("bench", "bench", localPath, "bench")
+    elapsed = time.perf_counter() - start
+
+    client.logout()
+    client.destruct()
+    return sizeMb / elapsed
+
+def deadPeerDetection(keyProvider, ioTimeout: float) -> float:
+    # A peer that accepts and then never answers, like a host that vanished
+    # behind a NAT; without an ioTimeout connect() would block forever.
+    listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    listenSocket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+    listenSocket.bind(("::", 0))
+    listenSocket.listen(1)
+
+    client = HomeLinkClient(
+        "bench", "bench", "127.0.0.1", listenSocket.getsockname()[1], keyProvider,
+        transportOptions=TransportOptions(ioTimeout=ioTimeout),
+    )
+    start = time.perf_counter()
+    client.connect()
+    elapsed = time.perf_counter() - start
+
+    client.destruct()
+    listenSocket.close()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Effect of each transport option on command latency and throughput")
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--io-timeout", type=float, default=0.1)
+    args = parser.parse_args()
+
+    keyProvider = SharedKeyProvider()
+    with tempfile.TemporaryDirectory() as directory:
+        localPath = os.path.join(directory, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(os.urandom(args.size_mb << 20))
+
+        server = MockHomeLinkServer(services={("bench", "bench"): "password"}, directory=directory)
+        server.start()
+        try:
+            for name, options in PROFILES.items():
+                timings = sorted(commandLatency(server, keyProvider, options, args.commands))
+                throughput = writeThroughput(server, keyProvider, options, localPath, args.size_mb)
+                print(
+                    f"{name:<14} ping p50 {statistics.median(timings) * 1e6:7.0f} us"
+                    f"  p99 {timings[int(len(timings) * 0.99)] * 1e6:7.0f} us"
+                    f"  writeFile {throughput:7.1f} MB/s"
+                )
+        finally:
+            server.stop()
+
+    elapsed = deadPeerDetection(keyProvider, args.io_timeout)
+    print(f"silent peer detected after {elapsed:.2f} s with ioTimeout={args.io_timeout}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description="Many-small-file directory upload against a local mock server")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--file-size", type=int, default=1024)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        serverDirectory = os.path.join(home, "server")
+        server = MockHomeLinkServer(directory=serverDirectory)
+        server.start()
+
+        sourceDirectory = os.path.join(home, "source")
+        for i in range(args.files):
+            localPath = os.path.join(sourceDirectory, f"dir{i % 20}", f"file{i}")
+            os.makedirs(os.path.dirname(localPath), exist_ok=True)
+            with open(localPath, "wb") as localFile:
+                localFile.write(os.urandom(args.file_size))
+
+        client = HomeLinkClient("bench", "bench", "127.0.0.1", server.port, SharedKeyProvider())
+        client.connect()
+        client.login("password")
+
+        start = time.perf_counter()
+        for root, _, fileNames in os.walk(sourceDirectory):
+            for fileName in fileNames:
+                localPath = os.path.join(root, fileName)
+                client.writeFile("bench", "bench", localPath, os.path.relpath(localPath, sourceDirectory))
+        elapsed = time.perf_counter() - start
+        print(f"writeFile loop          {args.files / elapsed:8.0f} files/s")
+        shutil.rmtree(serverDirectory)
+
+        for connections in args.connections:
+            start = time.perf_counter()
+            status = client.writeDirectory("bench", "bench", sourceDirectory, connections=connections)
+            elapsed = time.perf_counter() - start
+            print(f"writeDirectory x{connections:<2}      {args.files / elapsed:8.0f} files/s   status={status}")
+            shutil.rmtree(serverDirectory)
+
+        client.logout()
+        client.destruct()
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.packet import *
+from homelink_python.security import randomBytes
+from homelink_python.transfer import recvFile
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+def standInReceiver(listenSocket: socket.socket, aesKey: bytearray, directory: str):
+    serverSocket, _ = listenSocket.accept()
+    with serverSocket:
+        recvPacket(serverSocket, CommandPacket)
+        sendPacket(serverSocket, AckPacket(1))
+        localPath = recvFile(serverSocket, directory, aesKey)
+        sendPacket(serverSocket, AckPacket(1 if localPath else 0))
+
+def main():
+    parser = argparse.ArgumentParser(description="writeFile throughput against a local stand-in receiver")
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    client = HomeLinkClient("bench", "bench", "127.0.0.1", 0)
+    client.aesKey = randomBytes(32)
+    client.connectionId = 1
+    client.sessionKey = randomBytes(16).hex()
+
+    with tempfile.TemporaryDirectory() as directory:
+        localPath = os.path.join(directory, "source")
+        with open(localPath, "wb") as localFile:
+            for _ in range(args.size_mb):
+                localFile.write(os.urandom(1 << 20))
+
+        for run in range(args.runs):
+            listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+            listenSocket.bind(("::1", 0))
+            listenSocket.listen()
+            receiverThread = threading.Thread(
+                target=standInReceiver, args=(listenSocket, client.aesKey, os.path.join(directory, "out"))
+            )
+            receiverThread.start()
+
+            client.syncSocket = socket.create_connection(listenSocket.getsockname()[:2])
+            start = time.perf_counter()
+            status = client.writeFile("bench", "bench", localPath, f"copy{run}")
+            elapsed = time.perf_counter() - start
+            receiverThread.join()
+            client.syncSocket.close()
+            listenSocket.close()
+            os.remove(os.path.join(directory, "out", f"copy{run}"))
+
+            print(f"run {run}: status={status} {args.size_mb / elapsed:.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
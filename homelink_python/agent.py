@@ -0,0 +1,217 @@
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+
+AGENT_MESSAGE_FORMAT = "!I"
+AGENT_MESSAGE_HEADER_SIZE = struct.calcsize(AGENT_MESSAGE_FORMAT)
+AGENT_MAX_MESSAGE_SIZE = 1 << 20
+AGENT_CONNECT_TIMEOUT = 1.0
+
+def agentSocketPath() -> str:
+    socketPath = os.getenv("HOMELINK_AGENT_SOCKET")
+    if socketPath:
+        return socketPath
+
+    runtimeDirectory = os.getenv("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(runtimeDirectory, "homelink", "agent.sock")
+
+def _recvExactly(dataSocket: socket.socket, n: int) -> bytearray | None:
+    buffer = bytearray(n)
+    view = memoryview(buffer)
+    bytesReceived = 0
+    while bytesReceived < n:
+        rc = dataSocket.recv_into(view[bytesReceived:])
+        if rc == 0:
+            return None
+        bytesReceived += rc
+
+    return buffer
+
+def sendMessage(dataSocket: socket.socket, message: dict):
+    data = json.dumps(message).encode("UTF-8")
+    dataSocket.sendall(struct.pack(AGENT_MESSAGE_FORMAT, len(data)) + data)
+
+def recvMessage(dataSocket: socket.socket) -> dict | None:
+    header = _recvExactly(dataSocket, AGENT_MESSAGE_HEADER_SIZE)
+    if header is None:
+        return None
+
+    n = struct.unpack(AGENT_MESSAGE_FORMAT, header)[0]
+    if n > AGENT_MAX_MESSAGE_SIZE:
+        print(f"Agent message too large ({n} bytes)", file=sys.stderr)
+        return None
+
+    data = _recvExactly(dataSocket, n)
+    return json.loads(data) if data is not None else None
+
+def requestAgent(request: dict, socketPath: str = None) -> dict | None:
+    agentSocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        agentSocket.settimeout(AGENT_CONNECT_TIMEOUT)
+        agentSocket.connect(socketPath or agentSocketPath())
+        agentSocket.settimeout(None)
+    except OSError:
+        agentSocket.close()
+        return None
+
+    # Once connected, the agent may already have run the command, so a lost
+    # reply is reported as a failure rather than as "no agent" (None), which
+    # callers answer by running the command themselves.
+    with agentSocket:
+        try:
+            sendMessage(agentSocket, request)
+            response = recvMessage(agentSocket)
+        except (OSError, ValueError) as e:
+            print(f"Agent request failed [{e}]", file=sys.stderr)
+            response = None
+
+    return response if response is not None else {"ok": False, "output": "No reply from the agent\n"}
+
+def forwardToAgent(serviceId: str, args: list, socketPath: str = None) -> dict | None:
+    return requestAgent({"op": "command", "serviceId": serviceId, "args": args}, socketPath)
+
+class HomeLinkAgent:
+    def __init__(self, config, password: str, socketPath: str = None, keyProvider=None, pool=None):
+        self.config = config
+        self.password = password
+        self.socketPath = socketPath or agentSocketPath()
+        self.keyProvider = keyProvider
+        self.pool = pool
+        self.listenSocket = None
+        self.acceptThread = None
+        self.active = False
+
+    def _removeStaleSocket(self) -> bool:
+        if not os.path.exists(self.socketPath):
+            return True
+
+        if requestAgent({"op": "ping"}, self.socketPath) is not None:
+            print(f"An agent is already listening on {self.socketPath}", file=sys.stderr)
+            return False
+
+        os.unlink(self.socketPath)
+        return True
+
+    def start(self) -> bool:
+        from homelink_python.keys import PersistentKeyProvider
+        from homelink_python.pool import HomeLinkClientPool
+
+        directory = os.path.dirname(self.socketPath)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not self._removeStaleSocket():
+            return False
+
+        if self.pool is None:
+            self.pool = HomeLinkClientPool(
+                self.config.serverAddress,
+                int(self.config.serverPort),
+                maxSize=1,
+                keyProvider=self.keyProvider or PersistentKeyProvider(),
+            )
+
+        self.listenSocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        previousUmask = os.umask(0o177)
+        try:
+            self.listenSocket.bind(self.socketPath)
+        finally:
+            os.umask(previousUmask)
+        self.listenSocket.listen(64)
+        self.active = True
+
+        self.acceptThread = threading.Thread(target=self._acceptLoop, name="homelink-agent", daemon=True)
+        self.acceptThread.start()
+        return True
+
+    def wait(self):
+        if self.acceptThread:
+            self.acceptThread.join()
+
+    def stop(self):
+        if not self.active:
+            return
+
+        self.active = False
+        try:
+            self.listenSocket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.listenSocket.close()
+        if self.acceptThread is not threading.current_thread():
+            self.acceptThread.join()
+
+        try:
+            os.unlink(self.socketPath)
+        except FileNotFoundError:
+            pass
+        self.pool.close()
+        self.pool = None
+
+    def _acceptLoop(self):
+        while self.active:
+            try:
+                connection, _ = self.listenSocket.accept()
+            except OSError:
+                break
+
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _authorized(self, connection: socket.socket) -> bool:
+        if not hasattr(socket, "SO_PEERCRED"):
+            return True
+
+        credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", credentials)
+        return uid == os.getuid()
+
+    def _serve(self, connection: socket.socket):
+        with connection:
+            try:
+                if not self._authorized(connection):
+                    sendMessage(connection, {"ok": False, "output": "Permission denied\n"})
+                    return
+
+                request = recvMessage(connection)
+                if request is None:
+                    return
+
+                try:
+                    response = self._handleRequest(request)
+                except Exception as e:
+                    print(f"Agent request failed [{e!r}]", file=sys.stderr)
+                    response = {"ok": False, "output": f"Agent request failed [{e}]\n"}
+
+                sendMessage(connection, response)
+            except (OSError, ValueError) as e:
+                print(f"Agent connection failed [{e}]", file=sys.stderr)
+
+    def _handleRequest(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "command":
+            return self._runCommand(request.get("serviceId", ""), request.get("args", []))
+        if op == "ping":
+            return {"ok": True, "output": ""}
+        if op == "stop":
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {"ok": True, "output": ""}
+
+        return {"ok": False, "output": f"Unknown agent request {op}\n"}
+
+    def _runCommand(self, serviceId: str, args: list) -> dict:
+        from homelink_python.cli import handleCommand
+        from homelink_python.pool import HomeLinkPoolException
+
+        import io
+
+        # Each request writes into its own buffer, so concurrent commands and
+        # the agent's own output never end up in each other's replies.
+        output = io.StringIO()
+        try:
+            with self.pool.session(self.config.hostId, serviceId, self.password) as client:
+                handleCommand(client, args, output)
+        except HomeLinkPoolException:
+            return {"ok": False, "output": "Login failed\n"}
+
+        return {"ok": True, "output": output.getvalue()}
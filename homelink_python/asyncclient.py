@@ -0,0 +1,331 @@
+from homelink_python.client import HomeLinkClient, encryptCommand, receiveFiles, sessionCacheKey, transferCommand
+
+from homelink_python.compression import compressorForAck
+
+from homelink_python.packet import *
+
+from homelink_python.security import *
+
+from homelink_python.transfer import sendFileAsync
+
+from homelink_python.transport import DEFAULT_TRANSPORT_OPTIONS, applyTransportOptions
+
+import asyncio
+import ipaddress
+import os
+import sys
+
+class AsyncHomeLinkClient:
+    __slots__ = (
+        "serverAddressStr", "serverPort", "keyProvider", "sessionCache", "compression", "notificationDispatcher",
+        "transportOptions", "resumed", "cryptoContext", "keypair", "clientPublicKey", "hostId", "serviceId",
+        "connectionId", "active", "reader", "writer", "lock", "asyncFileTask",
+    )
+
+    def __init__(
+        self,
+        hostId: str,
+        serviceId: str,
+        serverIpAddress: str,
+        serverPort: int,
+        keyProvider=None,
+        sessionCache=None,
+        compression=None,
+        notificationDispatcher=None,
+        transportOptions=None,
+    ):
+        self.serverAddressStr = str(ipaddress.IPv6Address(f"::ffff:{serverIpAddress}"))
+        self.serverPort = serverPort
+        self.keyProvider = keyProvider
+        self.sessionCache = sessionCache
+        self.compression = compression
+        self.notificationDispatcher = notificationDispatcher
+        self.transportOptions = transportOptions or DEFAULT_TRANSPORT_OPTIONS
+        self.resumed = False
+        self.cryptoContext = CryptoContext()
+        self.keypair = None
+        self.clientPublicKey = None
+        self.hostId = hostId
+        self.serviceId = serviceId
+        self.connectionId = None
+        self.active = True
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+        self.asyncFileTask = None
+
+    @property
+    def serverPublicKey(self) -> str:
+        return self.cryptoContext.serverPublicKey
+
+    @serverPublicKey.setter
+    def serverPublicKey(self, serverPublicKey: str):
+        self.cryptoContext.setServerPublicKey(serverPublicKey)
+
+    @property
+    def aesKey(self) -> bytes:
+        return self.cryptoContext.aesKey
+
+    @aesKey.setter
+    def aesKey(self, aesKey: bytearray | bytes):
+        self.cryptoContext.setAesKey(aesKey)
+
+    @property
+    def sessionKey(self) -> str:
+        return self.cryptoContext.sessionKey
+
+    @sessionKey.setter
+    def sessionKey(self, sessionKey: str):
+        self.cryptoContext.setSessionKey(sessionKey)
+
+    async def _runBlocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def _openConnection(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        # Deadlines on individual reads and writes are left to the caller's
+        # asyncio.wait_for(); the socket options still apply.
+        options = self.transportOptions
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.serverAddressStr, self.serverPort), options.connectTimeout
+            )
+        except asyncio.TimeoutError:
+            print("connect() timed out", file=sys.stderr)
+            return None
+        except OSError as e:
+            print(f"connect() failed [{e.errno}]", file=sys.stderr)
+            return None
+
+        applyTransportOptions(writer.get_extra_info("socket"), options)
+        return reader, writer
+
+    async def _closeConnection(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    async def _sendCommand(self, command: str, writer: asyncio.StreamWriter = None) -> bool:
+        encryptedCommand = encryptCommand(self.cryptoContext, command)
+        if encryptedCommand is None:
+            return False
+
+        writer = writer or self.writer
+        try:
+            writer.writelines(CommandPacket.serializeBuffers(self.connectionId, *encryptedCommand))
+            await writer.drain()
+        except ConnectionError as e:
+            print(f"_sendCommand() failed [{e}]", file=sys.stderr)
+            return False
+
+        return True
+
+    async def _command(self, command: str) -> bool:
+        async with self.lock:
+            if not await self._sendCommand(command):
+                return False
+
+            ackPacket = await recvPacketAsync(self.reader, AckPacket)
+            return bool(ackPacket and ackPacket.value)
+
+    async def _loadKeypair(self):
+        if self.keypair is not None:
+            return
+
+        self.keypair = await self._runBlocking(self.keyProvider.getKeypair if self.keyProvider else generateRSAKeys)
+        self.clientPublicKey = clientIdentity(self.keypair).publicKey
+        self.cryptoContext.setKeypair(self.keypair)
+
+    def _sessionCacheKey(self) -> str:
+        return sessionCacheKey(self.serverAddressStr, self.serverPort, self.hostId, self.serviceId)
+
+    async def _resume(self) -> bool:
+        state = self.sessionCache.load(self._sessionCacheKey())
+        if state is None:
+            return False
+
+        await self._closeConnection()
+        connection = await self._openConnection()
+        if connection is None:
+            return False
+        self.reader, self.writer = connection
+
+        self.connectionId = state.connectionId
+        self.aesKey = state.aesKey
+        self.sessionKey = state.sessionKey
+        self.serverPublicKey = state.serverPublicKey
+
+        if await self._command("RESUME"):
+            self.resumed = True
+            self.active = True
+            return True
+
+        self.sessionCache.remove(self._sessionCacheKey())
+        return False
+
+    async def connect(self) -> bool:
+        self.resumed = False
+        if self.sessionCache is not None and await self._resume():
+            return True
+
+        await self._loadKeypair()
+        await self._closeConnection()
+        connection = await self._openConnection()
+        if connection is None:
+            return False
+        self.reader, self.writer = connection
+
+        connectionId = int.from_bytes(randomBytes(4))
+        async with self.lock:
+            if not await sendPacketAsync(self.writer, ConnectionRequestPacket(connectionId, self.clientPublicKey)):
+                return False
+
+            connectionResponsePacket = await recvPacketAsync(self.reader, ConnectionResponsePacket)
+            if not connectionResponsePacket:
+                return False
+
+        if connectionResponsePacket.success:
+            self.serverPublicKey = connectionResponsePacket.rsaPublicKey.rstrip("\x00")
+            self.aesKey = await self._runBlocking(self.cryptoContext.rsaDecrypt, connectionResponsePacket.aesKey)
+            self.connectionId = connectionId
+            self.sessionKey = None
+            self.active = True
+
+        return connectionResponsePacket.success
+
+    async def _register(self, registerRequestPacket: RegisterRequestPacket) -> RegisterStatus:
+        async with self.lock:
+            if not await sendPacketAsync(self.writer, registerRequestPacket):
+                return RegisterStatus.REGISTER_FAILED
+
+            registerResponsePacket = await recvPacketAsync(self.reader, RegisterResponsePacket)
+            if not registerResponsePacket:
+                return RegisterStatus.REGISTER_FAILED
+
+            return registerResponsePacket.status
+
+    async def registerHost(self) -> RegisterStatus:
+        data = await self._runBlocking(
+            lambda: self.cryptoContext.rsaEncrypt(HomeLinkClient._hostRegistrationData())
+        )
+
+        return await self._register(RegisterRequestPacket(RegistrationType.HOST_REGISTRATION, self.hostId, "", data))
+
+    async def registerService(self, serviceId: str, password: str) -> RegisterStatus:
+        if len(serviceId) > 32:
+            print("ServiceId must be at most 32 characters", file=sys.stderr)
+            return RegisterStatus.REGISTER_FAILED
+
+        data = await self._runBlocking(
+            lambda: self.cryptoContext.rsaEncrypt(HomeLinkClient._serviceRegistrationData(password))
+        )
+
+        return await self._register(
+            RegisterRequestPacket(RegistrationType.SERVICE_REGISTRATION, self.hostId, serviceId, data)
+        )
+
+    async def login(self, password: str) -> LoginStatus:
+        if self.resumed:
+            return LoginStatus.LOGIN_SUCCESS
+
+        data = await self._runBlocking(lambda: self.cryptoContext.rsaEncrypt(HomeLinkClient._loginData(password)))
+
+        async with self.lock:
+            if not await sendPacketAsync(self.writer, LoginRequestPacket(self.connectionId, self.hostId, self.serviceId, data)):
+                return LoginStatus.LOGIN_FAILED
+
+            loginResponsePacket = await recvPacketAsync(self.reader, LoginResponsePacket)
+            if not loginResponsePacket:
+                return LoginStatus.LOGIN_FAILED
+
+        if loginResponsePacket.status == LoginStatus.LOGIN_SUCCESS:
+            self.sessionKey = decryptSessionKey(loginResponsePacket.sessionKey, self.aesKey)
+            if self.sessionCache is not None:
+                self.sessionCache.store(
+                    self._sessionCacheKey(), self.connectionId, self.aesKey, self.sessionKey, self.serverPublicKey
+                )
+
+        return loginResponsePacket.status
+
+    async def logout(self):
+        if self.sessionCache is not None:
+            self.sessionCache.remove(self._sessionCacheKey())
+
+        data = await self._runBlocking(self.cryptoContext.rsaEncrypt, self.aesKey)
+        async with self.lock:
+            if not await sendPacketAsync(self.writer, LogoutPacket(self.connectionId, data)):
+                return
+
+        self.active = False
+
+    async def ping(self) -> bool:
+        return await self._command("PING")
+
+    async def readFileAsync(self, directory: str, callback, context) -> bool:
+        if self.asyncFileTask:
+            print("readFileAsync() is already running", file=sys.stderr)
+            return False
+
+        connection = await self._openConnection()
+        if connection is None:
+            return False
+        reader, writer = connection
+
+        if not await self._sendCommand("READ_FILE_ASYNC", writer):
+            writer.close()
+            return False
+
+        ackPacket = await recvPacketAsync(reader, AckPacket)
+        if not ackPacket or not ackPacket.value:
+            writer.close()
+            return False
+
+        self.asyncFileTask = asyncio.create_task(
+            receiveFiles(
+                reader, writer, directory, callback, context, self.cryptoContext, self.notificationDispatcher, lambda: self.active
+            )
+        )
+        return True
+
+    async def waitAsync(self):
+        if not self.asyncFileTask:
+            return
+
+        try:
+            await self.asyncFileTask
+        except asyncio.CancelledError:
+            pass
+
+        self.asyncFileTask = None
+
+    async def stopAsync(self):
+        if not self.asyncFileTask:
+            return
+
+        self.asyncFileTask.cancel()
+        await self.waitAsync()
+
+    async def writeFile(self, destinationHostId: str, destinationServiceId: str, localPath: str, remotePath: str) -> bool:
+        if not os.path.isfile(localPath):
+            print(f"{localPath} is not a file", file=sys.stderr)
+            return False
+
+        async with self.lock:
+            command = transferCommand(f"WRITE_FILE {destinationHostId} {destinationServiceId}", self.compression)
+            if not await self._sendCommand(command):
+                return False
+
+            ackPacket = await recvPacketAsync(self.reader, AckPacket)
+            if not ackPacket or not ackPacket.value:
+                return False
+
+            compressor = compressorForAck(ackPacket.value)
+            if not await sendFileAsync(self.writer, localPath, remotePath, self.aesKey, compressor):
+                return False
+
+            ackPacket = await recvPacketAsync(self.reader, AckPacket)
+            return bool(ackPacket and ackPacket.value)
+
+    async def destruct(self):
+        await self.stopAsync()
+        await self._closeConnection()
@@ -0,0 +1,45 @@
+# concurrent.futures is imported when the first pool is created, so
+# importing the client stays as light as the CLI needs.
+import collections
+import os
+import threading
+
+# AES-GCM in pycryptodome runs without the GIL, so independent frames
+# encrypt and decrypt in parallel on plain threads.
+CRYPTO_WORKERS = min(os.cpu_count() or 1, 4)
+CRYPTO_TASK_BLOCKS = 16
+CRYPTO_TASKS_PER_WORKER = 2
+
+_executors = {}
+_executorsLock = threading.Lock()
+
+def cryptoExecutor(workers: int) -> "concurrent.futures.ThreadPoolExecutor":
+    import concurrent.futures
+
+    # One pool per worker count, shared by every transfer in the process.
+    with _executorsLock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = concurrent.futures.ThreadPoolExecutor(
+                workers, thread_name_prefix="homelink-crypto"
+            )
+
+    return executor
+
+def orderedMap(function, items, workers: int, maxInFlight: int = None):
+    # Yields function(item) in the order of items while at most maxInFlight
+    # calls are queued or running; items is consumed only as tasks finish.
+    executor = cryptoExecutor(workers)
+    maxInFlight = maxInFlight or workers * CRYPTO_TASKS_PER_WORKER
+    pending = collections.deque()
+    try:
+        for item in items:
+            if len(pending) >= maxInFlight:
+                yield pending.popleft().result()
+            pending.append(executor.submit(function, item))
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
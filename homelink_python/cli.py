@@ -1,8 +1,7 @@
-from homelink_python.client import HomeLinkClient
-from homelink_python.packet import LoginStatus
-
+# The client, and with it pycryptodome, is only imported once a command
+# needs a session; --configure and requests forwarded to a running agent
+# never load it.
 import os
-import pathlib
 import sys
 
 class HomeLinkConfig:
@@ -64,9 +63,41 @@ def editConfig(args: list, configFilePath: str):
         if config.serverPort:
             configFile.write(f"server_port {config.serverPort}\n")
 
-def handleCommand(client: HomeLinkClient, args: list):
+CLI_PASSWORD = "hi"
+
+def handleCommand(client: "HomeLinkClient", args: list, output=None):
     pass
 
+def runDirect(config: HomeLinkConfig, serviceId: str, args: list) -> bool:
+    from homelink_python.client import HomeLinkClient
+    from homelink_python.keys import PersistentKeyProvider
+    from homelink_python.packet import LoginStatus
+
+    client = HomeLinkClient(config.hostId, serviceId, config.serverAddress, int(config.serverPort), PersistentKeyProvider())
+    client.connect()
+    status = client.login(CLI_PASSWORD)
+    if status != LoginStatus.LOGIN_SUCCESS:
+        print("Login failed")
+        client.destruct()
+        return False
+    handleCommand(client, args)
+    client.logout()
+    client.destruct()
+    return True
+
+def runAgent(config: HomeLinkConfig):
+    from homelink_python.agent import HomeLinkAgent
+
+    agent = HomeLinkAgent(config, CLI_PASSWORD)
+    if not agent.start():
+        return
+
+    print(f"HomeLink agent listening on {agent.socketPath}")
+    try:
+        agent.wait()
+    except KeyboardInterrupt:
+        agent.stop()
+
 def main():
 
     configFilePath = os.getenv("HOMELINK_PYTHON_CLI_CONFIG")
@@ -74,29 +105,38 @@ def main():
         homeDirectory = str(os.path.expanduser("~"))
         os.makedirs(homeDirectory + "/.config/homelink/", exist_ok=True)
         configFilePath = homeDirectory + "/.config/homelink/python_cli_config.conf"
-        pathlib.Path(configFilePath).touch(0o777, exist_ok=True)
+        os.close(os.open(configFilePath, os.O_CREAT | os.O_WRONLY, 0o777))
     
     if len(sys.argv) == 1:
-        print("Need serviceId or --configure as first argument")
+        print("Need serviceId, --configure, --agent or --agent-stop as first argument")
         return
     
     if sys.argv[1] == "--configure":
         editConfig(sys.argv[2:], configFilePath)
         return
 
+    from homelink_python.agent import forwardToAgent, requestAgent
+
+    if sys.argv[1] == "--agent-stop":
+        if requestAgent({"op": "stop"}) is None:
+            print("No agent is running")
+        return
+
+    if sys.argv[1] != "--agent":
+        response = forwardToAgent(sys.argv[1], sys.argv[2:])
+        if response is not None:
+            print(response["output"], end="")
+            return
+
     config = readConfig(configFilePath)
     if not config.valid():
         print("Incomplete config file!")
-    
-    client = HomeLinkClient(config.hostId, sys.argv[1], config.serverAddress, int(config.serverPort))
-    client.connect()
-    status = client.login("hi")
-    if status != LoginStatus.LOGIN_SUCCESS:
-        print("Login failed")
         return
-    handleCommand(client, sys.argv[2:])
-    client.logout()
-    client.destruct()
+
+    if sys.argv[1] == "--agent":
+        runAgent(config)
+    else:
+        runDirect(config, sys.argv[1], sys.argv[2:])
 
 
 if __name__ == "__main__":
@@ -1,30 +1,151 @@
-from homelink_python.net import sendBufferTcp, receiveBufferTcp
+from homelink_python import metrics
+from homelink_python.compression import compressionOffer, compressorForAck
+from homelink_python.fanout import FileFanout
+from homelink_python.net import sendBufferTcp, sendBuffersTcp, receiveBufferTcp
 
 from homelink_python.packet import *
 
 from homelink_python.security import *
 
+from homelink_python.sync import sendSyncFile
+
+from homelink_python.transfer import FILE_BLOCK_SIZE, FILE_PACK_THRESHOLD, encryptSmallFile, packFiles, readSmallFile, sendFile, recvFile, recvFileAsync
+
+from homelink_python.transport import HEARTBEAT_INTERVAL, HEARTBEAT_MAX_BACKOFF, DEFAULT_TRANSPORT_OPTIONS, Heartbeat, openConnection
+
+# asyncio, concurrent.futures and the command pipeline are imported where
+# they are used, so short-lived callers such as the CLI never load them.
 import ipaddress
 import os
 import socket
+import struct
 import sys
-
-FILE_BLOCK_SIZE = 8192
+import threading
+
+COMMAND_DATA_SIZE = 224
+COMMAND_MAX_LENGTH = COMMAND_DATA_SIZE - 33
+TRANSFER_CONNECTIONS = 4
+
+# All readFileAsync() listeners in the process share one event loop thread,
+# so an idle listener costs a socket and a task rather than an OS thread.
+_asyncLoop = None
+_asyncLoopLock = threading.Lock()
+
+def _getAsyncLoop() -> "asyncio.AbstractEventLoop":
+    import asyncio
+
+    global _asyncLoop
+
+    with _asyncLoopLock:
+        if _asyncLoop is None:
+            _asyncLoop = asyncio.new_event_loop()
+            threading.Thread(target=_asyncLoop.run_forever, name="homelink-async", daemon=True).start()
+
+    return _asyncLoop
+
+# Shared by HomeLinkClient and AsyncHomeLinkClient, which hold the same
+# session state but nothing else in common.
+def encryptCommand(cryptoContext: CryptoContext, command: str) -> tuple[list, list] | None:
+    commandData = command.encode("UTF-8")
+    if len(commandData) > COMMAND_MAX_LENGTH:
+        print("Command is too long!", file=sys.stderr)
+        return None
+
+    commandData = randomBytes(32) + commandData
+    commandData += bytearray(COMMAND_DATA_SIZE - len(commandData))
+
+    iv = randomBytes(16)
+    data, tag = cryptoContext.aesEncrypt(commandData, iv)
+
+    return cryptoContext.encryptSessionKeyBuffers(), [data, iv, tag]
+
+def sessionCacheKey(serverAddressStr: str, serverPort: int, hostId: str, serviceId: str) -> str:
+    return f"[{serverAddressStr}]:{serverPort}/{hostId}/{serviceId}"
+
+def transferCommand(command: str, compression) -> str:
+    # Compression is offered only when enabled, so servers that do not
+    # know the extra argument never see it; the ack names the codec.
+    offer = compressionOffer(compression)
+    return f"{command} {offer}" if offer else command
+
+async def receiveFiles(reader, writer, directory: str, callback, context, cryptoContext: CryptoContext, dispatcher, active):
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+
+    # With a dispatcher, events are handed off without waiting for the
+    # handlers, and the callback is one of its FILE_EVENT subscribers.
+    handler = None
+    if dispatcher is not None and callback is not None:
+        handler = lambda notification: callback(context, notification.payload)
+        dispatcher.subscribe(AsyncEventType.FILE_EVENT, handler)
+
+    try:
+        while active():
+            data = await reader.readexactly(AsyncNotificationPacket.size())
+            asyncNotificationPacket = AsyncNotificationPacket.deserialize(data)
+            if asyncNotificationPacket.eventType != AsyncEventType.FILE_EVENT:
+                if dispatcher is not None:
+                    dispatcher.dispatch(asyncNotificationPacket.eventType, asyncNotificationPacket.tag)
+                continue
+
+            localPath = await recvFileAsync(reader, directory, cryptoContext.aesKey)
+            writer.write(AckPacket.serialize(AckPacket(1 if localPath else 0)))
+            await writer.drain()
+
+            if not localPath:
+                break
+
+            if dispatcher is not None:
+                dispatcher.dispatch(AsyncEventType.FILE_EVENT, asyncNotificationPacket.tag, localPath)
+            else:
+                await loop.run_in_executor(None, callback, context, localPath)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    except (PacketTypeException, OSError) as e:
+        print(f"receiveFiles() failed [{e!r}]", file=sys.stderr)
+    finally:
+        if handler is not None:
+            dispatcher.unsubscribe(AsyncEventType.FILE_EVENT, handler)
+        writer.close()
 
 class HomeLinkClient:
+    # Thousands of idle sessions may be held at once, so instances carry no
+    # __dict__; serverPublicKey, aesKey and sessionKey live in cryptoContext.
+    __slots__ = (
+        "serverAddressStr", "serverAddress", "serverPort", "keyProvider", "sessionCache", "compression",
+        "notificationDispatcher", "transportOptions", "cryptoWorkers", "resumed", "cryptoContext", "keypair",
+        "clientPublicKey", "hostId", "serviceId", "connectionId", "active", "syncSocket", "asyncFileSocket",
+        "asyncFileThread", "asyncFileArgs", "commandPipeline", "commandLock", "heartbeat",
+    )
+
     def __init__(
         self,
         hostId: str,
         serviceId: str,
         serverIpAddress: str,
         serverPort: int,
+        keyProvider=None,
+        sessionCache=None,
+        compression=None,
+        notificationDispatcher=None,
+        transportOptions=None,
+        cryptoWorkers=None,
     ):
         self.serverAddressStr = str(ipaddress.IPv6Address(f"::ffff:{serverIpAddress}"))
         self.serverAddress = (self.serverAddressStr, serverPort)
         self.serverPort = serverPort
-        self.keypair = generateRSAKeys()
+        self.keyProvider = keyProvider
+        self.sessionCache = sessionCache
+        self.compression = compression
+        self.notificationDispatcher = notificationDispatcher
+        self.transportOptions = transportOptions or DEFAULT_TRANSPORT_OPTIONS
+        self.cryptoWorkers = cryptoWorkers
+        self.resumed = False
+        self.cryptoContext = CryptoContext()
+        self.keypair = None
         self.serverPublicKey = None
-        self.clientPublicKey = getRSAPublicKey(self.keypair)
+        self.clientPublicKey = None
         self.aesKey = None
         self.hostId = hostId
         self.serviceId = serviceId
@@ -34,11 +155,43 @@ class HomeLinkClient:
         self.syncSocket = None
         self.asyncFileSocket = None
         self.asyncFileThread = None
+        self.asyncFileArgs = None
+        self.commandPipeline = None
+
+        # Held for each request/response exchange on syncSocket, so that the
+        # heartbeat never interleaves a PING with a caller's command.
+        self.commandLock = threading.RLock()
+        self.heartbeat = None
+
+    @property
+    def serverPublicKey(self) -> str:
+        return self.cryptoContext.serverPublicKey
+
+    @serverPublicKey.setter
+    def serverPublicKey(self, serverPublicKey: str):
+        self.cryptoContext.setServerPublicKey(serverPublicKey)
+
+    @property
+    def aesKey(self) -> bytes:
+        return self.cryptoContext.aesKey
+
+    @aesKey.setter
+    def aesKey(self, aesKey: bytearray | bytes):
+        self.cryptoContext.setAesKey(aesKey)
+
+    @property
+    def sessionKey(self) -> str:
+        return self.cryptoContext.sessionKey
+
+    @sessionKey.setter
+    def sessionKey(self, sessionKey: str):
+        self.cryptoContext.setSessionKey(sessionKey)
 
     def _getHostKey():
         hostKeyfilePath = f"{os.getenv('HOME')}/.config/homelink/host.key"
 
         if not os.path.isfile(hostKeyfilePath):
+            os.makedirs(os.path.dirname(hostKeyfilePath), exist_ok=True)
             with open(hostKeyfilePath, "w") as hostKeyFile:
                 hostKey = randomBytes(32)
                 hostKeyStr = hostKey.hex()
@@ -52,151 +205,593 @@ class HomeLinkClient:
 
                 
 
-    def _readFileAsyncThread(client, directory, callback, context):
-        pass
+    def _hostRegistrationData() -> bytes:
+        hostKey = HomeLinkClient._getHostKey()
+        data = randomBytes(32) + hostKey.encode("UTF-8")
+        data += bytearray(128 - len(data))
+        return data
 
-    def _sendCommand(client, command: str):
-        if len(command) > 223:
-            print("Command is too long!", file=sys.stderr)
-            return
-        
-        commandData = command.encode("UTF-8")
-        commandData = randomBytes(32) + commandData + bytearray(len(commandData))
-        if len(commandData) < 224:
-            commandData += bytearray(224 - len(commandData))
+    def _serviceRegistrationData(password: str) -> bytes:
+        hashedPassword = hashString(password)
+        hostKey = HomeLinkClient._getHostKey()
+
+        passwordData = randomBytes(32) + hostKey.encode("UTF-8") + hashedPassword.encode("UTF-8")
+        passwordData += bytearray(192 - len(passwordData))
+        return passwordData
+
+    def _loginData(password: str) -> bytes:
+        hashedPassword = hashString(password)
+        hostKey = HomeLinkClient._getHostKey()
+
+        passwordData = randomBytes(32) + hostKey.encode("UTF-8") + bytearray(1) + hashedPassword.encode("UTF-8") + bytearray(1)
+        passwordData += randomBytes(192 - len(passwordData))
+        return passwordData
+
+    async def _readFileAsyncThread(client, directory, callback, context):
+        import asyncio
 
-        iv = randomBytes(16)
-        data, tag = aesEncrypt(commandData, client.aesKey, iv)
+        reader, writer = await asyncio.open_connection(sock=client.asyncFileSocket)
+        await receiveFiles(
+            reader, writer, directory, callback, context, client.cryptoContext, client.notificationDispatcher, lambda: client.active
+        )
 
-        commandPacket = CommandPacket(client.connectionId, encryptSessionKey(client.sessionKey, client.aesKey), data + iv + tag)
-        status = sendBufferTcp(client.syncSocket, CommandPacket.serialize(commandPacket))
+    def _encryptCommand(self, command: str) -> tuple[list, list] | None:
+        return encryptCommand(self.cryptoContext, command)
+
+    def _sendCommand(client, command: str, dataSocket: socket.socket = None):
+        encryptedCommand = client._encryptCommand(command)
+        if encryptedCommand is None:
+            return False
+
+        buffers = CommandPacket.serializeBuffers(client.connectionId, *encryptedCommand)
+        status = sendBuffersTcp(dataSocket or client.syncSocket, buffers)
         if not status:
-            print("sendBufferTcp() failed", file=sys.stderr)
+            print("sendBuffersTcp() failed", file=sys.stderr)
+        else:
+            recordPacket("sent", PacketType.COMMAND)
 
-    def connect(self):
-        self.syncSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        return status
 
-        try:
-            self.syncSocket.connect(self.serverAddress)
-        except socket.error as e:
-            print(f"connect() failed [{e.errno}]", file=sys.stderr)
+    def submitCommands(self, commands: list) -> list:
+        from homelink_python.pipeline import CommandPipeline
+
+        encryptedCommands = [self._encryptCommand(command) for command in commands]
+
+        # Commands are queued under commandLock, and every synchronous
+        # exchange waits under it for the pipeline to drain, so the two never
+        # read each other's responses from syncSocket.
+        with self.commandLock:
+            if self.syncSocket is None and not self._ensureConnected():
+                import concurrent.futures
+
+                futures = [concurrent.futures.Future() for _ in commands]
+                for future in futures:
+                    future.set_result(False)
+                return futures
+
+            if self.commandPipeline is None:
+                self.commandPipeline = CommandPipeline(self)
+            commandPipeline = self.commandPipeline
+            futures = commandPipeline.enqueue(encryptedCommands)
+
+        commandPipeline.flush()
+        return futures
+
+    def submitCommand(self, command: str) -> "concurrent.futures.Future":
+        return self.submitCommands([command])[0]
+
+    def _loadKeypair(self):
+        if self.keypair is not None:
+            return
+
+        self.keypair = self.keyProvider.getKeypair() if self.keyProvider else generateRSAKeys()
+        self.clientPublicKey = clientIdentity(self.keypair).publicKey
+        self.cryptoContext.setKeypair(self.keypair)
+
+    def _sessionCacheKey(self) -> str:
+        return sessionCacheKey(self.serverAddressStr, self.serverPort, self.hostId, self.serviceId)
+
+    def _resumeSession(self) -> bool:
+        if self.syncSocket:
+            self.syncSocket.close()
+        self.commandPipeline = None
+
+        self.syncSocket = openConnection(self.serverAddress, self.transportOptions)
+        if self.syncSocket is None:
             return False
-        
-        connectionId = int.from_bytes(randomBytes(4))
-        rsaPublicKey = getRSAPublicKey(self.keypair)
 
-        connectionRequestPacket = ConnectionRequestPacket(connectionId, rsaPublicKey)
+        if self._sendCommand("RESUME"):
+            ackPacket = recvPacket(self.syncSocket, AckPacket)
+            if ackPacket and ackPacket.value:
+                self.active = True
+                return True
 
-        status = sendPacket(self.syncSocket, connectionRequestPacket)
-        if not status:
+        self.syncSocket.close()
+        self.syncSocket = None
+        return False
+
+    def _resume(self) -> bool:
+        state = self.sessionCache.load(self._sessionCacheKey())
+        if state is None:
             return False
-        
-        connectionResponsePacket = recvPacket(self.syncSocket, ConnectionResponsePacket)
-        if not connectionResponsePacket:
+
+        self.connectionId = state.connectionId
+        self.aesKey = state.aesKey
+        self.sessionKey = state.sessionKey
+        self.serverPublicKey = state.serverPublicKey
+
+        if self._resumeSession():
+            self.resumed = True
+            return True
+
+        self.sessionCache.remove(self._sessionCacheKey())
+        return False
+
+    def suspend(self) -> bool:
+        # Closes the command connection of an idle session but keeps its keys;
+        # the next command resumes the session on a new connection.
+        with self.commandLock:
+            if self.syncSocket is None or self.sessionKey is None:
+                return False
+            if self.commandPipeline is not None and not self.commandPipeline.idle():
+                return False
+
+            self.syncSocket.close()
+            self.syncSocket = None
+            self.commandPipeline = None
+            return True
+
+    def _waitPipeline(self):
+        if self.commandPipeline is not None:
+            self.commandPipeline.waitDrained()
+
+    def _ensureConnected(self) -> bool:
+        if self.syncSocket is not None:
+            self._waitPipeline()
+            return True
+
+        if self.sessionKey is None:
+            print("Not connected", file=sys.stderr)
             return False
-        
-        if connectionResponsePacket.success:
-            self.serverPublicKey = connectionResponsePacket.rsaPublicKey.rstrip("\x00")
-            self.aesKey = rsaDecrypt(connectionResponsePacket.aesKey, self.keypair)
-            self.connectionId = connectionId
 
-        return connectionResponsePacket.success
+        with metrics.phase("connect.resume"):
+            return self._resumeSession()
+
+    def connect(self):
+        with self.commandLock:
+            self.resumed = False
+            if self.sessionCache is not None:
+                with metrics.phase("connect.resume"):
+                    resumed = self._resume()
+                if resumed:
+                    return True
+
+            with metrics.phase("connect.keypair"):
+                self._loadKeypair()
+            if self.syncSocket:
+                self.syncSocket.close()
+            self.commandPipeline = None
+
+            with metrics.phase("connect.tcp"):
+                self.syncSocket = openConnection(self.serverAddress, self.transportOptions)
+            if self.syncSocket is None:
+                return False
+        
+            connectionId = int.from_bytes(randomBytes(4))
+
+            connectionRequestPacket = ConnectionRequestPacket(connectionId, self.clientPublicKey)
+
+            with metrics.phase("connect.round_trip"):
+                status = sendPacket(self.syncSocket, connectionRequestPacket)
+                if not status:
+                    return False
+            
+                connectionResponsePacket = recvPacket(self.syncSocket, ConnectionResponsePacket)
+                if not connectionResponsePacket:
+                    return False
+        
+            if connectionResponsePacket.success:
+                self.serverPublicKey = connectionResponsePacket.rsaPublicKey.rstrip("\x00")
+                with metrics.phase("connect.rsa_decrypt"):
+                    self.aesKey = self.cryptoContext.rsaDecrypt(connectionResponsePacket.aesKey)
+                self.connectionId = connectionId
+                self.sessionKey = None
+                self.active = True
+
+            return connectionResponsePacket.success
         
         
 
     def registerHost(self) -> RegisterStatus:
-        hostKey = HomeLinkClient._getHostKey()
-        data = randomBytes(32) + hostKey.encode("UTF-8")
-        data += bytearray(128 - len(data))
-        data = rsaEncrypt(data, self.serverPublicKey)
+        with self.commandLock:
+            self._waitPipeline()
+            data = self.cryptoContext.rsaEncrypt(HomeLinkClient._hostRegistrationData())
 
-        registerRequestPacket = RegisterRequestPacket(RegistrationType.HOST_REGISTRATION, self.hostId, "", data)
+            registerRequestPacket = RegisterRequestPacket(RegistrationType.HOST_REGISTRATION, self.hostId, "", data)
 
-        status = sendPacket(self.syncSocket, registerRequestPacket)
-        if not status:
-            return RegisterStatus.REGISTER_FAILED
+            status = sendPacket(self.syncSocket, registerRequestPacket)
+            if not status:
+                return RegisterStatus.REGISTER_FAILED
         
-        registerResponsePacket = recvPacket(self.syncSocket, RegisterResponsePacket)
-        if not registerResponsePacket:
-            return RegisterStatus.REGISTER_FAILED
+            registerResponsePacket = recvPacket(self.syncSocket, RegisterResponsePacket)
+            if not registerResponsePacket:
+                return RegisterStatus.REGISTER_FAILED
         
-        return registerResponsePacket.status
+            return registerResponsePacket.status
 
 
     def registerService(self, serviceId: str, password: str):
-        if len(serviceId > 32):
+        if len(serviceId) > 32:
             print("ServiceId must be at most 32 characters", file=sys.stderr)
+            return RegisterStatus.REGISTER_FAILED
 
-        hashedPassword = hashString(password)
-        hostKey = HomeLinkClient._getHostKey()
-
-        passwordData = randomBytes(32) + hostKey.encode("UTF-8") + hashedPassword.encode("UTF-8")
-        passwordData += bytearray(192 - len(passwordData))
-
-        data = rsaEncrypt(passwordData, self.serverPublicKey)
+        with self.commandLock:
+            self._waitPipeline()
+            data = self.cryptoContext.rsaEncrypt(HomeLinkClient._serviceRegistrationData(password))
 
-        registerRequestPacket = RegisterRequestPacket(RegistrationType.SERVICE_REGISTRATION, self.hostId, serviceId, data)
+            registerRequestPacket = RegisterRequestPacket(RegistrationType.SERVICE_REGISTRATION, self.hostId, serviceId, data)
 
-        status = sendPacket(self.syncSocket, registerRequestPacket)
-        if not status:
-            return RegisterStatus.REGISTER_FAILED
+            status = sendPacket(self.syncSocket, registerRequestPacket)
+            if not status:
+                return RegisterStatus.REGISTER_FAILED
         
-        registerResponsePacket = recvPacket(self.syncSocket, RegisterResponsePacket)
-        if not registerResponsePacket:
-            return RegisterStatus.REGISTER_FAILED
+            registerResponsePacket = recvPacket(self.syncSocket, RegisterResponsePacket)
+            if not registerResponsePacket:
+                return RegisterStatus.REGISTER_FAILED
         
-        return registerResponsePacket.status
+            return registerResponsePacket.status
 
     def login(self, password: str):
-        hashedPassword = hashString(password)
-        hostKey = HomeLinkClient._getHostKey()
-
-        passwordData = randomBytes(32) + hostKey.encode("UTF-8") + bytearray(1) + hashedPassword.encode("UTF-8") + bytearray(1)
-        passwordData += randomBytes(192 - len(passwordData))
-
-        data = rsaEncrypt(passwordData, self.serverPublicKey)
-
-        loginRequestPacket = LoginRequestPacket(self.connectionId, self.hostId, self.serviceId, data)
-        status = sendPacket(self.syncSocket, loginRequestPacket)
-        if not status:
-            return LoginStatus.LOGIN_FAILED
-        
-        loginResponsePacket = recvPacket(self.syncSocket, LoginResponsePacket)
-        if not loginResponsePacket:
-            return LoginStatus.LOGIN_FAILED
+        with self.commandLock:
+            self._waitPipeline()
+            if self.resumed:
+                return LoginStatus.LOGIN_SUCCESS
+
+            with metrics.phase("login.rsa_encrypt"):
+                data = self.cryptoContext.rsaEncrypt(HomeLinkClient._loginData(password))
+
+            loginRequestPacket = LoginRequestPacket(self.connectionId, self.hostId, self.serviceId, data)
+            with metrics.phase("login.round_trip"):
+                status = sendPacket(self.syncSocket, loginRequestPacket)
+                if not status:
+                    return LoginStatus.LOGIN_FAILED
+            
+                loginResponsePacket = recvPacket(self.syncSocket, LoginResponsePacket)
+                if not loginResponsePacket:
+                    return LoginStatus.LOGIN_FAILED
         
-        if loginResponsePacket.status == LoginStatus.LOGIN_SUCCESS:
-            self.sessionKey = decryptSessionKey(loginResponsePacket.sessionKey, self.aesKey)
+            if loginResponsePacket.status == LoginStatus.LOGIN_SUCCESS:
+                with metrics.phase("login.session_key"):
+                    self.sessionKey = decryptSessionKey(loginResponsePacket.sessionKey, self.aesKey)
+                if self.sessionCache is not None:
+                    self.sessionCache.store(
+                        self._sessionCacheKey(), self.connectionId, self.aesKey, self.sessionKey, self.serverPublicKey
+                    )
         
-        return loginResponsePacket.status
+            return loginResponsePacket.status
 
     def logout(self):
-        data = rsaEncrypt(self.aesKey, self.serverPublicKey)
-        logoutPacket = LogoutPacket(self.connectionId, data)
-        status = sendPacket(self.syncSocket, logoutPacket)
-        if not status:
-            return
+        with self.commandLock:
+            if self.sessionCache is not None:
+                self.sessionCache.remove(self._sessionCacheKey())
+            if not self._ensureConnected():
+                return
+
+            data = self.cryptoContext.rsaEncrypt(self.aesKey)
+            logoutPacket = LogoutPacket(self.connectionId, data)
+            status = sendPacket(self.syncSocket, logoutPacket)
+            if not status:
+                return
         
-        self.active = False
+            self.active = False
 
-    def readFileAsync(self, directory: str, callback, context):
-        pass
+    def ping(self) -> bool:
+        with self.commandLock:
+            if not self._ensureConnected():
+                return False
+
+            with metrics.phase("command.round_trip"):
+                if not self._sendCommand("PING"):
+                    return False
+
+                ackPacket = recvPacket(self.syncSocket, AckPacket)
+                return bool(ackPacket and ackPacket.value)
+
+    def readFileAsync(self, directory: str, callback, context) -> bool:
+        if self.asyncFileThread:
+            print("readFileAsync() is already running", file=sys.stderr)
+            return False
+
+        self.asyncFileArgs = None
+        self.asyncFileSocket = None
+        asyncFileSocket = openConnection(self.serverAddress, self.transportOptions)
+        if asyncFileSocket is None:
+            return False
+
+        if not self._sendCommand("READ_FILE_ASYNC", asyncFileSocket):
+            asyncFileSocket.close()
+            return False
+
+        ackPacket = recvPacket(asyncFileSocket, AckPacket)
+        if not ackPacket or not ackPacket.value:
+            asyncFileSocket.close()
+            return False
+
+        self.asyncFileArgs = (directory, callback, context)
+        self.asyncFileSocket = asyncFileSocket
+
+        self.asyncFileSocket.setblocking(False)
+        import asyncio
+
+        self.asyncFileThread = asyncio.run_coroutine_threadsafe(
+            self._readFileAsyncThread(directory, callback, context), _getAsyncLoop()
+        )
+        return True
 
     def waitAsync(self):
-        pass
+        if not self.asyncFileThread:
+            return
+
+        import concurrent.futures
+
+        try:
+            self.asyncFileThread.result()
+        except concurrent.futures.CancelledError:
+            pass
+
+        self.asyncFileThread = None
+        self.asyncFileSocket = None
 
     def stopAsync(self):
-        pass
+        self.asyncFileArgs = None
+        if not self.asyncFileThread:
+            return
 
-    def readFile(self):
-        pass
+        self.asyncFileThread.cancel()
+        self.waitAsync()
 
-    def writeFile(self, destinationHostId: str, destinationServiceId: str, localPath: str, remotePath: str):
-        pass
+    def readFile(self, directory: str) -> str | None:
+        with self.commandLock:
+            if not self._ensureConnected() or not self._sendCommand("READ_FILE"):
+                return None
+
+            ackPacket = recvPacket(self.syncSocket, AckPacket)
+            if not ackPacket or not ackPacket.value:
+                return None
+
+            return recvFile(self.syncSocket, directory, self.aesKey, cryptoWorkers=self.cryptoWorkers)
+
+    def _transferCommand(self, command: str) -> str:
+        return transferCommand(command, self.compression)
+
+    def _writeFile(self, dataSocket: socket.socket, destinationHostId: str, destinationServiceId: str, localPath: str, remotePath: str) -> bool:
+        if not self._sendCommand(self._transferCommand(f"WRITE_FILE {destinationHostId} {destinationServiceId}"), dataSocket):
+            return False
+
+        ackPacket = recvPacket(dataSocket, AckPacket)
+        if not ackPacket or not ackPacket.value:
+            return False
+
+        with metrics.phase("write_file.transfer"):
+            if not sendFile(dataSocket, localPath, remotePath, self.aesKey, compressorForAck(ackPacket.value), self.cryptoWorkers):
+                return False
+
+        ackPacket = recvPacket(dataSocket, AckPacket)
+        return bool(ackPacket and ackPacket.value)
+
+    def writeFile(self, destinationHostId: str, destinationServiceId: str, localPath: str, remotePath: str) -> bool:
+        if not os.path.isfile(localPath):
+            print(f"{localPath} is not a file", file=sys.stderr)
+            return False
+
+        with self.commandLock:
+            if not self._ensureConnected():
+                return False
+            return self._writeFile(self.syncSocket, destinationHostId, destinationServiceId, localPath, remotePath)
+
+    def syncFile(self, destinationHostId: str, destinationServiceId: str, localPath: str, remotePath: str) -> bool:
+        if not os.path.isfile(localPath):
+            print(f"{localPath} is not a file", file=sys.stderr)
+            return False
+
+        with self.commandLock:
+            if not self._ensureConnected():
+                return False
+            if not self._sendCommand(self._transferCommand(f"SYNC_FILE {destinationHostId} {destinationServiceId}")):
+                return False
+
+            ackPacket = recvPacket(self.syncSocket, AckPacket)
+            if not ackPacket or not ackPacket.value:
+                return False
+
+            with metrics.phase("sync_file.transfer"):
+                if not sendSyncFile(self.syncSocket, localPath, remotePath, self.aesKey, compressorForAck(ackPacket.value)):
+                    return False
+
+            ackPacket = recvPacket(self.syncSocket, AckPacket)
+            return bool(ackPacket and ackPacket.value)
+
+    def writeFileToMany(self, destinations: list, localPath: str, remotePath: str) -> dict:
+        results = dict.fromkeys(destinations, False)
+        if not os.path.isfile(localPath):
+            print(f"{localPath} is not a file", file=sys.stderr)
+            return results
+
+        sockets = {}
+        acks = {}
+
+        def handshake(destination: tuple):
+            dataSocket = self._openTransferSocket()
+            if dataSocket is None:
+                return
+
+            if self._sendCommand(self._transferCommand(f"WRITE_FILE {destination[0]} {destination[1]}"), dataSocket):
+                ackPacket = recvPacket(dataSocket, AckPacket)
+                if ackPacket and ackPacket.value:
+                    sockets[destination] = dataSocket
+                    acks[destination] = ackPacket.value
+                    return
+            dataSocket.close()
+
+        threads = [threading.Thread(target=handshake, args=(destination,), daemon=True) for destination in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every destination receives the same encrypted frames, so a codec is
+        # used only if all of them picked it.
+        ackValues = set(acks.values())
+        fanout = FileFanout(localPath, remotePath, self.aesKey, ackValues.pop() if len(ackValues) == 1 else 1)
+        with metrics.phase("write_file.fanout"):
+            streamed = fanout.run(sockets)
+
+        for destination, dataSocket in sockets.items():
+            if streamed[destination]:
+                ackPacket = recvPacket(dataSocket, AckPacket)
+                results[destination] = bool(ackPacket and ackPacket.value)
+            dataSocket.close()
+
+        return results
+
+    def _writeFileBatch(self, dataSocket: socket.socket, destinationHostId: str, destinationServiceId: str, batch: list) -> int:
+        contents = []
+        for localPath, remotePath, _ in batch:
+            data = readSmallFile(localPath)
+            if data is not None:
+                contents.append((data, remotePath))
+
+        if not contents:
+            return 0
+
+        command = f"WRITE_FILES {destinationHostId} {destinationServiceId} {len(contents)}"
+        if not self._sendCommand(self._transferCommand(command), dataSocket):
+            return 0
+
+        ackPacket = recvPacket(dataSocket, AckPacket)
+        if not ackPacket or not ackPacket.value:
+            return 0
+
+        compressor = compressorForAck(ackPacket.value)
+        buffers = []
+        for data, remotePath in contents:
+            buffers += encryptSmallFile(data, remotePath, self.aesKey, compressor)
+
+        if not sendBuffersTcp(dataSocket, buffers):
+            return 0
+
+        ackPacket = recvPacket(dataSocket, AckPacket)
+        return ackPacket.value if ackPacket else 0
+
+    def _openTransferSocket(self) -> socket.socket | None:
+        return openConnection(self.serverAddress, self.transportOptions)
+
+    def writeFiles(
+        self,
+        destinationHostId: str,
+        destinationServiceId: str,
+        files: list,
+        connections: int = TRANSFER_CONNECTIONS,
+        progress=None,
+    ) -> bool:
+        entries = []
+        for localPath, remotePath in files:
+            try:
+                entries.append((localPath, remotePath, os.path.getsize(localPath)))
+            except OSError as e:
+                print(f"stat() failed [{e.errno}]", file=sys.stderr)
+                return False
+
+        batches = packFiles(entries)
+        filesTotal = len(entries)
+        bytesTotal = sum(entry[2] for entry in entries)
+        state = {"files": 0, "bytes": 0, "failed": 0, "next": 0}
+        lock = threading.Lock()
+
+        # Each worker owns one connection on this session and pulls the next
+        # batch; large files go first so they do not end up on the tail.
+        def worker(dataSocket: socket.socket):
+            while True:
+                with lock:
+                    if state["next"] >= len(batches):
+                        return
+                    batch = batches[state["next"]]
+                    state["next"] += 1
+
+                if batch[0][2] > FILE_PACK_THRESHOLD:
+                    stored = int(self._writeFile(dataSocket, destinationHostId, destinationServiceId, *batch[0][:2]))
+                else:
+                    stored = self._writeFileBatch(dataSocket, destinationHostId, destinationServiceId, batch)
+
+                with lock:
+                    state["files"] += len(batch)
+                    state["bytes"] += sum(entry[2] for entry in batch)
+                    state["failed"] += len(batch) - stored
+                    if progress is not None:
+                        progress(state["files"], filesTotal, state["bytes"], bytesTotal)
+
+        with self.commandLock:
+            if not self._ensureConnected():
+                return False
+
+        sockets = [self.syncSocket]
+        for _ in range(min(connections, len(batches)) - 1):
+            dataSocket = self._openTransferSocket()
+            if dataSocket is None:
+                break
+            sockets.append(dataSocket)
+
+        threads = [threading.Thread(target=worker, args=(dataSocket,), daemon=True) for dataSocket in sockets[1:]]
+        for thread in threads:
+            thread.start()
+        with self.commandLock:
+            worker(self.syncSocket)
+        for thread in threads:
+            thread.join()
+        for dataSocket in sockets[1:]:
+            dataSocket.close()
+
+        return state["failed"] == 0 and state["files"] == filesTotal
+
+    def writeDirectory(
+        self,
+        destinationHostId: str,
+        destinationServiceId: str,
+        localDirectory: str,
+        remoteDirectory: str = "",
+        connections: int = TRANSFER_CONNECTIONS,
+        progress=None,
+    ) -> bool:
+        if not os.path.isdir(localDirectory):
+            print(f"{localDirectory} is not a directory", file=sys.stderr)
+            return False
+
+        files = []
+        for root, _, fileNames in os.walk(localDirectory):
+            for fileName in fileNames:
+                localPath = os.path.join(root, fileName)
+                relativePath = os.path.relpath(localPath, localDirectory).replace(os.sep, "/")
+                files.append((localPath, f"{remoteDirectory.rstrip('/')}/{relativePath}" if remoteDirectory else relativePath))
+
+        return self.writeFiles(destinationHostId, destinationServiceId, files, connections, progress)
+
+    def startHeartbeat(self, password: str, interval: float = HEARTBEAT_INTERVAL, maxBackoff: float = HEARTBEAT_MAX_BACKOFF):
+        self.stopHeartbeat()
+        self.heartbeat = Heartbeat(self, password, interval, maxBackoff)
+        self.heartbeat.start()
+
+    def stopHeartbeat(self):
+        if self.heartbeat:
+            self.heartbeat.stop()
+            self.heartbeat = None
 
     def destruct(self):
+        self.stopHeartbeat()
+        self.stopAsync()
+
         if self.syncSocket:
             self.syncSocket.close()
+        self.commandPipeline = None
         
         if self.asyncFileSocket:
             self.asyncFileSocket.close()
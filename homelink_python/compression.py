@@ -0,0 +1,237 @@
+from homelink_python import metrics
+
+import sys
+import threading
+import time
+import weakref
+import zlib
+
+# Codec ids travel in the top byte of a file frame's length field and in the
+# ack that answers a compression offer; CODEC_NONE marks a raw block.
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_LZ4 = 3
+
+COMPRESSION_OFFER_PREFIX = "COMPRESS="
+COMPRESSION_ACK_SHIFT = 8
+COMPRESSION_MIN_BLOCK = 256
+COMPRESSION_MIN_SAVING = 0.1
+COMPRESSION_MAX_SKIP = 64
+ZLIB_LEVEL = 1
+ZSTD_LEVEL = 3
+
+class ZlibCodec:
+    codecId = CODEC_ZLIB
+    name = "zlib"
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return zlib.compress(data, ZLIB_LEVEL)
+
+    def decompress(self, data: bytes | bytearray | memoryview, maxSize: int) -> bytes | None:
+        decompressor = zlib.decompressobj()
+        try:
+            output = decompressor.decompress(data, maxSize)
+        except zlib.error:
+            return None
+
+        return output if decompressor.eof and not decompressor.unconsumed_tail else None
+
+class ZstdCodec:
+    codecId = CODEC_ZSTD
+    name = "zstd"
+
+    def __init__(self):
+        import zstandard
+
+        self.zstandard = zstandard
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return self.compressor.compress(data)
+
+    def decompress(self, data: bytes | bytearray | memoryview, maxSize: int) -> bytes | None:
+        try:
+            if not 0 <= self.zstandard.frame_content_size(data) <= maxSize:
+                return None
+            return self.decompressor.decompress(data)
+        except self.zstandard.ZstdError:
+            return None
+
+class Lz4Codec:
+    codecId = CODEC_LZ4
+    name = "lz4"
+
+    def __init__(self):
+        import lz4.block
+
+        self.block = lz4.block
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return self.block.compress(data)
+
+    def decompress(self, data: bytes | bytearray | memoryview, maxSize: int) -> bytes | None:
+        # lz4 blocks start with their decompressed size, checked before
+        # anything is allocated.
+        if len(data) < 4 or int.from_bytes(data[:4], "little") > maxSize:
+            return None
+
+        try:
+            return self.block.decompress(data)
+        except self.block.LZ4BlockError:
+            return None
+
+_codecs = None
+_decoders = threading.local()
+_workerCompressors = threading.local()
+
+def availableCodecs() -> dict:
+    global _codecs
+
+    # Ordered by preference; zstd and lz4 are used only when installed.
+    if _codecs is None:
+        codecs = {}
+        for codecClass in (ZstdCodec, Lz4Codec, ZlibCodec):
+            try:
+                codecClass()
+            except ImportError:
+                continue
+            codecs[codecClass.name] = codecClass
+        _codecs = codecs
+
+    return _codecs
+
+def _codecClass(codecId: int):
+    return next((codecClass for codecClass in availableCodecs().values() if codecClass.codecId == codecId), None)
+
+def compressionOffer(compression) -> str:
+    # compression is None/False to disable, True for every available codec,
+    # or one codec name or a list of them in order of preference.
+    if not compression:
+        return ""
+
+    available = availableCodecs()
+    if compression is True:
+        names = list(available)
+    else:
+        names = [name for name in ([compression] if isinstance(compression, str) else compression) if name in available]
+
+    return COMPRESSION_OFFER_PREFIX + ",".join(names) if names else ""
+
+def selectCodec(offer: str, supported: list = None) -> int:
+    if not offer.startswith(COMPRESSION_OFFER_PREFIX):
+        return CODEC_NONE
+
+    available = availableCodecs()
+    for name in offer[len(COMPRESSION_OFFER_PREFIX):].split(","):
+        if name in available and (supported is None or name in supported):
+            return available[name].codecId
+
+    return CODEC_NONE
+
+def compressorForAck(ackValue: int) -> "BlockCompressor | None":
+    codecClass = _codecClass(ackValue >> COMPRESSION_ACK_SHIFT)
+    return BlockCompressor(codecClass()) if codecClass else None
+
+class BlockCompressor:
+    # One instance per transfer and thread. A block that does not shrink by
+    # COMPRESSION_MIN_SAVING is sent raw and the following blocks skip
+    # compression, doubling the skip each time the next sample fails too.
+    # A worker's compressor also adds its totals to the transfer's parent.
+    def __init__(self, codec, parent: "BlockCompressor | None" = None):
+        self.codec = codec
+        self.parent = parent
+        self.lock = threading.Lock()
+        self.skip = 0
+        self.backoff = 1
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.cpuSeconds = 0.0
+        self.blocksCompressed = 0
+        self.blocksSkipped = 0
+
+    def ratio(self) -> float:
+        return self.bytesIn / self.bytesOut if self.bytesOut else 1.0
+
+    def _count(self, outcome: str, bytesIn: int, bytesOut: int, elapsed: float):
+        with self.lock:
+            self.bytesIn += bytesIn
+            self.bytesOut += bytesOut
+            self.cpuSeconds += elapsed
+            if outcome == "compressed":
+                self.blocksCompressed += 1
+            elif outcome == "skipped":
+                self.blocksSkipped += 1
+
+        if self.parent is not None:
+            self.parent._count(outcome, bytesIn, bytesOut, elapsed)
+
+    def _record(self, outcome: str, bytesIn: int, bytesOut: int, elapsed: float):
+        self._count(outcome, bytesIn, bytesOut, elapsed)
+
+        recorder = metrics.current
+        if recorder is None:
+            return
+
+        labels = (("codec", self.codec.name),)
+        recorder.increment("compression_blocks_total", 1, labels + (("outcome", outcome),))
+        recorder.increment("compression_bytes_in_total", bytesIn, labels)
+        recorder.increment("compression_bytes_out_total", bytesOut, labels)
+        if elapsed:
+            recorder.observe("compression_seconds", elapsed, labels)
+
+    def compress(self, block: bytes | bytearray | memoryview) -> tuple[int, bytes | bytearray | memoryview]:
+        if len(block) < COMPRESSION_MIN_BLOCK or self.skip:
+            self.skip = max(self.skip - 1, 0)
+            self._record("skipped", len(block), len(block), 0.0)
+            return CODEC_NONE, block
+
+        start = time.thread_time()
+        compressed = self.codec.compress(block)
+        elapsed = time.thread_time() - start
+
+        if len(compressed) > len(block) * (1 - COMPRESSION_MIN_SAVING):
+            self.skip = self.backoff
+            self.backoff = min(self.backoff * 2, COMPRESSION_MAX_SKIP)
+            self._record("incompressible", len(block), len(block), elapsed)
+            return CODEC_NONE, block
+
+        self.backoff = 1
+        self._record("compressed", len(block), len(compressed), elapsed)
+        return self.codec.codecId, compressed
+
+def workerCompressor(compressor: BlockCompressor | None) -> BlockCompressor | None:
+    # A transfer spread over a thread pool gets its own compressor of the
+    # same codec on each worker, kept for as long as the transfer's is and
+    # reporting its totals into it.
+    if compressor is None:
+        return None
+
+    compressors = getattr(_workerCompressors, "compressors", None)
+    if compressors is None:
+        compressors = _workerCompressors.compressors = weakref.WeakKeyDictionary()
+
+    threadCompressor = compressors.get(compressor)
+    if threadCompressor is None:
+        threadCompressor = compressors[compressor] = BlockCompressor(type(compressor.codec)(), compressor)
+    return threadCompressor
+
+def decompressBlock(codecId: int, data: bytes | bytearray | memoryview, maxSize: int) -> bytes | None:
+    decoders = _decoders.__dict__
+    decoder = decoders.get(codecId)
+    if decoder is None:
+        codecClass = _codecClass(codecId)
+        if codecClass is None:
+            print(f"Unsupported compression codec {codecId}", file=sys.stderr)
+            return None
+        decoder = decoders[codecId] = codecClass()
+
+    recorder = metrics.current
+    if recorder is None:
+        return decoder.decompress(data, maxSize)
+
+    start = time.thread_time()
+    output = decoder.decompress(data, maxSize)
+    recorder.observe("decompression_seconds", time.thread_time() - start, (("codec", decoder.name),))
+    return output
@@ -0,0 +1,152 @@
+from homelink_python import metrics
+from homelink_python.compression import compressorForAck
+from homelink_python.net import sendBuffersTcp
+
+from homelink_python.transfer import FILE_BLOCK_SIZE, FILE_INFO_FORMAT, FILE_SEND_BATCH, _encryptFileBatch, encryptFileFrame
+
+import collections
+import os
+import socket
+import struct
+import sys
+import threading
+
+FANOUT_QUEUE_DEPTH = 256
+
+class _FanoutDestination:
+    __slots__ = ("dataSocket", "items", "offset", "detached", "failed")
+
+    def __init__(self, dataSocket: socket.socket):
+        self.dataSocket = dataSocket
+        self.items = collections.deque()
+        self.offset = 0
+        self.detached = False
+        self.failed = False
+
+class FileFanout:
+    # One thread reads and encrypts the file once; every destination socket
+    # has a sender thread draining its own queue of the shared frames. A
+    # destination whose queue is full when a frame is published is detached
+    # and finishes from its offset by reading the file itself, so a slow
+    # receiver never holds back the others.
+    def __init__(self, localPath: str, remotePath: str, aesKey: bytes | bytearray, ackValue: int = 1, queueDepth: int = FANOUT_QUEUE_DEPTH):
+        self.localPath = localPath
+        self.remotePath = remotePath
+        self.aesKey = aesKey
+        self.ackValue = ackValue
+        self.queueDepth = queueDepth
+        self.condition = threading.Condition()
+        self.destinations = {}
+        self.aborted = False
+
+    def _publish(self, buffers: list, nextOffset: int, last: bool) -> bool:
+        with self.condition:
+            while True:
+                attached = [d for d in self.destinations.values() if not d.detached and not d.failed]
+                if not attached:
+                    return False
+                if any(len(d.items) < self.queueDepth for d in attached):
+                    break
+                self.condition.wait()
+
+            for destination in attached:
+                if len(destination.items) >= self.queueDepth:
+                    destination.detached = True
+                    metrics.count("fanout_detached_total")
+                else:
+                    destination.items.append((buffers, last))
+                    destination.offset = nextOffset
+            self.condition.notify_all()
+
+        return True
+
+    def _produce(self):
+        compressor = compressorForAck(self.ackValue)
+        first = True
+        offset = 0
+        try:
+            with open(self.localPath, "rb") as localFile:
+                # The info frame goes out with the first data frame and the
+                # end frame with the last one, as in sendFile().
+                info = struct.pack(FILE_INFO_FORMAT, os.fstat(localFile.fileno()).st_size) + self.remotePath.encode("UTF-8")
+                held = encryptFileFrame(0, info, self.aesKey)
+                while True:
+                    block = localFile.read(FILE_BLOCK_SIZE)
+                    if not block:
+                        break
+
+                    frame = encryptFileFrame(offset, block, self.aesKey, compressor)
+                    if first:
+                        held += frame
+                        first = False
+                    else:
+                        if not self._publish(held, offset, False):
+                            return
+                        held = frame
+                    offset += len(block)
+
+            self._publish(held + encryptFileFrame(offset, b"", self.aesKey), offset, True)
+        except OSError as e:
+            print(f"read() failed [{e.errno}]", file=sys.stderr)
+            with self.condition:
+                self.aborted = True
+                self.condition.notify_all()
+
+    def _sendRemainder(self, destination: _FanoutDestination) -> bool:
+        compressor = compressorForAck(self.ackValue)
+        try:
+            with open(self.localPath, "rb") as localFile:
+                localFile.seek(destination.offset)
+                offset = destination.offset
+                while True:
+                    frames, offset = _encryptFileBatch(localFile, offset, self.aesKey, compressor)
+                    buffers = [buffer for frame in frames for buffer in frame]
+                    if len(frames) < FILE_SEND_BATCH:
+                        return sendBuffersTcp(destination.dataSocket, buffers + encryptFileFrame(offset, b"", self.aesKey))
+                    if not sendBuffersTcp(destination.dataSocket, buffers):
+                        return False
+        except OSError as e:
+            print(f"read() failed [{e.errno}]", file=sys.stderr)
+            return False
+
+    def _stream(self, destination: _FanoutDestination) -> bool:
+        while True:
+            with self.condition:
+                while not destination.items and not destination.detached and not self.aborted:
+                    self.condition.wait()
+                if not destination.items:
+                    break
+
+                batch = [destination.items.popleft() for _ in range(min(len(destination.items), FILE_SEND_BATCH))]
+                self.condition.notify_all()
+
+            if not sendBuffersTcp(destination.dataSocket, [buffer for buffers, _ in batch for buffer in buffers]):
+                with self.condition:
+                    destination.failed = True
+                    destination.items.clear()
+                    self.condition.notify_all()
+                return False
+
+            if batch[-1][1]:
+                return True
+
+        return destination.detached and not self.aborted and self._sendRemainder(destination)
+
+    def run(self, sockets: dict) -> dict:
+        self.destinations = {key: _FanoutDestination(dataSocket) for key, dataSocket in sockets.items()}
+        results = {}
+
+        def stream(key):
+            results[key] = self._stream(self.destinations[key])
+
+        threads = [threading.Thread(target=stream, args=(key,), daemon=True) for key in self.destinations]
+        for thread in threads:
+            thread.start()
+        self._produce()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def detached(self) -> list:
+        return [key for key, destination in self.destinations.items() if destination.detached]
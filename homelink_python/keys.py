@@ -0,0 +1,107 @@
+from homelink_python.security import generateRSAKeys, exportRSAKeys, importRSAKeys
+
+import os
+import queue
+import sys
+import threading
+
+RSA_KEY_POOL_SIZE = 4
+
+def _defaultKeyFilePath() -> str:
+    return os.path.join(os.path.expanduser("~"), ".config", "homelink", "client_key.pem")
+
+class PersistentKeyProvider:
+    def __init__(self, keyFilePath: str = None):
+        self.keyFilePath = keyFilePath or _defaultKeyFilePath()
+        self.keypair = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        try:
+            if os.stat(self.keyFilePath).st_mode & 0o077:
+                print(f"{self.keyFilePath} is accessible by other users, replacing it", file=sys.stderr)
+                return None
+
+            with open(self.keyFilePath, "r") as keyFile:
+                return importRSAKeys(keyFile.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, IndexError, TypeError) as e:
+            print(f"Could not load {self.keyFilePath} [{e}]", file=sys.stderr)
+            return None
+
+    def _store(self, keypair):
+        directory = os.path.dirname(self.keyFilePath)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        tempPath = f"{self.keyFilePath}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tempPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as keyFile:
+                keyFile.write(exportRSAKeys(keypair))
+            os.chmod(tempPath, 0o600)
+            os.replace(tempPath, self.keyFilePath)
+        except OSError as e:
+            print(f"Could not store {self.keyFilePath} [{e.errno}]", file=sys.stderr)
+
+    def getKeypair(self):
+        with self.lock:
+            if self.keypair is None:
+                self.keypair = self._load()
+                if self.keypair is None:
+                    self.keypair = generateRSAKeys()
+                    self._store(self.keypair)
+
+            return self.keypair
+
+class SharedKeyProvider:
+    def __init__(self):
+        self.keypair = None
+        self.lock = threading.Lock()
+
+    def getKeypair(self):
+        with self.lock:
+            if self.keypair is None:
+                self.keypair = generateRSAKeys()
+
+            return self.keypair
+
+_processKeyProvider = None
+_processKeyProviderLock = threading.Lock()
+
+def processKeyProvider() -> SharedKeyProvider:
+    # One client identity for every session in the process, so idle sessions
+    # share a single keypair and its parsed cipher.
+    global _processKeyProvider
+
+    with _processKeyProviderLock:
+        if _processKeyProvider is None:
+            _processKeyProvider = SharedKeyProvider()
+
+    return _processKeyProvider
+
+class RSAKeyPool:
+    def __init__(self, size: int = RSA_KEY_POOL_SIZE):
+        self.keys = queue.Queue(size)
+        self.active = True
+        self.fillThread = threading.Thread(target=self._fill, name="homelink-keypool", daemon=True)
+        self.fillThread.start()
+
+    def _fill(self):
+        while self.active:
+            keypair = generateRSAKeys()
+            while self.active:
+                try:
+                    self.keys.put(keypair, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def getKeypair(self):
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return generateRSAKeys()
+
+    def close(self):
+        self.active = False
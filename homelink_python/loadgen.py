@@ -0,0 +1,333 @@
+from homelink_python.packet import LoginStatus, RegisterStatus
+
+# The clients and the stand-in server are imported by the workers that use
+# them, so spawned processes only load what their mode needs.
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+LOADGEN_HOSTS = 10
+LOADGEN_SERVICES_PER_HOST = 2
+LOADGEN_DURATION = 10.0
+LOADGEN_RAMP_UP = 1.0
+LOADGEN_COMMAND_RATE = 2.0
+LOADGEN_WRITE_RATE = 0.2
+LOADGEN_FILE_SIZE = 16384
+LOADGEN_PASSWORD = "loadgen"
+LOADGEN_OPERATIONS = ("connect", "register_host", "register_service", "login", "command", "write_file")
+LOADGEN_PERCENTILES = (50, 90, 99)
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float, ok: bool):
+        with self.lock:
+            if ok:
+                self.samples[operation].append(seconds)
+            else:
+                self.errors[operation] += 1
+
+    def toDict(self) -> dict:
+        with self.lock:
+            return {"samples": dict(self.samples), "errors": dict(self.errors)}
+
+    def merge(self, data: dict):
+        with self.lock:
+            for operation, samples in data["samples"].items():
+                self.samples[operation].extend(samples)
+            self.errors.update(data["errors"])
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        with self.lock:
+            for operation in LOADGEN_OPERATIONS:
+                samples = sorted(self.samples.get(operation, ()))
+                errors = self.errors.get(operation, 0)
+                if not samples and not errors:
+                    continue
+
+                entry = {"count": len(samples), "errors": errors, "rate": len(samples) / elapsed if elapsed else 0.0}
+                for percentile in LOADGEN_PERCENTILES:
+                    entry[f"p{percentile}_ms"] = _percentile(samples, percentile) * 1000
+                entry["max_ms"] = samples[-1] * 1000 if samples else 0.0
+                report[operation] = entry
+
+        return report
+
+def _percentile(samples: list, percentile: int) -> float:
+    if not samples:
+        return 0.0
+
+    return samples[min(len(samples) - 1, len(samples) * percentile // 100)]
+
+def _simulatedServices(options, hostIndexes) -> list:
+    # Service 0 of each host registers the host; the host's other services
+    # register themselves once that is done.
+    return [
+        (f"{options.run_id}-h{hostIndex}", f"s{serviceIndex}", serviceIndex == 0)
+        for hostIndex in hostIndexes
+        for serviceIndex in range(options.services_per_host)
+    ]
+
+def _schedule(options, start: float):
+    # Commands and writes each run at a fixed per-service rate from a random
+    # phase, so that services do not fire in lockstep.
+    streams = []
+    for operation, rate in (("command", options.command_rate), ("write_file", options.write_rate)):
+        if rate > 0:
+            streams.append([start + random.random() / rate, 1 / rate, operation])
+
+    while streams:
+        stream = min(streams, key=lambda stream: stream[0])
+        yield stream[0], stream[2]
+        stream[0] += stream[1]
+
+def _registered(status: int) -> bool:
+    return status in (RegisterStatus.REGISTER_SUCCESS, RegisterStatus.ALREADY_EXISTS)
+
+def _runService(options, service: tuple, recorder: LatencyRecorder, keyProvider, localPath: str, hostReady: threading.Event, startAt: float, stopAt: float):
+    from homelink_python.client import HomeLinkClient
+
+    hostId, serviceId, registersHost = service
+
+    def timed(operation: str, check, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        ok = check(result)
+        recorder.record(operation, time.perf_counter() - start, ok)
+        return ok
+
+    time.sleep(max(0.0, startAt - time.monotonic()))
+    client = HomeLinkClient(hostId, serviceId, options.server_address, options.server_port, keyProvider)
+    try:
+        if not timed("connect", bool, client.connect):
+            return
+
+        if registersHost:
+            timed("register_host", _registered, client.registerHost)
+            hostReady.set()
+        else:
+            hostReady.wait(max(0.0, stopAt - time.monotonic()))
+
+        timed("register_service", _registered, client.registerService, serviceId, options.password)
+        if not timed("login", lambda status: status == LoginStatus.LOGIN_SUCCESS, client.login, options.password):
+            return
+
+        for due, operation in _schedule(options, time.monotonic()):
+            if due >= stopAt:
+                break
+            time.sleep(max(0.0, due - time.monotonic()))
+
+            if operation == "command":
+                timed("command", bool, client.ping)
+            else:
+                timed("write_file", bool, client.writeFile, hostId, serviceId, localPath, f"loadgen/{serviceId}")
+    finally:
+        if registersHost:
+            hostReady.set()
+        client.destruct()
+
+async def _runServiceAsync(options, service: tuple, recorder: LatencyRecorder, keyProvider, localPath: str, hostReady, startAt: float, stopAt: float):
+    from homelink_python.asyncclient import AsyncHomeLinkClient
+
+    import asyncio
+
+    hostId, serviceId, registersHost = service
+
+    async def timed(operation: str, check, function, *args):
+        start = time.perf_counter()
+        result = await function(*args)
+        ok = check(result)
+        recorder.record(operation, time.perf_counter() - start, ok)
+        return ok
+
+    await asyncio.sleep(max(0.0, startAt - time.monotonic()))
+    client = AsyncHomeLinkClient(hostId, serviceId, options.server_address, options.server_port, keyProvider)
+    try:
+        if not await timed("connect", bool, client.connect):
+            return
+
+        if registersHost:
+            await timed("register_host", _registered, client.registerHost)
+            hostReady.set()
+        else:
+            try:
+                await asyncio.wait_for(hostReady.wait(), max(0.0, stopAt - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+        await timed("register_service", _registered, client.registerService, serviceId, options.password)
+        if not await timed("login", lambda status: status == LoginStatus.LOGIN_SUCCESS, client.login, options.password):
+            return
+
+        for due, operation in _schedule(options, time.monotonic()):
+            if due >= stopAt:
+                break
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+
+            if operation == "command":
+                await timed("command", bool, client.ping)
+            else:
+                await timed("write_file", bool, client.writeFile, hostId, serviceId, localPath, f"loadgen/{serviceId}")
+    finally:
+        if registersHost:
+            hostReady.set()
+        await client.destruct()
+
+def _runThreads(options, services: list, recorder: LatencyRecorder, keyProvider, localPath: str, start: float):
+    hostEvents = collections.defaultdict(threading.Event)
+    stopAt = start + options.ramp_up + options.duration
+    threads = []
+    for i, service in enumerate(services):
+        startAt = start + options.ramp_up * i / len(services)
+        threads.append(threading.Thread(
+            target=_runService,
+            args=(options, service, recorder, keyProvider, localPath, hostEvents[service[0]], startAt, stopAt),
+            daemon=True,
+        ))
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def _runAsyncio(options, services: list, recorder: LatencyRecorder, keyProvider, localPath: str, start: float):
+    import asyncio
+
+    async def runAll():
+        hostEvents = collections.defaultdict(asyncio.Event)
+        stopAt = start + options.ramp_up + options.duration
+        await asyncio.gather(*(
+            _runServiceAsync(
+                options, service, recorder, keyProvider, localPath, hostEvents[service[0]],
+                start + options.ramp_up * i / len(services), stopAt,
+            )
+            for i, service in enumerate(services)
+        ))
+
+    asyncio.run(runAll())
+
+def _runShard(options, hostIndexes: list, localPath: str, start: float) -> dict:
+    from homelink_python.keys import processKeyProvider
+
+    # time.monotonic() is system-wide on Linux, so the parent's schedule
+    # holds in every process.
+    recorder = LatencyRecorder()
+    keyProvider = processKeyProvider()
+    keyProvider.getKeypair()
+    _runAsyncio(options, _simulatedServices(options, hostIndexes), recorder, keyProvider, localPath, start)
+    return recorder.toDict()
+
+def _runProcesses(options, recorder: LatencyRecorder, localPath: str, start: float):
+    import multiprocessing
+
+    processes = max(1, min(options.processes, options.hosts))
+    shards = [list(range(i, options.hosts, processes)) for i in range(processes)]
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        for data in pool.starmap(_runShard, [(options, shard, localPath, start) for shard in shards]):
+            recorder.merge(data)
+
+def runLoad(options) -> dict:
+    from homelink_python.keys import SharedKeyProvider
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if not options.server_address:
+            from homelink_python.mockserver import MockHomeLinkServer
+
+            server = MockHomeLinkServer(services={}, directory=directory)
+            server.start()
+            options.server_address = "127.0.0.1"
+            options.server_port = server.port
+
+        localPath = os.path.join(directory, "payload")
+        with open(localPath, "wb") as localFile:
+            localFile.write(os.urandom(options.file_size))
+
+        # Every simulated service shares one client keypair, generated before
+        # the clock starts so that connect latencies do not include it.
+        keyProvider = SharedKeyProvider()
+        keyProvider.getKeypair()
+
+        recorder = LatencyRecorder()
+        # Spawned workers start slower than threads, so they get a head start.
+        start = time.monotonic() + (2.0 if options.mode == "processes" else 0.0)
+        try:
+            if options.mode == "processes":
+                _runProcesses(options, recorder, localPath, start)
+            else:
+                services = _simulatedServices(options, range(options.hosts))
+                run = _runThreads if options.mode == "threads" else _runAsyncio
+                run(options, services, recorder, keyProvider, localPath, start)
+            elapsed = time.monotonic() - start
+        finally:
+            if server is not None:
+                server.stop()
+
+    return {
+        "mode": options.mode,
+        "hosts": options.hosts,
+        "services": options.hosts * options.services_per_host,
+        "elapsed": elapsed,
+        "operations": recorder.report(elapsed),
+    }
+
+def printReport(report: dict):
+    print(f"{report['mode']}: {report['hosts']} hosts, {report['services']} services, {report['elapsed']:.1f} s")
+    print(f"{'operation':<18}{'count':>8}{'errors':>8}{'ops/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for operation, entry in report["operations"].items():
+        print(
+            f"{operation:<18}{entry['count']:>8}{entry['errors']:>8}{entry['rate']:>10.1f}"
+            f"{entry['p50_ms']:>10.2f}{entry['p90_ms']:>10.2f}{entry['p99_ms']:>10.2f}{entry['max_ms']:>10.2f}"
+        )
+
+def parseArgs(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="homelink_python_loadgen",
+        description="Simulate many HomeLink hosts and services against a server, or a local stand-in when no address is given",
+    )
+    parser.add_argument("--server-address", help="IPv4 address of the server; omit to start a local stand-in")
+    parser.add_argument("--server-port", type=int, default=0)
+    parser.add_argument("--hosts", type=int, default=LOADGEN_HOSTS)
+    parser.add_argument("--services-per-host", type=int, default=LOADGEN_SERVICES_PER_HOST)
+    parser.add_argument("--duration", type=float, default=LOADGEN_DURATION, help="Seconds of steady load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=LOADGEN_RAMP_UP, help="Seconds over which services start")
+    parser.add_argument("--command-rate", type=float, default=LOADGEN_COMMAND_RATE, help="Commands per second per service")
+    parser.add_argument("--write-rate", type=float, default=LOADGEN_WRITE_RATE, help="File writes per second per service")
+    parser.add_argument("--file-size", type=int, default=LOADGEN_FILE_SIZE)
+    parser.add_argument("--mode", choices=("threads", "asyncio", "processes"), default="asyncio")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--password", default=LOADGEN_PASSWORD)
+    parser.add_argument("--run-id", default=uuid.uuid4().hex[:8], help="Prefix for simulated host ids")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--max-error-rate", type=float, default=1.0, help="Exit with status 1 above this share of failed operations")
+    return parser.parse_args(argv)
+
+def main(argv: list = None):
+    options = parseArgs(argv)
+    report = runLoad(options)
+    printReport(report)
+
+    if options.json:
+        with open(options.json, "w") as reportFile:
+            json.dump(report, reportFile, indent=2)
+
+    operations = report["operations"].values()
+    total = sum(entry["count"] + entry["errors"] for entry in operations)
+    errors = sum(entry["errors"] for entry in operations)
+    if not total or errors / total > options.max_error_rate:
+        print(f"{errors} of {total} operations failed", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import bisect
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_PREFIX = "homelink_"
+
+# Instrumented code checks this before doing any work, so a disabled
+# surface costs one module attribute lookup per call site.
+current = None
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def toDict(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name: str, labels: tuple):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_nullTimer = _NullTimer()
+
+def _formatName(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+class Metrics:
+    def __init__(self, sinks: list = None, interval: float = None):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.sinks = list(sinks or [])
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.reporterThread = None
+
+        if interval:
+            self.reporterThread = threading.Thread(target=self._report, name="homelink-metrics", daemon=True)
+            self.reporterThread.start()
+
+    def _report(self):
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def increment(self, name: str, value: int = 1, labels: tuple = ()):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, labels: tuple = ()):
+        with self.lock:
+            self.gauges[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        key = (name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name: str, labels: tuple = ()) -> _Timer:
+        return _Timer(self, name, labels)
+
+    def counter(self, name: str, labels: tuple = ()) -> int:
+        with self.lock:
+            return self.counters.get((name, labels), 0)
+
+    def gauge(self, name: str, labels: tuple = ()) -> float | None:
+        with self.lock:
+            return self.gauges.get((name, labels))
+
+    def histogram(self, name: str, labels: tuple = ()) -> Histogram | None:
+        with self.lock:
+            return self.histograms.get((name, labels))
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "counters": {_formatName(name, labels): value for (name, labels), value in self.counters.items()},
+                "gauges": {_formatName(name, labels): value for (name, labels), value in self.gauges.items()},
+                "histograms": {
+                    _formatName(name, labels): histogram.toDict() for (name, labels), histogram in self.histograms.items()
+                },
+            }
+
+    def toPrometheus(self) -> str:
+        with self.lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((key, histogram.toDict()) for key, histogram in self.histograms.items())
+
+        lines = []
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} counter")
+                declared.add(name)
+            lines.append(f"{METRICS_PREFIX}{_formatName(name, labels)} {value}")
+
+        for (name, labels), value in gauges:
+            if name not in declared:
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} gauge")
+                declared.add(name)
+            lines.append(f"{METRICS_PREFIX}{_formatName(name, labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            if name not in declared:
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} histogram")
+                declared.add(name)
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{METRICS_PREFIX}{_formatName(name + '_bucket', labels + (('le', bound),))} {count}")
+            lines.append(f"{METRICS_PREFIX}{_formatName(name + '_sum', labels)} {histogram['sum']}")
+            lines.append(f"{METRICS_PREFIX}{_formatName(name + '_count', labels)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def addSink(self, sink):
+        self.sinks.append(sink)
+
+    def flush(self):
+        for sink in self.sinks:
+            try:
+                sink.emit(self)
+            except Exception as e:
+                print(f"Metrics sink failed [{e}]")
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def close(self):
+        self.stopped.set()
+        if self.reporterThread:
+            self.reporterThread.join()
+            self.reporterThread = None
+        self.flush()
+
+class CallbackSink:
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, metrics: Metrics):
+        self.callback(metrics.snapshot())
+
+class PrometheusSink:
+    def __init__(self, filePath: str):
+        self.filePath = filePath
+
+    def emit(self, metrics: Metrics):
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(self.filePath))
+        fd, tempPath = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        with os.fdopen(fd, "w") as tempFile:
+            tempFile.write(metrics.toPrometheus())
+        os.replace(tempPath, self.filePath)
+
+class LogSink:
+    def __init__(self, logger=None, level: int = None):
+        import logging
+
+        self.logger = logger or logging.getLogger("homelink_python")
+        self.level = logging.INFO if level is None else level
+
+    def emit(self, metrics: Metrics):
+        import json
+
+        snapshot = metrics.snapshot()
+        summary = dict(snapshot["counters"])
+        summary.update(snapshot["gauges"])
+        for name, histogram in snapshot["histograms"].items():
+            if histogram["count"]:
+                summary[name] = f"n={histogram['count']} mean={histogram['sum'] / histogram['count'] * 1000:.3f}ms"
+        self.logger.log(self.level, "HomeLink metrics %s", json.dumps(summary, sort_keys=True))
+
+def enableMetrics(metrics: Metrics = None) -> Metrics:
+    global current
+    current = metrics or Metrics()
+    return current
+
+def disableMetrics() -> Metrics | None:
+    global current
+    metrics, current = current, None
+    return metrics
+
+def count(name: str, value: int = 1, labels: tuple = ()):
+    if current is not None:
+        current.increment(name, value, labels)
+
+def phase(name: str):
+    if current is None:
+        return _nullTimer
+
+    return current.timer("phase_seconds", (("phase", name),))
+
+def cryptoTimer(operation: str):
+    if current is None:
+        return _nullTimer
+
+    current.increment("crypto_operations_total", 1, (("op", operation),))
+    return current.timer("crypto_seconds", (("op", operation),))
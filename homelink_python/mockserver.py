@@ -0,0 +1,380 @@
+from homelink_python.compression import COMPRESSION_ACK_SHIFT, CODEC_NONE, selectCodec
+
+from homelink_python.packet import *
+
+from homelink_python.security import *
+
+from homelink_python.sync import recvSyncFile
+
+from homelink_python.transfer import recvFile, sendFile
+
+import collections
+import itertools
+import os
+import queue
+import socket
+import sys
+import threading
+
+COMMAND_DATA_SIZE = 224
+NOTIFICATION_ACK_TIMEOUT = 30.0
+
+class MockSession:
+    def __init__(self, connectionId: int, aesKey: bytearray):
+        self.connectionId = connectionId
+        self.aesKey = aesKey
+        self.hostId = None
+        self.serviceId = None
+        self.sessionKey = None
+
+class MockListener:
+    def __init__(self, connection: socket.socket, session: MockSession):
+        self.connection = connection
+        self.session = session
+        self.acks = queue.Queue()
+        self.sendLock = threading.Lock()
+
+class MockHomeLinkServer:
+    def __init__(self, port: int = 0, services: dict = None, directory: str = None, keypair=None, codecs: list = None):
+        self.port = port
+        self.services = services
+        self.directory = directory
+        self.codecs = codecs
+        self.keypair = keypair or generateRSAKeys()
+        self.publicKey = getRSAPublicKey(self.keypair)
+        self.cryptoContext = CryptoContext(keypair=self.keypair)
+        self.sessions = {}
+        self.hosts = {}
+        self.registeredServices = {}
+        self.listeners = {}
+        self.pendingFiles = {}
+        self.notificationTags = itertools.count(1)
+        self.handshakeCount = 0
+        self.lock = threading.Lock()
+        self.listenSocket = None
+        self.acceptThread = None
+        self.connections = set()
+        self.active = False
+
+    def start(self):
+        self.listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        self.listenSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listenSocket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        self.listenSocket.bind(("::", self.port))
+        self.listenSocket.listen(1024)
+        self.port = self.listenSocket.getsockname()[1]
+        self.active = True
+
+        self.acceptThread = threading.Thread(target=self._acceptLoop, name="homelink-mock-accept", daemon=True)
+        self.acceptThread.start()
+
+    def stop(self):
+        self.active = False
+        if self.listenSocket:
+            try:
+                self.listenSocket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.listenSocket.close()
+
+        with self.lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        if self.acceptThread:
+            self.acceptThread.join()
+
+    def _acceptLoop(self):
+        while self.active:
+            try:
+                connection, _ = self.listenSocket.accept()
+            except OSError:
+                break
+
+            with self.lock:
+                self.connections.add(connection)
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: socket.socket):
+        handlers = {
+            PacketType.KEY_REQUEST: self._handleKeyRequest,
+            PacketType.LOGIN_REQUEST: self._handleLoginRequest,
+            PacketType.REGISTER_REQUEST: self._handleRegisterRequest,
+            PacketType.ACK: self._handleAck,
+            PacketType.COMMAND: self._handleCommand,
+            PacketType.PIPELINED_COMMAND: self._handlePipelinedCommand,
+            PacketType.LOGOUT: self._handleLogout,
+        }
+
+        try:
+            while self.active:
+                if not connection.recv(1, socket.MSG_PEEK):
+                    break
+
+                packet = recvAnyPacket(connection)
+                if packet is None:
+                    break
+
+                handler = handlers.get(packet.packetType)
+                if handler is None or not handler(connection, packet):
+                    break
+        except (OSError, ValueError, PacketTypeException) as e:
+            print(f"Mock server connection failed [{e}]", file=sys.stderr)
+        finally:
+            with self.lock:
+                self.connections.discard(connection)
+                for key, listener in list(self.listeners.items()):
+                    if listener.connection is connection:
+                        del self.listeners[key]
+            connection.close()
+
+    def _findSession(self, connectionId: int) -> MockSession | None:
+        with self.lock:
+            return self.sessions.get(connectionId)
+
+    def _handleKeyRequest(self, connection: socket.socket, packet: ConnectionRequestPacket) -> bool:
+        aesKey = randomBytes(AES_KEY_SIZE // 8)
+        session = MockSession(packet.connectionId, aesKey)
+        with self.lock:
+            self.sessions[packet.connectionId] = session
+            self.handshakeCount += 1
+
+        encryptedAesKey = rsaEncrypt(aesKey, packet.rsaPublicKey)
+        return sendPacket(connection, ConnectionResponsePacket(True, self.publicKey, encryptedAesKey))
+
+    def _checkPassword(self, hostId: str, serviceId: str, hashedPassword: str) -> int:
+        with self.lock:
+            registeredPassword = self.registeredServices.get((hostId, serviceId))
+        if registeredPassword is not None:
+            return LoginStatus.LOGIN_SUCCESS if registeredPassword == hashedPassword else LoginStatus.LOGIN_FAILED
+
+        if self.services is None:
+            return LoginStatus.LOGIN_SUCCESS
+
+        password = self.services.get((hostId, serviceId))
+        if password is None:
+            return LoginStatus.NO_SUCH_SERVICE
+
+        return LoginStatus.LOGIN_SUCCESS if hashString(password) == hashedPassword else LoginStatus.LOGIN_FAILED
+
+    def _handleLoginRequest(self, connection: socket.socket, packet: LoginRequestPacket) -> bool:
+        session = self._findSession(packet.connectionId)
+        if session is None:
+            return sendPacket(connection, LoginResponsePacket(LoginStatus.LOGIN_FAILED, bytes(80)))
+
+        passwordData = self.cryptoContext.rsaDecrypt(packet.data)
+        hostKey = passwordData[32:96].decode("UTF-8")
+        hashedPassword = passwordData[97:161].decode("UTF-8")
+        with self.lock:
+            registeredHostKey = self.hosts.get(packet.hostId, hostKey)
+        if registeredHostKey != hostKey:
+            status = LoginStatus.LOGIN_FAILED
+        else:
+            status = self._checkPassword(packet.hostId, packet.serviceId, hashedPassword)
+        if status != LoginStatus.LOGIN_SUCCESS:
+            return sendPacket(connection, LoginResponsePacket(status, bytes(80)))
+
+        session.hostId = packet.hostId
+        session.serviceId = packet.serviceId
+        session.sessionKey = randomBytes(16).hex()
+        return sendPacket(connection, LoginResponsePacket(status, encryptSessionKey(session.sessionKey, session.aesKey)))
+
+    def _registerHost(self, hostId: str, hostKey: str) -> int:
+        with self.lock:
+            registeredHostKey = self.hosts.setdefault(hostId, hostKey)
+
+        return RegisterStatus.REGISTER_SUCCESS if registeredHostKey == hostKey else RegisterStatus.ALREADY_EXISTS
+
+    def _registerService(self, hostId: str, serviceId: str, hostKey: str, hashedPassword: str) -> int:
+        if not serviceId or len(serviceId) > 32:
+            return RegisterStatus.REGISTER_FAILED
+
+        with self.lock:
+            if self.hosts.get(hostId) != hostKey:
+                return RegisterStatus.REGISTER_FAILED
+            if (hostId, serviceId) in self.registeredServices:
+                return RegisterStatus.ALREADY_EXISTS
+
+            self.registeredServices[(hostId, serviceId)] = hashedPassword
+
+        return RegisterStatus.REGISTER_SUCCESS
+
+    def _handleRegisterRequest(self, connection: socket.socket, packet: RegisterRequestPacket) -> bool:
+        try:
+            data = self.cryptoContext.rsaDecrypt(packet.data)
+            hostKey = data[32:96].decode("UTF-8")
+            if packet.registrationType == RegistrationType.HOST_REGISTRATION:
+                status = self._registerHost(packet.hostId, hostKey)
+            elif packet.registrationType == RegistrationType.SERVICE_REGISTRATION:
+                status = self._registerService(packet.hostId, packet.serviceId, hostKey, data[96:160].decode("UTF-8"))
+            else:
+                status = RegisterStatus.REGISTER_FAILED
+        except (ValueError, UnicodeDecodeError):
+            status = RegisterStatus.REGISTER_FAILED
+
+        return sendPacket(connection, RegisterResponsePacket(status))
+
+    def _decryptCommand(self, packet: CommandPacket | PipelinedCommandPacket) -> tuple[MockSession, str] | None:
+        session = self._findSession(packet.connectionId)
+        if session is None or session.sessionKey is None:
+            return None
+
+        try:
+            sessionKey = decryptSessionKey(packet.sessionToken, session.aesKey).rstrip("\x00")
+            data = packet.data
+            commandData = aesDecrypt(
+                data[:COMMAND_DATA_SIZE],
+                session.aesKey,
+                data[COMMAND_DATA_SIZE:COMMAND_DATA_SIZE + AES_IV_SIZE],
+                data[COMMAND_DATA_SIZE + AES_IV_SIZE:],
+            )
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+        if sessionKey != session.sessionKey:
+            return None
+
+        return session, commandData[32:].split(b"\x00")[0].decode("UTF-8")
+
+    def _handleCommand(self, connection: socket.socket, packet: CommandPacket) -> bool:
+        result = self._decryptCommand(packet)
+        if result is None:
+            return sendPacket(connection, AckPacket(0))
+
+        session, command = result
+        tokens = command.split()
+        if tokens and tokens[0] == "WRITE_FILE" and len(tokens) in (3, 4):
+            return self._handleWriteFile(connection, session, tokens[1], tokens[2], self._selectCodec(tokens[3:]))
+        if tokens and tokens[0] == "SYNC_FILE" and len(tokens) in (3, 4):
+            return self._handleSyncFile(connection, session, tokens[1], tokens[2], self._selectCodec(tokens[3:]))
+        if tokens and tokens[0] == "WRITE_FILES" and len(tokens) in (4, 5) and tokens[3].isdigit():
+            return self._handleWriteFiles(connection, session, tokens[1], tokens[2], int(tokens[3]), self._selectCodec(tokens[4:]))
+        if command == "READ_FILE":
+            return self._handleReadFile(connection, session)
+        if command == "READ_FILE_ASYNC":
+            return self._handleReadFileAsync(connection, session)
+
+        return sendPacket(connection, AckPacket(1 if command in ("PING", "RESUME") else 0))
+
+    def _handlePipelinedCommand(self, connection: socket.socket, packet: PipelinedCommandPacket) -> bool:
+        result = self._decryptCommand(packet)
+        status = 1 if result is not None and result[1] in ("PING", "RESUME") else 0
+        return sendPacket(connection, CommandResponsePacket(packet.requestId, status))
+
+    def _selectCodec(self, offer: list) -> int:
+        if not offer:
+            return CODEC_NONE
+
+        return selectCodec(offer[0], self.codecs)
+
+    def _handleWriteFile(self, connection: socket.socket, session: MockSession, hostId: str, serviceId: str, codecId: int) -> bool:
+        if not self.directory:
+            return sendPacket(connection, AckPacket(0))
+
+        if not sendPacket(connection, AckPacket(1 | codecId << COMPRESSION_ACK_SHIFT)):
+            return False
+
+        directory = os.path.join(self.directory, hostId, serviceId)
+        localPath = recvFile(connection, directory, session.aesKey, fsync=False)
+        if not sendPacket(connection, AckPacket(1 if localPath else 0)) or localPath is None:
+            return False
+
+        self._relayFile(hostId, serviceId, localPath, os.path.relpath(localPath, directory))
+        return True
+
+    def _handleSyncFile(self, connection: socket.socket, session: MockSession, hostId: str, serviceId: str, codecId: int) -> bool:
+        if not self.directory:
+            return sendPacket(connection, AckPacket(0))
+
+        if not sendPacket(connection, AckPacket(1 | codecId << COMPRESSION_ACK_SHIFT)):
+            return False
+
+        directory = os.path.join(self.directory, hostId, serviceId)
+        localPath = recvSyncFile(connection, directory, session.aesKey)
+        if not sendPacket(connection, AckPacket(1 if localPath else 0)) or localPath is None:
+            return False
+
+        self._relayFile(hostId, serviceId, localPath, os.path.relpath(localPath, directory))
+        return True
+
+    def _handleWriteFiles(self, connection: socket.socket, session: MockSession, hostId: str, serviceId: str, count: int, codecId: int) -> bool:
+        if not self.directory:
+            return sendPacket(connection, AckPacket(0))
+
+        if not sendPacket(connection, AckPacket(1 | codecId << COMPRESSION_ACK_SHIFT)):
+            return False
+
+        directory = os.path.join(self.directory, hostId, serviceId)
+        localPaths = []
+        for _ in range(count):
+            localPath = recvFile(connection, directory, session.aesKey, fsync=False)
+            if localPath is None:
+                return False
+            localPaths.append(localPath)
+
+        if not sendPacket(connection, AckPacket(len(localPaths))):
+            return False
+
+        for localPath in localPaths:
+            self._relayFile(hostId, serviceId, localPath, os.path.relpath(localPath, directory))
+        return True
+
+    def _handleReadFile(self, connection: socket.socket, session: MockSession) -> bool:
+        with self.lock:
+            pending = self.pendingFiles.get((session.hostId, session.serviceId))
+            entry = pending.popleft() if pending else None
+        if entry is None:
+            return sendPacket(connection, AckPacket(0))
+
+        if not sendPacket(connection, AckPacket(1)):
+            return False
+
+        return sendFile(connection, *entry, session.aesKey)
+
+    def _handleReadFileAsync(self, connection: socket.socket, session: MockSession) -> bool:
+        with self.lock:
+            self.listeners[(session.hostId, session.serviceId)] = MockListener(connection, session)
+
+        return sendPacket(connection, AckPacket(1))
+
+    def _handleAck(self, connection: socket.socket, packet: AckPacket) -> bool:
+        with self.lock:
+            listener = next((l for l in self.listeners.values() if l.connection is connection), None)
+        if listener is None:
+            return False
+
+        listener.acks.put(packet.value)
+        return True
+
+    def _relayFile(self, hostId: str, serviceId: str, localPath: str, remotePath: str) -> bool:
+        with self.lock:
+            listener = self.listeners.get((hostId, serviceId))
+            if listener is None:
+                # Without a listener the file waits for a READ_FILE command.
+                self.pendingFiles.setdefault((hostId, serviceId), collections.deque()).append((localPath, remotePath))
+                return False
+
+        with listener.sendLock:
+            notification = AsyncNotificationPacket(AsyncEventType.FILE_EVENT, next(self.notificationTags))
+            if not sendPacket(listener.connection, notification):
+                return False
+            if not sendFile(listener.connection, localPath, remotePath, listener.session.aesKey):
+                return False
+
+            try:
+                return bool(listener.acks.get(timeout=NOTIFICATION_ACK_TIMEOUT))
+            except queue.Empty:
+                print("Notification was not acknowledged", file=sys.stderr)
+                return False
+
+    def _handleLogout(self, connection: socket.socket, packet: LogoutPacket) -> bool:
+        session = self._findSession(packet.connectionId)
+        if session is not None and self.cryptoContext.rsaDecrypt(packet.data) == session.aesKey:
+            with self.lock:
+                self.sessions.pop(packet.connectionId, None)
+
+        return False
@@ -1,59 +1,171 @@
+from homelink_python import metrics
+
+import collections
 import os
 import socket
 
+SEND_TIMEOUT_RETRIES = 10
+RECEIVE_TIMEOUT_RETRIES = 10
+SEND_IOV_MAX = 512
+BUFFER_POOL_CAPACITY = 64
+
+# Parent directories created so far; a large tree shares a handful of
+# directories, so most files skip the makedirs() call entirely.
+_createdDirectories = set()
+CREATED_DIRECTORIES_CAPACITY = 4096
+
 def _makeParentDirectory(dir: str):
-    temp = dir
-    if temp[-1] == '/':
-        temp = temp[:-1]
+    parent = os.path.dirname(dir.rstrip("/"))
+    if not parent or parent in _createdDirectories:
+        return
+
+    os.makedirs(parent, exist_ok=True)
+    if len(_createdDirectories) >= CREATED_DIRECTORIES_CAPACITY:
+        _createdDirectories.clear()
+    _createdDirectories.add(parent)
 
-    for last in range(len(temp) - 2, -1, -1):
-        if temp[last] == '/':
-            temp = temp[:last]
-            break
+def _forgetParentDirectory(dir: str):
+    _createdDirectories.discard(os.path.dirname(dir.rstrip("/")))
 
-    p = 1
-    while p < len(temp):
-        if temp[p] == '/':
-            os.makedirs(temp, exist_ok=True)
-        p += 1
+def _recordSend(bytesSent: int, retries: int, timeouts: int):
+    recorder = metrics.current
+    if recorder is None:
+        return
 
-    os.makedirs(temp, exist_ok=True)
+    recorder.increment("bytes_sent_total", bytesSent)
+    # Only sends repeated after a timeout count as retries; a partial write
+    # that is simply continued does not.
+    if retries:
+        recorder.increment("send_retries_total", retries)
+    if timeouts:
+        recorder.increment("send_timeouts_total", timeouts)
 
-def sendBufferTcp(dataSocket: socket.socket, buffer: bytearray) -> bool:
+def _recordReceive(bytesReceived: int, timeouts: int):
+    recorder = metrics.current
+    if recorder is None:
+        return
+
+    recorder.increment("bytes_received_total", bytesReceived)
+    if timeouts:
+        recorder.increment("receive_timeouts_total", timeouts)
+
+def sendBufferTcp(dataSocket: socket.socket, buffer: bytearray | bytes | memoryview) -> bool:
+    view = memoryview(buffer).cast("B")
     bytesSent = 0
-    
-    for _ in range(10):
-        if bytesSent >= len(buffer):
-            break
-        
-        rc = 0
+    timeouts = 0
+    retries = 0
+
+    while bytesSent < len(view):
         try:
-            rc = dataSocket.send(buffer[bytesSent:])
+            rc = dataSocket.send(view[bytesSent:])
         except socket.timeout:
+            timeouts += 1
+            if timeouts >= SEND_TIMEOUT_RETRIES:
+                print("send() timed out")
+                _recordSend(bytesSent, retries, timeouts)
+                return False
+            retries += 1
             continue
         except socket.error as e:
             print(f"send() failed [{e.errno}]")
+            _recordSend(bytesSent, retries, timeouts)
             return False
-        
+
         bytesSent += rc
-    return bytesSent == len(buffer)
 
-def receiveBufferTcp(dataSocket: socket.socket, n: int) -> bytearray | None:
+    if metrics.current is not None:
+        _recordSend(bytesSent, retries, timeouts)
+    return True
+
+def sendBuffersTcp(dataSocket: socket.socket, buffers: list) -> bool:
+    if not hasattr(dataSocket, "sendmsg"):
+        return sendBufferTcp(dataSocket, b"".join(buffers))
+
+    views = [memoryview(buffer).cast("B") for buffer in buffers if len(buffer)]
+    i = 0
+    timeouts = 0
+    retries = 0
+    bytesSent = 0
+
+    while i < len(views):
+        try:
+            rc = dataSocket.sendmsg(views[i:i + SEND_IOV_MAX])
+        except socket.timeout:
+            timeouts += 1
+            if timeouts >= SEND_TIMEOUT_RETRIES:
+                print("sendmsg() timed out")
+                _recordSend(bytesSent, retries, timeouts)
+                return False
+            retries += 1
+            continue
+        except socket.error as e:
+            print(f"sendmsg() failed [{e.errno}]")
+            _recordSend(bytesSent, retries, timeouts)
+            return False
+
+        bytesSent += rc
+        while rc > 0:
+            if rc >= len(views[i]):
+                rc -= len(views[i])
+                i += 1
+            else:
+                views[i] = views[i][rc:]
+                rc = 0
+
+    if metrics.current is not None:
+        _recordSend(bytesSent, retries, timeouts)
+    return True
+
+def receiveBufferTcp(dataSocket: socket.socket, n: int, buffer: bytearray | memoryview = None) -> bytearray | memoryview | None:
+    if buffer is None:
+        buffer = bytearray(n)
+        view = memoryview(buffer)
+    else:
+        view = memoryview(buffer)[:n]
+        buffer = view
+
     bytesReceived = 0
-    buffer = bytearray()
-    
-    for _ in range(10):
-        if len(buffer) >= n:
-            break
-        data = None
+    timeouts = 0
+    while bytesReceived < n:
         try:
-            data = dataSocket.recv(n - bytesReceived)
+            rc = dataSocket.recv_into(view[bytesReceived:], n - bytesReceived)
         except socket.timeout:
+            timeouts += 1
+            if timeouts >= RECEIVE_TIMEOUT_RETRIES:
+                print("recv() timed out")
+                _recordReceive(bytesReceived, timeouts)
+                return None
             continue
         except socket.error as e:
             print(f"recv() failed [{e.errno}]")
+            _recordReceive(bytesReceived, timeouts)
+            return None
+
+        if rc == 0:
+            _recordReceive(bytesReceived, timeouts)
             return None
-        buffer.extend(data)
-        
-        bytesReceived += len(data)
-    return buffer
\ No newline at end of file
+
+        bytesReceived += rc
+
+    if metrics.current is not None:
+        _recordReceive(bytesReceived, timeouts)
+    return buffer
+
+class BufferPool:
+    def __init__(self, bufferSize: int, capacity: int = BUFFER_POOL_CAPACITY):
+        self.bufferSize = bufferSize
+        self.capacity = capacity
+        self.buffers = collections.deque()
+
+    def acquire(self, n: int = 0) -> bytearray:
+        if n > self.bufferSize:
+            return bytearray(n)
+
+        try:
+            return self.buffers.pop()
+        except IndexError:
+            return bytearray(self.bufferSize)
+
+    def release(self, buffer: bytearray):
+        if len(buffer) == self.bufferSize and len(self.buffers) < self.capacity:
+            self.buffers.append(buffer)
@@ -0,0 +1,156 @@
+from homelink_python import metrics
+from homelink_python.packet import AsyncEventType
+
+import collections
+import sys
+import threading
+import time
+
+NOTIFICATION_WORKERS = 4
+NOTIFICATION_QUEUE_SIZE = 1024
+NOTIFICATION_COALESCE_WINDOW = 0.05
+
+class Notification:
+    __slots__ = ("eventType", "tag", "payload", "count", "readyAt")
+
+    def __init__(self, eventType: int, tag: int, payload, readyAt: float):
+        self.eventType = eventType
+        self.tag = tag
+        self.payload = payload
+        self.count = 1
+        self.readyAt = readyAt
+
+class NotificationDispatcher:
+    # dispatch() never blocks the socket reader. An event merges into a
+    # queued one with the same (eventType, tag) that no worker has picked up
+    # yet, and is dropped when the queue is full. Queued events wait
+    # coalesceWindow seconds before they run so that duplicates can merge.
+    def __init__(
+        self,
+        workers: int = NOTIFICATION_WORKERS,
+        maxQueue: int = NOTIFICATION_QUEUE_SIZE,
+        coalesceWindow: float = NOTIFICATION_COALESCE_WINDOW,
+    ):
+        self.maxQueue = maxQueue
+        self.coalesceWindow = coalesceWindow
+        self.handlers = {}
+        self.queue = collections.deque()
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.active = True
+        self.busy = 0
+        self.queued = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.dispatched = 0
+        self.workerThreads = [
+            threading.Thread(target=self._work, name=f"homelink-notify-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self.workerThreads:
+            thread.start()
+
+    def subscribe(self, eventType: int, handler):
+        with self.condition:
+            self.handlers.setdefault(eventType, []).append(handler)
+
+    def unsubscribe(self, eventType: int, handler):
+        with self.condition:
+            handlers = self.handlers.get(eventType)
+            if handlers and handler in handlers:
+                handlers.remove(handler)
+
+    def _record(self, outcome: str, depth: int):
+        recorder = metrics.current
+        if recorder is None:
+            return
+
+        recorder.increment("notifications_total", 1, (("outcome", outcome),))
+        recorder.set("notification_queue_depth", depth)
+
+    def dispatch(self, eventType: int, tag: int, payload=None) -> bool:
+        key = (eventType, tag)
+        with self.condition:
+            if not self.active:
+                return False
+
+            notification = self.pending.get(key)
+            if notification is not None:
+                notification.count += 1
+                notification.payload = payload
+                self.coalesced += 1
+                outcome = "coalesced"
+            elif len(self.queue) >= self.maxQueue:
+                self.dropped += 1
+                outcome = "dropped"
+            else:
+                notification = Notification(eventType, tag, payload, time.monotonic() + self.coalesceWindow)
+                self.queue.append(notification)
+                self.pending[key] = notification
+                self.queued += 1
+                self.condition.notify()
+                outcome = "queued"
+            depth = len(self.queue)
+
+        self._record(outcome, depth)
+        return outcome != "dropped"
+
+    def queueDepth(self) -> int:
+        with self.condition:
+            return len(self.queue)
+
+    def _next(self) -> tuple[Notification, list] | None:
+        with self.condition:
+            while True:
+                if self.queue:
+                    delay = self.queue[0].readyAt - time.monotonic()
+                    if delay <= 0 or not self.active:
+                        break
+                    self.condition.wait(delay)
+                elif not self.active:
+                    return None
+                else:
+                    self.condition.wait()
+
+            notification = self.queue.popleft()
+            del self.pending[(notification.eventType, notification.tag)]
+            handlers = list(self.handlers.get(notification.eventType, ()))
+            if notification.eventType != AsyncEventType.ANY_EVENT:
+                handlers += self.handlers.get(AsyncEventType.ANY_EVENT, ())
+            self.busy += 1
+            depth = len(self.queue)
+
+        if metrics.current is not None:
+            metrics.current.set("notification_queue_depth", depth)
+        return notification, handlers
+
+    def _work(self):
+        while True:
+            work = self._next()
+            if work is None:
+                return
+
+            notification, handlers = work
+            for handler in handlers:
+                try:
+                    handler(notification)
+                except Exception as e:
+                    print(f"Notification handler failed [{e}]", file=sys.stderr)
+
+            with self.condition:
+                self.busy -= 1
+                self.dispatched += 1
+                self.condition.notify_all()
+            metrics.count("notifications_dispatched_total")
+
+    def drain(self, timeout: float = None) -> bool:
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.queue and not self.busy, timeout)
+
+    def close(self):
+        with self.condition:
+            self.active = False
+            self.condition.notify_all()
+
+        for thread in self.workerThreads:
+            if thread is not threading.current_thread():
+                thread.join()
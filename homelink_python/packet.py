@@ -1,8 +1,11 @@
-from homelink_python.net import sendBufferTcp, receiveBufferTcp
+from homelink_python import metrics
+from homelink_python.net import BufferPool, sendBufferTcp, receiveBufferTcp
 import socket
 import struct
 import sys
 
+PACKET_BUFFER_SIZE = 1024
+
 class PacketTypeException(Exception):
     pass
 
@@ -28,6 +31,8 @@ class PacketType:
     REGISTER_RESPONSE = 9
     LOGOUT = 10
     ASYNC_NOTIFICATION = 11
+    PIPELINED_COMMAND = 12
+    COMMAND_RESPONSE = 13
 
 class RegistrationType:
     HOST_REGISTRATION = 1
@@ -37,59 +42,78 @@ class AsyncEventType:
     FILE_EVENT = 1
     ANY_EVENT = 255
 
-class AckPacket:
+class Packet:
+    __slots__ = ()
+    packetType = None
+    byteFormat = None
+    codec = None
+
+    @classmethod
+    def size(cls) -> int:
+        return cls.codec.size
+
+class AckPacket(Packet):
+    __slots__ = ("value",)
+    packetType = PacketType.ACK
     byteFormat = "!BI"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, value: int):
-        self.packetType = PacketType.ACK
         self.value = value
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(AckPacket.byteFormat, packet.packetType, packet.value)
+    def serialize(packet) -> bytes:
+        return AckPacket.codec.pack(
+            packet.packetType,
+            packet.value,
+        )
 
     @staticmethod
-    def deserialize(buffer):
-        packetType, value = struct.unpack(AckPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, value = AckPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.ACK:
             raise PacketTypeException()
-        return ConnectionResponsePacket(value)
+        return AckPacket(value)
 
-class ConnectionRequestPacket:
+class ConnectionRequestPacket(Packet):
+    __slots__ = ("connectionId", "rsaPublicKey")
+    packetType = PacketType.KEY_REQUEST
     byteFormat = "!BI512s"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, connectionId: int, rsaPublicKey: str):
-        self.packetType = PacketType.KEY_REQUEST
         self.connectionId = connectionId
         self.rsaPublicKey = rsaPublicKey
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            ConnectionRequestPacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return ConnectionRequestPacket.codec.pack(
             packet.packetType,
             packet.connectionId,
             packet.rsaPublicKey.encode("utf-8"),
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, connectionId, rsaPublicKey = struct.unpack(ConnectionRequestPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, connectionId, rsaPublicKey = ConnectionRequestPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.KEY_REQUEST:
             raise PacketTypeException()
-        return ConnectionRequestPacket(connectionId, rsaPublicKey)
+        return ConnectionRequestPacket(connectionId, rsaPublicKey.decode("utf-8").rstrip("\x00"))
 
-
-class ConnectionResponsePacket:
+class ConnectionResponsePacket(Packet):
+    __slots__ = ("success", "rsaPublicKey", "aesKey")
+    packetType = PacketType.KEY_RESPONSE
     byteFormat = "BB512s256s"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, success: bool, rsaPublicKey: str, aesKey: bytearray):
-        self.packetType = PacketType.KEY_RESPONSE
         self.success = success
         self.rsaPublicKey = rsaPublicKey
         self.aesKey = aesKey
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            ConnectionResponsePacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return ConnectionResponsePacket.codec.pack(
             packet.packetType,
             1 if packet.success else 0,
             packet.rsaPublicKey.encode("utf8"),
@@ -97,196 +121,363 @@ class ConnectionResponsePacket:
         )
 
     @staticmethod
-    def deserialize(buffer):
-        packetType, success, rsaPublicKey, aesKey = struct.unpack(ConnectionResponsePacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, success, rsaPublicKey, aesKey = ConnectionResponsePacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.KEY_RESPONSE:
             raise PacketTypeException()
         return ConnectionResponsePacket(success == 1, rsaPublicKey.decode("utf-8"), aesKey)
 
-class CommandPacket:
+class CommandPacket(Packet):
+    __slots__ = ("connectionId", "sessionToken", "data")
+    packetType = PacketType.COMMAND
     byteFormat = "!BI80s256s"
+    headerFormat = "!BI"
+    codec = struct.Struct(byteFormat)
+    headerCodec = struct.Struct(headerFormat)
+
     def __init__(self, connectionId: int, sessionToken: bytearray, data: bytearray):
-        self.packetType = PacketType.COMMAND
         self.connectionId = connectionId
         self.sessionToken = sessionToken
         self.data = data
-    
-    @staticmethod
-    def size():
-        return struct.calcsize(CommandPacket.byteFormat)
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            CommandPacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return CommandPacket.codec.pack(
             packet.packetType,
             packet.connectionId,
             packet.sessionToken,
-            packet.data
+            packet.data,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, connectionId, sessionToken, data = struct.unpack(CommandPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, connectionId, sessionToken, data = CommandPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.COMMAND:
             raise PacketTypeException()
         return CommandPacket(connectionId, sessionToken, data)
 
-class LoginRequestPacket:
+    @staticmethod
+    def serializeBuffers(connectionId: int, sessionToken: list, data: list) -> list:
+        return [CommandPacket.headerCodec.pack(PacketType.COMMAND, connectionId), *sessionToken, *data]
+
+class PipelinedCommandPacket(Packet):
+    __slots__ = ("connectionId", "requestId", "sessionToken", "data")
+    packetType = PacketType.PIPELINED_COMMAND
+    byteFormat = "!BII80s256s"
+    headerFormat = "!BII"
+    codec = struct.Struct(byteFormat)
+    headerCodec = struct.Struct(headerFormat)
+
+    def __init__(self, connectionId: int, requestId: int, sessionToken: bytearray, data: bytearray):
+        self.connectionId = connectionId
+        self.requestId = requestId
+        self.sessionToken = sessionToken
+        self.data = data
+
+    @staticmethod
+    def serialize(packet) -> bytes:
+        return PipelinedCommandPacket.codec.pack(
+            packet.packetType,
+            packet.connectionId,
+            packet.requestId,
+            packet.sessionToken,
+            packet.data,
+        )
+
+    @staticmethod
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, connectionId, requestId, sessionToken, data = PipelinedCommandPacket.codec.unpack_from(buffer, offset)
+        if packetType != PacketType.PIPELINED_COMMAND:
+            raise PacketTypeException()
+        return PipelinedCommandPacket(connectionId, requestId, sessionToken, data)
+
+    @staticmethod
+    def serializeBuffers(connectionId: int, requestId: int, sessionToken: list, data: list) -> list:
+        return [
+            PipelinedCommandPacket.headerCodec.pack(PacketType.PIPELINED_COMMAND, connectionId, requestId),
+            *sessionToken,
+            *data,
+        ]
+
+class CommandResponsePacket(Packet):
+    __slots__ = ("requestId", "status")
+    packetType = PacketType.COMMAND_RESPONSE
+    byteFormat = "!BIB"
+    codec = struct.Struct(byteFormat)
+
+    def __init__(self, requestId: int, status: int):
+        self.requestId = requestId
+        self.status = status
+
+    @staticmethod
+    def serialize(packet) -> bytes:
+        return CommandResponsePacket.codec.pack(
+            packet.packetType,
+            packet.requestId,
+            packet.status,
+        )
+
+    @staticmethod
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, requestId, status = CommandResponsePacket.codec.unpack_from(buffer, offset)
+        if packetType != PacketType.COMMAND_RESPONSE:
+            raise PacketTypeException()
+        return CommandResponsePacket(requestId, status)
+
+class LoginRequestPacket(Packet):
+    __slots__ = ("connectionId", "hostId", "serviceId", "data")
+    packetType = PacketType.LOGIN_REQUEST
     byteFormat = "!BI33s33s256s"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, connectionId: int, hostId: str, serviceId: str, data: bytearray):
-        self.packetType = PacketType.LOGIN_REQUEST
         self.connectionId = connectionId
         self.hostId = hostId
         self.serviceId = serviceId
         self.data = data
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            LoginRequestPacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return LoginRequestPacket.codec.pack(
             packet.packetType,
             packet.connectionId,
             packet.hostId.encode("UTF-8"),
             packet.serviceId.encode("UTF-8"),
-            packet.data
+            packet.data,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, connectionId, hostId, serviceId, data = struct.unpack(LoginRequestPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, connectionId, hostId, serviceId, data = LoginRequestPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.LOGIN_REQUEST:
             raise PacketTypeException()
-        return LoginRequestPacket(connectionId, hostId, serviceId, data)
+        return LoginRequestPacket(
+            connectionId, hostId.decode("UTF-8").rstrip("\x00"), serviceId.decode("UTF-8").rstrip("\x00"), data
+        )
 
-class LoginResponsePacket:
+class LoginResponsePacket(Packet):
+    __slots__ = ("status", "sessionKey")
+    packetType = PacketType.LOGIN_RESPONSE
     byteFormat = "!BB80s"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, status: bool, sessionKey: bytearray):
-        self.packetType = PacketType.LOGIN_RESPONSE
         self.status = status
         self.sessionKey = sessionKey
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            LoginResponsePacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return LoginResponsePacket.codec.pack(
             packet.packetType,
             packet.status,
-            packet.sessionKey
+            packet.sessionKey,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, status, sessionKey = struct.unpack(LoginResponsePacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, status, sessionKey = LoginResponsePacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.LOGIN_RESPONSE:
             raise PacketTypeException()
         return LoginResponsePacket(status, sessionKey)
 
-class RegisterRequestPacket:
+class RegisterRequestPacket(Packet):
+    __slots__ = ("registrationType", "hostId", "serviceId", "data")
+    packetType = PacketType.REGISTER_REQUEST
     byteFormat = "BB33s33s256s"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, registrationType: int, hostId: str, serviceId: str, data: bytearray):
-        self.packetType = PacketType.REGISTER_REQUEST
         self.registrationType = registrationType
         self.hostId = hostId
         self.serviceId = serviceId
         self.data = data
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            RegisterRequestPacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return RegisterRequestPacket.codec.pack(
             packet.packetType,
             packet.registrationType,
             packet.hostId.encode("UTF-8"),
             packet.serviceId.encode("UTF-8"),
-            packet.data
+            packet.data,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, registrationType, hostId, serviceId, sessionKey = struct.unpack(RegisterRequestPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, registrationType, hostId, serviceId, data = RegisterRequestPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.REGISTER_REQUEST:
             raise PacketTypeException()
-        return RegisterRequestPacket(registrationType, hostId, serviceId, sessionKey)
-
+        return RegisterRequestPacket(
+            registrationType, hostId.decode("UTF-8").rstrip("\x00"), serviceId.decode("UTF-8").rstrip("\x00"), data
+        )
 
-class RegisterResponsePacket:
+class RegisterResponsePacket(Packet):
+    __slots__ = ("status",)
+    packetType = PacketType.REGISTER_RESPONSE
     byteFormat = "!BB"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, status: bool):
-        self.packetType = PacketType.REGISTER_RESPONSE
         self.status = status
 
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            RegisterResponsePacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return RegisterResponsePacket.codec.pack(
             packet.packetType,
-            packet.status
+            packet.status,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, status = struct.unpack(RegisterResponsePacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, status = RegisterResponsePacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.REGISTER_RESPONSE:
             raise PacketTypeException()
         return RegisterResponsePacket(status)
 
-class LogoutPacket:
+class LogoutPacket(Packet):
+    __slots__ = ("connectionId", "data")
+    packetType = PacketType.LOGOUT
     byteFormat = "!BI256s"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, connectionId: int, data: bytearray):
-        self.packetType = PacketType.LOGOUT
         self.connectionId = connectionId
         self.data = data
-    
+
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            LogoutPacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return LogoutPacket.codec.pack(
             packet.packetType,
             packet.connectionId,
-            packet.data
+            packet.data,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, connectionId, data = struct.unpack(LogoutPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, connectionId, data = LogoutPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.LOGOUT:
             raise PacketTypeException()
         return LogoutPacket(connectionId, data)
 
-class AsyncNotificationPacket:
+class AsyncNotificationPacket(Packet):
+    __slots__ = ("eventType", "tag")
+    packetType = PacketType.ASYNC_NOTIFICATION
     byteFormat = "!BBI"
+    codec = struct.Struct(byteFormat)
+
     def __init__(self, eventType: int, tag: int):
-        self.packetType = PacketType.ASYNC_NOTIFICATION
         self.eventType = eventType
         self.tag = tag
-    
+
     @staticmethod
-    def serialize(packet):
-        return struct.pack(
-            AsyncNotificationPacket.byteFormat,
+    def serialize(packet) -> bytes:
+        return AsyncNotificationPacket.codec.pack(
             packet.packetType,
             packet.eventType,
-            packet.tag
+            packet.tag,
         )
 
     @staticmethod
-    def deserialize(buffer: bytearray):
-        packetType, eventType, tag = struct.unpack(AsyncNotificationPacket.byteFormat, buffer)
+    def deserialize(buffer: bytes | bytearray | memoryview, offset: int = 0):
+        packetType, eventType, tag = AsyncNotificationPacket.codec.unpack_from(buffer, offset)
         if packetType != PacketType.ASYNC_NOTIFICATION:
             raise PacketTypeException()
         return AsyncNotificationPacket(eventType, tag)
 
+PACKET_CLASSES = {
+    PacketClass.packetType: PacketClass
+    for PacketClass in [
+        AckPacket,
+        ConnectionRequestPacket,
+        ConnectionResponsePacket,
+        CommandPacket,
+        PipelinedCommandPacket,
+        CommandResponsePacket,
+        LoginRequestPacket,
+        LoginResponsePacket,
+        RegisterRequestPacket,
+        RegisterResponsePacket,
+        LogoutPacket,
+        AsyncNotificationPacket,
+    ]
+}
+
+PACKET_TYPE_NAMES = {value: name for name, value in vars(PacketType).items() if name.isupper()}
+
+_packetBuffers = BufferPool(PACKET_BUFFER_SIZE)
+
+def recordPacket(direction: str, packetType: int):
+    if metrics.current is not None:
+        metrics.current.increment(
+            f"packets_{direction}_total", 1, (("type", PACKET_TYPE_NAMES.get(packetType, str(packetType))),)
+        )
+
 def sendPacket(dataSocket: socket.socket, packet) -> bool:
     status = sendBufferTcp(dataSocket, packet.__class__.serialize(packet))
     if not status:
         print("sendBufferTcp() failed", file=sys.stderr)
+    elif metrics.current is not None:
+        recordPacket("sent", packet.packetType)
     return status
 
-def recvPacket(dataSocket: socket.socket, PacketClass: type) -> bytearray | None:
-    data = receiveBufferTcp(dataSocket, struct.calcsize(PacketClass.byteFormat))
-    if not data:
-        print("recvBufferTcp() failed", file=sys.stderr)
+def recvPacket(dataSocket: socket.socket, PacketClass: type) -> Packet | None:
+    buffer = _packetBuffers.acquire(PacketClass.codec.size)
+    try:
+        data = receiveBufferTcp(dataSocket, PacketClass.codec.size, buffer)
+        if not data:
+            print("recvBufferTcp() failed", file=sys.stderr)
+            return None
+
+        if metrics.current is not None:
+            recordPacket("received", PacketClass.packetType)
+        return PacketClass.deserialize(data)
+    finally:
+        _packetBuffers.release(buffer)
+
+def recvAnyPacket(dataSocket: socket.socket) -> Packet | None:
+    buffer = _packetBuffers.acquire()
+    try:
+        view = memoryview(buffer)
+        if not receiveBufferTcp(dataSocket, 1, view):
+            print("recvBufferTcp() failed", file=sys.stderr)
+            return None
+
+        PacketClass = PACKET_CLASSES.get(buffer[0])
+        if PacketClass is None:
+            print(f"Unknown packet type {buffer[0]}", file=sys.stderr)
+            return None
+
+        if not receiveBufferTcp(dataSocket, PacketClass.codec.size - 1, view[1:]):
+            print("recvBufferTcp() failed", file=sys.stderr)
+            return None
+
+        if metrics.current is not None:
+            recordPacket("received", PacketClass.packetType)
+        return PacketClass.deserialize(buffer)
+    finally:
+        _packetBuffers.release(buffer)
+
+async def sendPacketAsync(writer: "asyncio.StreamWriter", packet) -> bool:
+    try:
+        writer.write(packet.__class__.serialize(packet))
+        await writer.drain()
+    except ConnectionError as e:
+        print(f"sendPacketAsync() failed [{e}]", file=sys.stderr)
+        return False
+
+    recordPacket("sent", packet.packetType)
+    metrics.count("bytes_sent_total", packet.codec.size)
+    return True
+
+async def recvPacketAsync(reader: "asyncio.StreamReader", PacketClass: type) -> Packet | None:
+    import asyncio
+
+    try:
+        data = await reader.readexactly(PacketClass.codec.size)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        print("recvPacketAsync() failed", file=sys.stderr)
         return None
-    
-    return PacketClass.deserialize(data)
\ No newline at end of file
+
+    recordPacket("received", PacketClass.packetType)
+    metrics.count("bytes_received_total", len(data))
+    return PacketClass.deserialize(data)
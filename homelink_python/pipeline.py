@@ -0,0 +1,114 @@
+from homelink_python import metrics
+from homelink_python.net import sendBuffersTcp
+
+from homelink_python.packet import CommandResponsePacket, PipelinedCommandPacket, recvPacket
+
+import concurrent.futures
+import sys
+import threading
+
+class CommandPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.pending = {}
+        self.outgoing = []
+        self.outgoingPackets = 0
+        self.lock = threading.Lock()
+        self.drained = threading.Condition(self.lock)
+        self.flushing = False
+        self.reading = False
+        self.nextRequestId = 1
+
+    def _failPending(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            self.outgoing = []
+            self.outgoingPackets = 0
+            self.reading = False
+            self.drained.notify_all()
+
+        for future in pending.values():
+            future.set_result(False)
+
+    def _readResponses(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.reading = False
+                    self.drained.notify_all()
+                    return
+
+            try:
+                commandResponsePacket = recvPacket(self.client.syncSocket, CommandResponsePacket)
+            except Exception as e:
+                print(f"_readResponses() failed [{e!r}]", file=sys.stderr)
+                commandResponsePacket = None
+            if not commandResponsePacket:
+                self._failPending()
+                return
+
+            with self.lock:
+                future = self.pending.pop(commandResponsePacket.requestId, None)
+            if future is not None:
+                future.set_result(bool(commandResponsePacket.status))
+
+    def idle(self) -> bool:
+        with self.lock:
+            return not self.pending and not self.reading
+
+    def waitDrained(self):
+        with self.drained:
+            self.drained.wait_for(lambda: not self.pending and not self.reading)
+
+    def enqueue(self, encryptedCommands: list) -> list:
+        futures = []
+
+        # Commands queued while another thread is writing go out with that
+        # thread's next sendmsg(), so bursts share socket writes.
+        with self.lock:
+            for encryptedCommand in encryptedCommands:
+                future = concurrent.futures.Future()
+                futures.append(future)
+                if encryptedCommand is None:
+                    future.set_result(False)
+                    continue
+
+                requestId = self.nextRequestId
+                self.nextRequestId = (self.nextRequestId + 1) & 0xFFFFFFFF or 1
+                self.pending[requestId] = future
+                self.outgoing.extend(
+                    PipelinedCommandPacket.serializeBuffers(self.client.connectionId, requestId, *encryptedCommand)
+                )
+                self.outgoingPackets += 1
+
+            if self.pending and not self.reading:
+                self.reading = True
+                threading.Thread(target=self._readResponses, name="homelink-pipeline", daemon=True).start()
+
+        return futures
+
+    def flush(self):
+        with self.lock:
+            if self.flushing:
+                return
+            self.flushing = True
+
+        while True:
+            with self.lock:
+                buffers = self.outgoing
+                packets = self.outgoingPackets
+                self.outgoing = []
+                self.outgoingPackets = 0
+                if not buffers:
+                    self.flushing = False
+                    return
+
+            if not sendBuffersTcp(self.client.syncSocket, buffers):
+                print("sendBuffersTcp() failed", file=sys.stderr)
+                with self.lock:
+                    self.flushing = False
+                self._failPending()
+                return
+
+            metrics.count("packets_sent_total", packets, (("type", "PIPELINED_COMMAND"),))
@@ -0,0 +1,155 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.packet import LoginStatus
+
+import collections
+import contextlib
+import sys
+import threading
+import time
+
+POOL_MAX_SIZE = 4
+POOL_MAX_IDLE_TIME = 300.0
+POOL_HEALTH_CHECK_AGE = 30.0
+
+class HomeLinkPoolException(Exception):
+    pass
+
+class HomeLinkClientPool:
+    def __init__(
+        self,
+        serverIpAddress: str,
+        serverPort: int,
+        maxSize: int = POOL_MAX_SIZE,
+        maxIdleTime: float = POOL_MAX_IDLE_TIME,
+        healthCheckAge: float = POOL_HEALTH_CHECK_AGE,
+        keyProvider=None,
+    ):
+        self.serverIpAddress = serverIpAddress
+        self.serverPort = serverPort
+        self.maxSize = maxSize
+        self.maxIdleTime = maxIdleTime
+        self.healthCheckAge = healthCheckAge
+        self.keyProvider = keyProvider or SharedKeyProvider()
+        self.idle = collections.defaultdict(list)
+        self.sizes = collections.Counter()
+        self.condition = threading.Condition()
+        self.active = True
+
+    def _login(self, client: HomeLinkClient, password: str) -> bool:
+        if not client.connect():
+            return False
+
+        return client.login(password) == LoginStatus.LOGIN_SUCCESS
+
+    def _discard(self, client: HomeLinkClient, logout: bool):
+        if logout and client.active and client.sessionKey:
+            client.logout()
+        client.destruct()
+
+    def _evictIdle(self, now: float) -> list:
+        evicted = []
+        for key, entries in self.idle.items():
+            while entries and now - entries[0][1] > self.maxIdleTime:
+                evicted.append(entries.pop(0)[0])
+                self.sizes[key] -= 1
+
+        if evicted:
+            self.condition.notify_all()
+        return evicted
+
+    def acquire(self, hostId: str, serviceId: str, password: str, timeout: float = None) -> HomeLinkClient | None:
+        key = (hostId, serviceId)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.condition:
+            while True:
+                if not self.active:
+                    return None
+
+                evicted = self._evictIdle(time.monotonic())
+                if self.idle[key]:
+                    client, lastUsed = self.idle[key].pop()
+                    break
+
+                if self.sizes[key] < self.maxSize:
+                    self.sizes[key] += 1
+                    client, lastUsed = None, None
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    print(f"No free session for {hostId}/{serviceId}", file=sys.stderr)
+                    return None
+                self.condition.wait(remaining)
+
+        for evictedClient in evicted:
+            self._discard(evictedClient, True)
+
+        # The slot is taken before the session exists, so it is given back
+        # if building or checking the session raises.
+        try:
+            if client is None:
+                client = HomeLinkClient(hostId, serviceId, self.serverIpAddress, self.serverPort, self.keyProvider)
+                healthy = self._login(client, password)
+            elif time.monotonic() - lastUsed > self.healthCheckAge:
+                healthy = client.ping() or self._login(client, password)
+            else:
+                healthy = True
+        except Exception:
+            if client is not None:
+                self._release(client, False)
+            else:
+                with self.condition:
+                    self.sizes[key] -= 1
+                    self.condition.notify()
+            raise
+
+        if not healthy:
+            self._release(client, False)
+            return None
+
+        return client
+
+    def _release(self, client: HomeLinkClient, healthy: bool):
+        key = (client.hostId, client.serviceId)
+        with self.condition:
+            if healthy and self.active:
+                self.idle[key].append((client, time.monotonic()))
+                self.condition.notify()
+                return
+
+            self.sizes[key] -= 1
+            self.condition.notify()
+
+        self._discard(client, False)
+
+    def release(self, client: HomeLinkClient, healthy: bool = True):
+        self._release(client, healthy and client.active)
+
+    @contextlib.contextmanager
+    def session(self, hostId: str, serviceId: str, password: str, timeout: float = None):
+        client = self.acquire(hostId, serviceId, password, timeout)
+        if client is None:
+            raise HomeLinkPoolException(f"Could not get a session for {hostId}/{serviceId}")
+
+        healthy = True
+        try:
+            yield client
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.release(client, healthy)
+
+    def close(self):
+        with self.condition:
+            self.active = False
+            clients = [client for entries in self.idle.values() for client, _ in entries]
+            for key, entries in self.idle.items():
+                self.sizes[key] -= len(entries)
+            self.idle.clear()
+            self.condition.notify_all()
+
+        for client in clients:
+            self._discard(client, True)
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+import threading
+import time
+
+SESSION_CACHE_TTL = 600.0
+
+def _defaultCacheDirectory() -> str:
+    return os.path.join(os.path.expanduser("~"), ".config", "homelink")
+
+class SessionState:
+    def __init__(self, connectionId: int, aesKey: bytes, sessionKey: str, serverPublicKey: str, expiresAt: float):
+        self.connectionId = connectionId
+        self.aesKey = aesKey
+        self.sessionKey = sessionKey
+        self.serverPublicKey = serverPublicKey
+        self.expiresAt = expiresAt
+
+    def toDict(self) -> dict:
+        return {
+            "connectionId": self.connectionId,
+            "aesKey": self.aesKey.hex(),
+            "sessionKey": self.sessionKey,
+            "serverPublicKey": self.serverPublicKey,
+            "expiresAt": self.expiresAt,
+        }
+
+    @staticmethod
+    def fromDict(data: dict):
+        return SessionState(
+            data["connectionId"],
+            bytes.fromhex(data["aesKey"]),
+            data["sessionKey"],
+            data["serverPublicKey"],
+            data["expiresAt"],
+        )
+
+class MemorySessionCache:
+    def __init__(self, ttl: float = SESSION_CACHE_TTL):
+        self.ttl = ttl
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def load(self, key: str) -> SessionState | None:
+        with self.lock:
+            state = self.sessions.get(key)
+            if state is not None and state.expiresAt <= time.time():
+                del self.sessions[key]
+                return None
+            return state
+
+    def store(self, key: str, connectionId: int, aesKey: bytes, sessionKey: str, serverPublicKey: str):
+        with self.lock:
+            self.sessions[key] = SessionState(connectionId, bytes(aesKey), sessionKey, serverPublicKey, time.time() + self.ttl)
+
+    def remove(self, key: str):
+        with self.lock:
+            self.sessions.pop(key, None)
+
+class FileSessionCache(MemorySessionCache):
+    # Like the client key, the cache is protected by its 0600 mode alone: a
+    # key to encrypt it would have to sit next to it with the same mode.
+    # Caching is best-effort, so I/O errors never fail a login.
+    def __init__(self, cacheFilePath: str = None, ttl: float = SESSION_CACHE_TTL):
+        super().__init__(ttl)
+        directory = os.path.dirname(cacheFilePath) if cacheFilePath else _defaultCacheDirectory()
+        self.cacheFilePath = cacheFilePath or os.path.join(directory, "sessions.cache")
+        self.loaded = False
+
+    def _read(self):
+        self.loaded = True
+        try:
+            if os.stat(self.cacheFilePath).st_mode & 0o077:
+                print(f"{self.cacheFilePath} is accessible by other users, ignoring it", file=sys.stderr)
+                return
+
+            with open(self.cacheFilePath, "r") as cacheFile:
+                entries = json.load(cacheFile)
+            states = [(key, SessionState.fromDict(entry)) for key, entry in entries.items()]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Ignoring unreadable session cache {self.cacheFilePath} [{e}]", file=sys.stderr)
+            return
+
+        now = time.time()
+        for key, state in states:
+            if state.expiresAt > now:
+                self.sessions[key] = state
+
+    def _write(self):
+        data = json.dumps({key: state.toDict() for key, state in self.sessions.items()})
+        tempPath = f"{self.cacheFilePath}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cacheFilePath), mode=0o700, exist_ok=True)
+            fd = os.open(tempPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as cacheFile:
+                cacheFile.write(data)
+            os.chmod(tempPath, 0o600)
+            os.replace(tempPath, self.cacheFilePath)
+        except OSError as e:
+            print(f"Could not write session cache {self.cacheFilePath} [{e.errno}]", file=sys.stderr)
+
+    def _ensureLoaded(self):
+        with self.lock:
+            if not self.loaded:
+                self._read()
+
+    def load(self, key: str) -> SessionState | None:
+        self._ensureLoaded()
+        return super().load(key)
+
+    def store(self, key: str, connectionId: int, aesKey: bytes, sessionKey: str, serverPublicKey: str):
+        self._ensureLoaded()
+        super().store(key, connectionId, aesKey, sessionKey, serverPublicKey)
+        with self.lock:
+            self._write()
+
+    def remove(self, key: str):
+        self._ensureLoaded()
+        super().remove(key)
+        with self.lock:
+            self._write()
@@ -1,11 +1,18 @@
+from homelink_python import metrics
+
 from Crypto import Random
 from Crypto.Cipher import PKCS1_OAEP, AES
 from Crypto.Hash import SHA256
 from Crypto.PublicKey import RSA
 
+import threading
+
 RSA_KEY_SIZE = 2048
 AES_KEY_SIZE = 256
 SESSION_KEY_SIZE = 48
+AES_IV_SIZE = 16
+AES_TAG_SIZE = 16
+KEY_CACHE_SIZE = 64
 
 
 def randomBytes(n: int):
@@ -13,7 +20,16 @@ def randomBytes(n: int):
 
 
 def generateRSAKeys():
-    return RSA.generate(RSA_KEY_SIZE)
+    with metrics.cryptoTimer("rsa_keygen"):
+        return RSA.generate(RSA_KEY_SIZE)
+
+
+def exportRSAKeys(keypair) -> str:
+    return keypair.exportKey("PEM").decode("UTF-8")
+
+
+def importRSAKeys(key: str):
+    return RSA.importKey(key)
 
 
 def getRSAPublicKey(keypair) -> str:
@@ -24,7 +40,18 @@ def printRSAPublicKey(keypair):
     print(getRSAPublicKey(keypair))
 
 
+def _recordAes(operation: str, n: int, blocks: int = 1):
+    recorder = metrics.current
+    if recorder is None:
+        return
+
+    recorder.increment("crypto_operations_total", blocks, (("op", operation),))
+    recorder.increment("crypto_bytes_total", n, (("op", operation),))
+
+
 def aesEncrypt(data, key, iv):
+    if metrics.current is not None:
+        _recordAes("aes_encrypt", len(data))
     cipher = AES.new(key, AES.MODE_GCM, nonce=iv)
 
     temp = cipher.encrypt_and_digest(data)
@@ -33,25 +60,33 @@ def aesEncrypt(data, key, iv):
     return temp
 
 
-def aesDecrypt(data, key, iv, tag):
+def aesDecrypt(data, key, iv, tag, output=None):
+    if metrics.current is not None:
+        _recordAes("aes_decrypt", len(data))
     cipher = AES.new(key, AES.MODE_GCM, nonce=iv)
 
+    if output is not None:
+        cipher.decrypt_and_verify(data, tag, output=output)
+        return output
+
     temp = cipher.decrypt_and_verify(data, tag)
 
     return bytearray(temp) if temp else None
 
 
 def rsaEncrypt(data: bytearray | bytes, key: str):
-    pubkey = RSA.importKey(key)
-    cipher = PKCS1_OAEP.new(pubkey)
+    with metrics.cryptoTimer("rsa_encrypt"):
+        pubkey = RSA.importKey(key)
+        cipher = PKCS1_OAEP.new(pubkey)
 
-    return bytearray(cipher.encrypt(data))
+        return bytearray(cipher.encrypt(data))
 
 
 def rsaDecrypt(data, keypair):
-    cipher = PKCS1_OAEP.new(keypair)
+    with metrics.cryptoTimer("rsa_decrypt"):
+        cipher = PKCS1_OAEP.new(keypair)
 
-    return bytearray(cipher.decrypt(data))
+        return bytearray(cipher.decrypt(data))
 
 def encryptSessionKey(sessionKey: str, aesKey: bytearray | bytes): 
     sessionKeyBytes = bytearray(sessionKey.encode("UTF-8"))
@@ -79,3 +114,141 @@ def hashString(string: str):
     sha256_hash = hash_object.hexdigest()
 
     return sha256_hash
+
+
+def hashBytes(data: bytes | bytearray | memoryview) -> bytes:
+    return SHA256.new(data=data).digest()
+
+
+def hashChunks(chunks) -> bytes:
+    hashObject = SHA256.new()
+    for chunk in chunks:
+        hashObject.update(chunk)
+
+    return hashObject.digest()
+
+
+# Sessions against the same server, and sessions sharing a keypair, share
+# one parsed key and OAEP cipher; both ciphers are stateless between calls.
+_serverKeys = {}
+_clientIdentities = {}
+_keyCacheLock = threading.Lock()
+
+def _serverKey(serverPublicKey: str) -> tuple[str, object]:
+    entry = _serverKeys.get(serverPublicKey)
+    if entry is not None:
+        return entry
+
+    cipher = PKCS1_OAEP.new(RSA.importKey(serverPublicKey))
+    with _keyCacheLock:
+        if len(_serverKeys) >= KEY_CACHE_SIZE:
+            _serverKeys.clear()
+        return _serverKeys.setdefault(serverPublicKey, (serverPublicKey, cipher))
+
+class ClientIdentity:
+    __slots__ = ("keypair", "publicKey", "cipher")
+
+    def __init__(self, keypair):
+        self.keypair = keypair
+        self.publicKey = getRSAPublicKey(keypair)
+        self.cipher = PKCS1_OAEP.new(keypair)
+
+def clientIdentity(keypair) -> ClientIdentity:
+    identity = _clientIdentities.get(id(keypair))
+    if identity is not None and identity.keypair is keypair:
+        return identity
+
+    identity = ClientIdentity(keypair)
+    with _keyCacheLock:
+        if len(_clientIdentities) >= KEY_CACHE_SIZE:
+            _clientIdentities.clear()
+        _clientIdentities[id(keypair)] = identity
+    return identity
+
+class CryptoContext:
+    __slots__ = ("serverPublicKey", "serverRsaCipher", "clientRsaCipher", "aesKey", "sessionKey", "sessionKeyBytes")
+
+    def __init__(self, serverPublicKey: str = None, aesKey: bytearray | bytes = None, sessionKey: str = None, keypair=None):
+        self.serverPublicKey = None
+        self.serverRsaCipher = None
+        self.clientRsaCipher = None
+        self.aesKey = None
+        self.sessionKey = None
+        self.sessionKeyBytes = None
+
+        self.setServerPublicKey(serverPublicKey)
+        self.setAesKey(aesKey)
+        self.setSessionKey(sessionKey)
+        self.setKeypair(keypair)
+
+    def setServerPublicKey(self, serverPublicKey: str):
+        entry = _serverKeys.get(serverPublicKey) if serverPublicKey is not None else None
+        self.serverPublicKey, self.serverRsaCipher = entry or (serverPublicKey, None)
+
+    def setKeypair(self, keypair):
+        self.clientRsaCipher = clientIdentity(keypair).cipher if keypair is not None else None
+
+    def setAesKey(self, aesKey: bytearray | bytes):
+        self.aesKey = bytes(aesKey) if aesKey is not None else None
+
+    def setSessionKey(self, sessionKey: str):
+        self.sessionKey = sessionKey
+        if sessionKey is None:
+            self.sessionKeyBytes = None
+            return
+
+        sessionKeyBytes = sessionKey.encode("UTF-8")
+        self.sessionKeyBytes = sessionKeyBytes + bytes(SESSION_KEY_SIZE - len(sessionKeyBytes))
+
+    def rsaEncrypt(self, data: bytearray | bytes) -> bytearray:
+        with metrics.cryptoTimer("rsa_encrypt"):
+            if self.serverRsaCipher is None:
+                self.serverPublicKey, self.serverRsaCipher = _serverKey(self.serverPublicKey)
+
+            return bytearray(self.serverRsaCipher.encrypt(data))
+
+    def rsaDecrypt(self, data: bytearray | bytes) -> bytearray:
+        with metrics.cryptoTimer("rsa_decrypt"):
+            return bytearray(self.clientRsaCipher.decrypt(data))
+
+    def aesEncrypt(self, data: bytearray | bytes, iv: bytearray | bytes) -> tuple[bytearray, bytearray]:
+        if metrics.current is not None:
+            _recordAes("aes_encrypt", len(data))
+        ciphertext, tag = AES.new(self.aesKey, AES.MODE_GCM, nonce=iv).encrypt_and_digest(data)
+        return bytearray(ciphertext), bytearray(tag)
+
+    def aesDecrypt(self, data: bytearray | bytes, iv: bytearray | bytes, tag: bytearray | bytes) -> bytearray:
+        if metrics.current is not None:
+            _recordAes("aes_decrypt", len(data))
+        return bytearray(AES.new(self.aesKey, AES.MODE_GCM, nonce=iv).decrypt_and_verify(data, tag))
+
+    def encryptSessionKeyBuffers(self) -> list:
+        if metrics.current is not None:
+            _recordAes("aes_encrypt", SESSION_KEY_SIZE)
+        iv = Random.get_random_bytes(AES_IV_SIZE)
+        ciphertext, tag = AES.new(self.aesKey, AES.MODE_GCM, nonce=iv).encrypt_and_digest(self.sessionKeyBytes)
+
+        return [ciphertext, iv, tag]
+
+    def encryptSessionKey(self) -> bytearray:
+        return bytearray(b"".join(self.encryptSessionKeyBuffers()))
+
+    def aesEncryptBatch(self, blocks: list) -> list[tuple[bytearray, bytearray, bytearray]]:
+        if metrics.current is not None:
+            _recordAes("aes_encrypt", sum(len(block) for block in blocks), len(blocks))
+        ivs = Random.get_random_bytes(AES_IV_SIZE * len(blocks))
+        results = []
+        for i, block in enumerate(blocks):
+            iv = ivs[i * AES_IV_SIZE:(i + 1) * AES_IV_SIZE]
+            ciphertext, tag = AES.new(self.aesKey, AES.MODE_GCM, nonce=iv).encrypt_and_digest(block)
+            results.append((bytearray(ciphertext), bytearray(iv), bytearray(tag)))
+
+        return results
+
+    def aesDecryptBatch(self, blocks: list) -> list[bytearray]:
+        if metrics.current is not None:
+            _recordAes("aes_decrypt", sum(len(block[0]) for block in blocks), len(blocks))
+        return [
+            bytearray(AES.new(self.aesKey, AES.MODE_GCM, nonce=iv).decrypt_and_verify(ciphertext, tag))
+            for ciphertext, iv, tag in blocks
+        ]
@@ -0,0 +1,131 @@
+from homelink_python.net import _forgetParentDirectory, _makeParentDirectory
+
+import bisect
+import os
+import sys
+
+SINK_TEMP_SUFFIX = ".homelink-tmp"
+
+class FileSink:
+    # Received blocks go into a hidden temporary file next to the target,
+    # preallocated to the announced size so that blocks can be written at
+    # their offsets in any order. Written ranges are tracked so that a
+    # replayed or overlapping block is refused and commit() only accepts a
+    # file with every byte written. commit() syncs it once, renames it over
+    # the target and syncs the directory; abort() removes it.
+    def __init__(self, localPath: str, fileSize: int, fsync: bool = True):
+        self.localPath = localPath
+        self.fileSize = fileSize
+        self.fsync = fsync
+        self.bytesWritten = 0
+        self.blockStarts = []
+        self.blockEnds = []
+        self.fd = None
+        directory, name = os.path.split(localPath)
+        self.tempPath = os.path.join(directory, f".{name}.{os.urandom(4).hex()}{SINK_TEMP_SUFFIX}")
+
+    def open(self) -> bool:
+        try:
+            try:
+                self.fd = os.open(self.tempPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            except FileNotFoundError:
+                # The cached parent directory was removed since it was made.
+                _forgetParentDirectory(self.localPath)
+                _makeParentDirectory(self.localPath)
+                self.fd = os.open(self.tempPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except OSError as e:
+            print(f"open() failed [{e.errno}]", file=sys.stderr)
+            return False
+
+        if self.fileSize and not self._preallocate():
+            self.abort()
+            return False
+
+        return True
+
+    def _preallocate(self) -> bool:
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.fd, 0, self.fileSize)
+                return True
+            except OSError:
+                pass
+
+        # Filesystems without fallocate get a sparse file of the final size.
+        try:
+            os.ftruncate(self.fd, self.fileSize)
+        except OSError as e:
+            print(f"ftruncate() failed [{e.errno}]", file=sys.stderr)
+            return False
+
+        return True
+
+    def write(self, offset: int, data: bytes | bytearray | memoryview) -> bool:
+        if offset + len(data) > self.fileSize:
+            print("Block beyond the end of the file", file=sys.stderr)
+            return False
+
+        if not data:
+            return True
+
+        start, end = offset, offset + len(data)
+        i = bisect.bisect_left(self.blockStarts, offset)
+        if (i < len(self.blockStarts) and self.blockStarts[i] < end) or (i and self.blockEnds[i - 1] > offset):
+            print(f"Block at {offset} overlaps a block already written", file=sys.stderr)
+            return False
+
+        view = memoryview(data)
+        try:
+            while view:
+                n = os.pwrite(self.fd, view, offset)
+                view = view[n:]
+                offset += n
+        except OSError as e:
+            print(f"pwrite() failed [{e.errno}]", file=sys.stderr)
+            return False
+
+        self.blockStarts.insert(i, start)
+        self.blockEnds.insert(i, end)
+        self.bytesWritten += len(data)
+        return True
+
+    def complete(self) -> bool:
+        # Written ranges never overlap, so their total is the file size only
+        # when no hole is left.
+        return self.bytesWritten == self.fileSize
+
+    def commit(self) -> str | None:
+        if not self.complete():
+            print(f"commit() failed: {self.fileSize - self.bytesWritten} bytes missing", file=sys.stderr)
+            self.abort()
+            return None
+
+        try:
+            if self.fsync:
+                os.fsync(self.fd)
+            os.close(self.fd)
+            self.fd = None
+            os.replace(self.tempPath, self.localPath)
+            if self.fsync:
+                # The rename itself is durable only once the directory is.
+                directoryFd = os.open(os.path.dirname(self.localPath) or ".", os.O_RDONLY)
+                try:
+                    os.fsync(directoryFd)
+                finally:
+                    os.close(directoryFd)
+        except OSError as e:
+            print(f"commit() failed [{e.errno}]", file=sys.stderr)
+            self.abort()
+            return None
+
+        return self.localPath
+
+    def abort(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+        try:
+            os.unlink(self.tempPath)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,336 @@
+from homelink_python import metrics
+from homelink_python.net import sendBuffersTcp
+
+from homelink_python.security import hashBytes, hashChunks, AES_IV_SIZE, AES_TAG_SIZE
+
+from homelink_python.transfer import (
+    FILE_BLOCK_SIZE,
+    FILE_INFO_FORMAT,
+    FILE_SEND_BATCH,
+    _checkReceivedFile,
+    _openReceivedFile,
+    encryptCopyFrame,
+    encryptFileFrame,
+    recvFileFrame,
+)
+
+import mmap
+import os
+import socket
+import struct
+import sys
+import zlib
+
+SYNC_BLOCK_SIZE = 64 * 1024
+SYNC_MANIFEST_BATCH = 1024
+SYNC_MAX_SEARCH_SKIP = 64
+SYNC_HASH_CHUNK = 1 << 20
+SYNC_PARTIAL_SUFFIX = ".homelink-partial"
+ADLER_MODULUS = 65521
+
+# The receiver answers the info frame with a manifest: a header frame of
+# (resume offset, block count, SHA-256 of the partial file up to the resume
+# offset) followed by frames of (adler32, SHA-256) pairs for each
+# SYNC_BLOCK_SIZE block of its current copy, offset by their first index.
+# The sender then streams data frames and copy frames in file order.
+SYNC_MANIFEST_FORMAT = "!QQ32s"
+SYNC_MANIFEST_SIZE = struct.calcsize(SYNC_MANIFEST_FORMAT)
+SYNC_BLOCK_FORMAT = "!I32s"
+SYNC_BLOCK_ENTRY_SIZE = struct.calcsize(SYNC_BLOCK_FORMAT)
+
+def _readChunks(localFile, length: int):
+    while length > 0:
+        chunk = localFile.read(min(length, SYNC_HASH_CHUNK))
+        if not chunk:
+            return
+        length -= len(chunk)
+        yield chunk
+
+def buildManifest(localPath: str) -> list:
+    entries = []
+    try:
+        with open(localPath, "rb") as localFile:
+            for block in iter(lambda: localFile.read(SYNC_BLOCK_SIZE), b""):
+                entries.append((zlib.adler32(block), hashBytes(block)))
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        print(f"read() failed [{e.errno}]", file=sys.stderr)
+        return []
+
+    return entries
+
+def rollChecksum(checksum: int, outByte: int, inByte: int, blockSize: int) -> int:
+    a = ((checksum & 0xFFFF) - outByte + inByte) % ADLER_MODULUS
+    b = ((checksum >> 16) - blockSize * outByte + a - 1) % ADLER_MODULUS
+    return b << 16 | a
+
+def sendManifest(dataSocket: socket.socket, aesKey: bytes | bytearray, resumeOffset: int, prefixHash: bytes, entries: list) -> bool:
+    buffers = encryptFileFrame(0, struct.pack(SYNC_MANIFEST_FORMAT, resumeOffset, len(entries), prefixHash), aesKey)
+    for first in range(0, len(entries), SYNC_MANIFEST_BATCH):
+        data = b"".join(struct.pack(SYNC_BLOCK_FORMAT, *entry) for entry in entries[first:first + SYNC_MANIFEST_BATCH])
+        buffers += encryptFileFrame(first, data, aesKey)
+
+    return sendBuffersTcp(dataSocket, buffers)
+
+def recvManifest(dataSocket: socket.socket, aesKey: bytes | bytearray) -> tuple[int, bytes, list] | None:
+    frame = recvFileFrame(dataSocket, aesKey)
+    if not frame or len(frame[1]) != SYNC_MANIFEST_SIZE:
+        print("recvManifest() failed", file=sys.stderr)
+        return None
+
+    resumeOffset, count, prefixHash = struct.unpack(SYNC_MANIFEST_FORMAT, frame[1])
+    entries = []
+    while len(entries) < count:
+        frame = recvFileFrame(dataSocket, aesKey)
+        if not frame or frame[0] != len(entries) or not frame[1] or len(frame[1]) % SYNC_BLOCK_ENTRY_SIZE:
+            print("recvManifest() failed", file=sys.stderr)
+            return None
+        entries += struct.iter_unpack(SYNC_BLOCK_FORMAT, frame[1])
+
+    return resumeOffset, prefixHash, entries
+
+def _matchBlock(data, start: int, end: int, index: dict) -> int | None:
+    block = data[start:end]
+    candidates = index.get(zlib.adler32(block))
+    if not candidates:
+        return None
+
+    strong = hashBytes(block)
+    return next((blockIndex for blockIndex, candidate in candidates if candidate == strong), None)
+
+def _rollingSearch(data, start: int, fileSize: int, index: dict) -> tuple[int, int] | None:
+    # Slides a full block window one byte at a time from start, looking for
+    # a block that moved because bytes were inserted or removed before it.
+    blockSize = SYNC_BLOCK_SIZE
+    checksum = zlib.adler32(data[start:start + blockSize])
+    for position in range(start, min(start + blockSize, fileSize - blockSize)):
+        checksum = rollChecksum(checksum, data[position], data[position + blockSize], blockSize)
+
+        candidates = index.get(checksum)
+        if candidates:
+            strong = hashBytes(data[position + 1:position + 1 + blockSize])
+            for blockIndex, candidate in candidates:
+                if candidate == strong:
+                    return position + 1, blockIndex
+
+    return None
+
+def deltaInstructions(data, fileSize: int, startOffset: int, entries: list):
+    # Yields ("copy", offset, basis offset, length) for runs the receiver
+    # already has and ("data", start, end) for everything else. After failed
+    # rolling searches the next 1, 3, 7 ... blocks are not searched, so a
+    # file with no common content costs little more than hashing it.
+    index = {}
+    for blockIndex, (weak, strong) in enumerate(entries):
+        index.setdefault(weak, []).append((blockIndex, strong))
+
+    position = literalStart = startOffset
+    copy = None
+    skip = 0
+    backoff = 1
+    while position < fileSize:
+        blockIndex = _matchBlock(data, position, min(position + SYNC_BLOCK_SIZE, fileSize), index) if index else None
+        if blockIndex is None and index and position + SYNC_BLOCK_SIZE < fileSize:
+            if skip:
+                skip -= 1
+            else:
+                found = _rollingSearch(data, position, fileSize, index)
+                if found:
+                    position, blockIndex = found
+                else:
+                    skip = backoff - 1
+                    backoff = min(backoff * 2, SYNC_MAX_SEARCH_SKIP)
+
+        if blockIndex is None:
+            position = min(position + SYNC_BLOCK_SIZE, fileSize)
+            continue
+
+        if literalStart < position:
+            if copy:
+                yield copy
+                copy = None
+            yield ("data", literalStart, position)
+
+        length = min(SYNC_BLOCK_SIZE, fileSize - position)
+        basisOffset = blockIndex * SYNC_BLOCK_SIZE
+        if copy and copy[1] + copy[3] == position and copy[2] + copy[3] == basisOffset:
+            copy = ("copy", copy[1], copy[2], copy[3] + length)
+        else:
+            if copy:
+                yield copy
+            copy = ("copy", position, basisOffset, length)
+
+        position += length
+        literalStart = position
+        backoff = 1
+
+    if copy:
+        yield copy
+    if literalStart < fileSize:
+        yield ("data", literalStart, fileSize)
+
+def _recordSync(kind: str, n: int):
+    if n:
+        metrics.count("sync_bytes_total", n, (("kind", kind),))
+
+def _sendDelta(dataSocket: socket.socket, data, fileSize: int, startOffset: int, entries: list, aesKey: bytes | bytearray, compressor) -> bool:
+    buffers = []
+    frames = 0
+    copied = 0
+    literal = 0
+    for instruction in deltaInstructions(data, fileSize, startOffset, entries):
+        if instruction[0] == "copy":
+            _, offset, basisOffset, length = instruction
+            buffers += encryptCopyFrame(offset, basisOffset, length, aesKey)
+            frames += 1
+            copied += length
+        else:
+            _, start, end = instruction
+            for offset in range(start, end, FILE_BLOCK_SIZE):
+                buffers += encryptFileFrame(offset, data[offset:min(offset + FILE_BLOCK_SIZE, end)], aesKey, compressor)
+                frames += 1
+                if frames >= FILE_SEND_BATCH:
+                    if not sendBuffersTcp(dataSocket, buffers):
+                        return False
+                    buffers = []
+                    frames = 0
+            literal += end - start
+
+        if frames >= FILE_SEND_BATCH:
+            if not sendBuffersTcp(dataSocket, buffers):
+                return False
+            buffers = []
+            frames = 0
+
+    buffers += encryptFileFrame(fileSize, b"", aesKey)
+    if not sendBuffersTcp(dataSocket, buffers):
+        return False
+
+    _recordSync("resumed", startOffset)
+    _recordSync("copied", copied)
+    _recordSync("literal", literal)
+    return True
+
+def sendSyncFile(dataSocket: socket.socket, localPath: str, remotePath: str, aesKey: bytes | bytearray, compressor=None) -> bool:
+    try:
+        localFile = open(localPath, "rb")
+    except OSError as e:
+        print(f"open() failed [{e.errno}]", file=sys.stderr)
+        return False
+
+    with localFile:
+        fileSize = os.fstat(localFile.fileno()).st_size
+        info = struct.pack(FILE_INFO_FORMAT, fileSize) + remotePath.encode("UTF-8")
+        if not sendBuffersTcp(dataSocket, encryptFileFrame(0, info, aesKey)):
+            return False
+
+        manifest = recvManifest(dataSocket, aesKey)
+        if manifest is None:
+            return False
+        resumeOffset, prefixHash, entries = manifest
+
+        data = mmap.mmap(localFile.fileno(), 0, access=mmap.ACCESS_READ) if fileSize else b""
+        try:
+            # A partial file on the receiver is only continued if it holds
+            # exactly what this file starts with.
+            startOffset = 0
+            if 0 < resumeOffset <= fileSize:
+                chunks = (data[i:min(i + SYNC_HASH_CHUNK, resumeOffset)] for i in range(0, resumeOffset, SYNC_HASH_CHUNK))
+                if hashChunks(chunks) == prefixHash:
+                    startOffset = resumeOffset
+
+            return _sendDelta(dataSocket, data, fileSize, startOffset, entries, aesKey, compressor)
+        finally:
+            if fileSize:
+                data.close()
+
+def _copyRange(basisFile, basisOffset: int, length: int, partialFile) -> bool:
+    if basisFile is None:
+        print("Copy frame without a basis file", file=sys.stderr)
+        return False
+
+    basisFile.seek(basisOffset)
+    for chunk in _readChunks(basisFile, length):
+        partialFile.write(chunk)
+        length -= len(chunk)
+
+    if length:
+        print("Copy frame beyond the basis file", file=sys.stderr)
+        return False
+
+    return True
+
+def _receiveDelta(dataSocket: socket.socket, aesKey: bytes | bytearray, partialFile, basisFile, resumeOffset: int, fileSize: int) -> bool:
+    buffer = bytearray(FILE_BLOCK_SIZE + AES_IV_SIZE + AES_TAG_SIZE)
+    position = None
+    while True:
+        frame = recvFileFrame(dataSocket, aesKey, buffer, allowCopy=True)
+        if not frame:
+            return False
+
+        offset, data = frame
+        if position is None:
+            # The sender either continues the partial file or starts over.
+            if offset not in (0, resumeOffset):
+                print("Invalid sync start offset", file=sys.stderr)
+                return False
+            partialFile.truncate(offset)
+            partialFile.seek(offset)
+            position = offset
+
+        if offset != position:
+            print("Out of order sync frame", file=sys.stderr)
+            return False
+
+        if isinstance(data, tuple):
+            basisOffset, length = data
+            if not _copyRange(basisFile, basisOffset, length, partialFile):
+                return False
+            position += length
+        elif not data:
+            break
+        else:
+            partialFile.write(data)
+            position += len(data)
+
+        if position > fileSize:
+            print("Sync frame beyond the end of the file", file=sys.stderr)
+            return False
+
+    return _checkReceivedFile(fileSize, position, offset)
+
+def recvSyncFile(dataSocket: socket.socket, directory: str, aesKey: bytes | bytearray) -> str | None:
+    frame = recvFileFrame(dataSocket, aesKey)
+    target = frame and _openReceivedFile(frame[1], directory)
+    if not target:
+        return None
+
+    # New content goes to a partial file next to the target, which is kept
+    # if the transfer breaks and replaces the target once it completes.
+    fileSize, localPath = target
+    partialPath = localPath + SYNC_PARTIAL_SUFFIX
+    try:
+        partialFile = os.fdopen(os.open(partialPath, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+    except OSError as e:
+        print(f"open() failed [{e.errno}]", file=sys.stderr)
+        return None
+
+    with partialFile:
+        resumeOffset = min(os.fstat(partialFile.fileno()).st_size, fileSize) // SYNC_BLOCK_SIZE * SYNC_BLOCK_SIZE
+        prefixHash = hashChunks(_readChunks(partialFile, resumeOffset))
+        if not sendManifest(dataSocket, aesKey, resumeOffset, prefixHash, buildManifest(localPath)):
+            return None
+
+        basisFile = open(localPath, "rb") if os.path.isfile(localPath) else None
+        try:
+            status = _receiveDelta(dataSocket, aesKey, partialFile, basisFile, resumeOffset, fileSize)
+        finally:
+            if basisFile:
+                basisFile.close()
+
+    if not status:
+        return None
+
+    os.replace(partialPath, localPath)
+    return localPath
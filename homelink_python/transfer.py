@@ -0,0 +1,499 @@
+from homelink_python.blockcrypto import CRYPTO_TASK_BLOCKS, CRYPTO_WORKERS, orderedMap
+
+from homelink_python.compression import CODEC_NONE, decompressBlock, workerCompressor
+
+from homelink_python.net import _makeParentDirectory, BufferPool, sendBuffersTcp, receiveBufferTcp
+
+from homelink_python.security import aesEncrypt, aesDecrypt, randomBytes, AES_IV_SIZE, AES_TAG_SIZE
+
+from homelink_python.sink import FileSink
+
+import functools
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+
+FILE_BLOCK_SIZE = 8192
+FILE_PIPELINE_DEPTH = 32
+FILE_SEND_BATCH = 16
+FILE_PACK_THRESHOLD = 64 * 1024
+FILE_PACK_MAX_FILES = 64
+FILE_PACK_MAX_BYTES = 1 << 20
+
+# Every frame is (offset, payload length) followed by ciphertext + iv + tag.
+# A transfer is one info frame (file size + remote path), the data frames and
+# an empty frame whose offset is the total number of bytes sent. The top byte
+# of the length is the codec a data block was compressed with before it was
+# encrypted, zero for a raw block. FILE_FRAME_COPY there marks a delta sync
+# instruction to copy (basis offset, length) bytes of the receiver's existing
+# file to the frame's offset.
+FILE_FRAME_FORMAT = "!QI"
+FILE_FRAME_HEADER_SIZE = struct.calcsize(FILE_FRAME_FORMAT)
+FILE_FRAME_CODEC_SHIFT = 24
+FILE_FRAME_LENGTH_MASK = (1 << FILE_FRAME_CODEC_SHIFT) - 1
+FILE_FRAME_COPY = 0xFF
+FILE_COPY_FORMAT = "!QQ"
+FILE_INFO_FORMAT = "!Q"
+FILE_INFO_SIZE = struct.calcsize(FILE_INFO_FORMAT)
+
+_frameBuffers = BufferPool(FILE_BLOCK_SIZE + AES_IV_SIZE + AES_TAG_SIZE)
+
+def encryptFileFrame(offset: int, data: bytes | bytearray, aesKey: bytes | bytearray, compressor=None) -> list:
+    codecId = CODEC_NONE
+    if compressor is not None and data:
+        codecId, data = compressor.compress(data)
+
+    iv = randomBytes(AES_IV_SIZE)
+    ciphertext, tag = aesEncrypt(data, aesKey, iv)
+
+    return [struct.pack(FILE_FRAME_FORMAT, offset, len(data) | codecId << FILE_FRAME_CODEC_SHIFT), ciphertext, iv, tag]
+
+def encryptCopyFrame(offset: int, basisOffset: int, length: int, aesKey: bytes | bytearray) -> list:
+    data = struct.pack(FILE_COPY_FORMAT, basisOffset, length)
+    iv = randomBytes(AES_IV_SIZE)
+    ciphertext, tag = aesEncrypt(data, aesKey, iv)
+
+    return [struct.pack(FILE_FRAME_FORMAT, offset, len(data) | FILE_FRAME_COPY << FILE_FRAME_CODEC_SHIFT), ciphertext, iv, tag]
+
+def sendFileFrame(dataSocket: socket.socket, offset: int, data: bytes | bytearray, aesKey: bytes | bytearray) -> bool:
+    return sendBuffersTcp(dataSocket, encryptFileFrame(offset, data, aesKey))
+
+def _decryptFileFrame(header: bytes | bytearray, body: bytes | bytearray | memoryview, aesKey: bytes | bytearray, allowCopy: bool = False) -> tuple[int, bytearray | memoryview | tuple] | None:
+    offset, length = struct.unpack(FILE_FRAME_FORMAT, header)
+    codecId = length >> FILE_FRAME_CODEC_SHIFT
+    length &= FILE_FRAME_LENGTH_MASK
+
+    body = memoryview(body)
+    iv = body[length:length + AES_IV_SIZE]
+    tag = body[length + AES_IV_SIZE:]
+    try:
+        # Frames read into a writable buffer are decrypted in place.
+        data = aesDecrypt(body[:length], aesKey, iv, tag, None if body.readonly else body[:length])
+    except ValueError:
+        print("aesDecrypt() failed", file=sys.stderr)
+        return None
+
+    if data is None:
+        return offset, bytearray()
+
+    # Copy instructions come back as a (basis offset, length) tuple and are
+    # only accepted by the delta sync receiver.
+    if codecId == FILE_FRAME_COPY:
+        if not allowCopy or len(data) != struct.calcsize(FILE_COPY_FORMAT):
+            print("Unexpected copy frame", file=sys.stderr)
+            return None
+        return offset, struct.unpack(FILE_COPY_FORMAT, data)
+
+    if codecId != CODEC_NONE:
+        data = decompressBlock(codecId, data, FILE_BLOCK_SIZE)
+        if data is None:
+            print("decompressBlock() failed", file=sys.stderr)
+            return None
+
+    return offset, data
+
+def _frameBodySize(header: bytes | bytearray) -> int:
+    return (struct.unpack(FILE_FRAME_FORMAT, header)[1] & FILE_FRAME_LENGTH_MASK) + AES_IV_SIZE + AES_TAG_SIZE
+
+def recvFileFrame(dataSocket: socket.socket, aesKey: bytes | bytearray, buffer: bytearray = None, allowCopy: bool = False) -> tuple[int, bytearray | memoryview | tuple] | None:
+    header = receiveBufferTcp(dataSocket, FILE_FRAME_HEADER_SIZE)
+    if not header:
+        print("recvFileFrame() failed", file=sys.stderr)
+        return None
+
+    n = _frameBodySize(header)
+    if buffer is None or len(buffer) < n:
+        buffer = bytearray(n)
+
+    body = receiveBufferTcp(dataSocket, n, buffer)
+    if not body:
+        print("recvFileFrame() failed", file=sys.stderr)
+        return None
+
+    return _decryptFileFrame(header, body, aesKey, allowCopy)
+
+async def recvFileFrameAsync(reader: "asyncio.StreamReader", aesKey: bytes | bytearray) -> tuple[int, bytearray] | None:
+    import asyncio
+
+    try:
+        header = await reader.readexactly(FILE_FRAME_HEADER_SIZE)
+        body = await reader.readexactly(_frameBodySize(header))
+    except asyncio.IncompleteReadError:
+        print("recvFileFrameAsync() failed", file=sys.stderr)
+        return None
+
+    return _decryptFileFrame(header, body, aesKey)
+
+def _readChunks(localFile, cancelled: threading.Event):
+    offset = 0
+    while not cancelled.is_set():
+        chunk = localFile.read(CRYPTO_TASK_BLOCKS * FILE_BLOCK_SIZE)
+        if not chunk:
+            return
+
+        yield offset, chunk
+        offset += len(chunk)
+
+def _encryptChunk(chunk: tuple[int, bytes], aesKey: bytes | bytearray, compressor) -> list:
+    offset, data = chunk
+    compressor = workerCompressor(compressor)
+    view = memoryview(data)
+
+    return [encryptFileFrame(offset + i, view[i:i + FILE_BLOCK_SIZE], aesKey, compressor) for i in range(0, len(data), FILE_BLOCK_SIZE)]
+
+def _encryptedFrames(localFile, aesKey: bytes | bytearray, compressor, cancelled: threading.Event, workers: int):
+    if workers <= 1:
+        offset = 0
+        while not cancelled.is_set():
+            block = localFile.read(FILE_BLOCK_SIZE)
+            if not block:
+                return
+
+            yield encryptFileFrame(offset, block, aesKey, compressor)
+            offset += len(block)
+        return
+
+    # Chunks of CRYPTO_TASK_BLOCKS blocks are encrypted on the crypto pool
+    # and come back in file order.
+    encryptChunk = functools.partial(_encryptChunk, aesKey=aesKey, compressor=compressor)
+    results = orderedMap(encryptChunk, _readChunks(localFile, cancelled), workers)
+    try:
+        for encryptedChunk in results:
+            yield from encryptedChunk
+    finally:
+        results.close()
+
+def _encryptFileBlocks(localPath: str, aesKey: bytes | bytearray, compressor, frames: queue.Queue, cancelled: threading.Event, workers: int = 1):
+    status = True
+    try:
+        with open(localPath, "rb") as localFile:
+            previous = None
+            for frame in _encryptedFrames(localFile, aesKey, compressor, cancelled, workers):
+                if previous is not None:
+                    frames.put(previous)
+                previous = frame
+            offset = localFile.tell()
+
+            # The end frame travels with the last data frame so that the tail
+            # of a transfer is never a lone small segment held back by Nagle.
+            if not cancelled.is_set():
+                frames.put((previous or []) + encryptFileFrame(offset, b"", aesKey))
+    except OSError as e:
+        print(f"read() failed [{e.errno}]", file=sys.stderr)
+        status = False
+
+    frames.put(status)
+
+def _cryptoWorkers(cryptoWorkers: int | None, fileSize: int) -> int:
+    # Files that fit in one task gain nothing from the pool.
+    if fileSize <= CRYPTO_TASK_BLOCKS * FILE_BLOCK_SIZE:
+        return 1
+
+    return CRYPTO_WORKERS if cryptoWorkers is None else cryptoWorkers
+
+def sendFile(dataSocket: socket.socket, localPath: str, remotePath: str, aesKey: bytes | bytearray, compressor=None, cryptoWorkers: int = None) -> bool:
+    try:
+        fileSize = os.path.getsize(localPath)
+    except OSError as e:
+        print(f"stat() failed [{e.errno}]", file=sys.stderr)
+        return False
+
+    info = struct.pack(FILE_INFO_FORMAT, fileSize) + remotePath.encode("UTF-8")
+    infoFrame = encryptFileFrame(0, info, aesKey)
+
+    # Blocks are read and encrypted on a worker thread while this thread
+    # sends; the bounded queue keeps memory flat for any file size.
+    frames = queue.Queue(FILE_PIPELINE_DEPTH)
+    cancelled = threading.Event()
+    workers = _cryptoWorkers(cryptoWorkers, fileSize)
+    encryptThread = threading.Thread(
+        target=_encryptFileBlocks, args=(localPath, aesKey, compressor, frames, cancelled, workers), daemon=True
+    )
+    encryptThread.start()
+
+    # Whatever frames are already encrypted go out in a single sendmsg(),
+    # the info frame with the first of them.
+    status = True
+    done = False
+    while not done:
+        batch = [frames.get()]
+        while len(batch) < FILE_SEND_BATCH:
+            try:
+                batch.append(frames.get_nowait())
+            except queue.Empty:
+                break
+
+        if isinstance(batch[-1], bool):
+            status = batch.pop() and status
+            done = True
+
+        if not status or not batch:
+            continue
+
+        buffers = [buffer for frame in batch for buffer in frame]
+        if infoFrame:
+            buffers = infoFrame + buffers
+            infoFrame = None
+
+        if not sendBuffersTcp(dataSocket, buffers):
+            print("sendBuffersTcp() failed", file=sys.stderr)
+            status = False
+            cancelled.set()
+
+    encryptThread.join()
+    return status
+
+def readSmallFile(localPath: str) -> bytes | None:
+    try:
+        with open(localPath, "rb") as localFile:
+            return localFile.read()
+    except OSError as e:
+        print(f"read() failed [{e.errno}]", file=sys.stderr)
+        return None
+
+def encryptSmallFile(data: bytes, remotePath: str, aesKey: bytes | bytearray, compressor=None) -> list:
+    info = struct.pack(FILE_INFO_FORMAT, len(data)) + remotePath.encode("UTF-8")
+    buffers = encryptFileFrame(0, info, aesKey)
+    view = memoryview(data)
+    for offset in range(0, len(data), FILE_BLOCK_SIZE):
+        buffers += encryptFileFrame(offset, view[offset:offset + FILE_BLOCK_SIZE], aesKey, compressor)
+    buffers += encryptFileFrame(len(data), b"", aesKey)
+
+    return buffers
+
+def packFiles(files: list) -> list:
+    # Files at or below the threshold are grouped so that one command and
+    # one ack cover many of them; larger files are sent one at a time.
+    batches = []
+    batch = []
+    batchBytes = 0
+    for localPath, remotePath, size in sorted(files, key=lambda file: file[2], reverse=True):
+        if size > FILE_PACK_THRESHOLD:
+            batches.append([(localPath, remotePath, size)])
+            continue
+
+        if batch and (len(batch) >= FILE_PACK_MAX_FILES or batchBytes + size > FILE_PACK_MAX_BYTES):
+            batches.append(batch)
+            batch = []
+            batchBytes = 0
+
+        batch.append((localPath, remotePath, size))
+        batchBytes += size
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+def _encryptFileBatch(localFile, offset: int, aesKey: bytes | bytearray, compressor) -> tuple[list, int]:
+    frames = []
+    while len(frames) < FILE_SEND_BATCH:
+        block = localFile.read(FILE_BLOCK_SIZE)
+        if not block:
+            break
+
+        frames.append(encryptFileFrame(offset, block, aesKey, compressor))
+        offset += len(block)
+
+    return frames, offset
+
+async def sendFileAsync(writer: "asyncio.StreamWriter", localPath: str, remotePath: str, aesKey: bytes | bytearray, compressor=None) -> bool:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    try:
+        fileSize = os.path.getsize(localPath)
+        localFile = open(localPath, "rb")
+    except OSError as e:
+        print(f"open() failed [{e.errno}]", file=sys.stderr)
+        return False
+
+    # Reading and encrypting a batch runs in the default executor; the loop
+    # only writes the frames and waits for the transport to drain. The info
+    # and end frames share a write with the first and last data frames.
+    bytesSent = 0
+    try:
+        with localFile:
+            info = struct.pack(FILE_INFO_FORMAT, fileSize) + remotePath.encode("UTF-8")
+            buffers = encryptFileFrame(0, info, aesKey)
+
+            while True:
+                frames, bytesSent = await loop.run_in_executor(None, _encryptFileBatch, localFile, bytesSent, aesKey, compressor)
+                buffers += [buffer for frame in frames for buffer in frame]
+
+                if not frames or bytesSent >= fileSize:
+                    buffers += encryptFileFrame(bytesSent, b"", aesKey)
+                    writer.writelines(buffers)
+                    await writer.drain()
+                    break
+
+                writer.writelines(buffers)
+                buffers = []
+                await writer.drain()
+    except OSError as e:
+        print(f"sendFileAsync() failed [{e}]", file=sys.stderr)
+        return False
+
+    return True
+
+def _resolveLocalPath(directory: str, remotePath: str) -> str | None:
+    root = os.path.abspath(directory)
+    localPath = os.path.normpath(os.path.join(root, remotePath.lstrip("/")))
+    if not localPath.startswith(root + os.sep):
+        print(f"Invalid remote path: {remotePath}", file=sys.stderr)
+        return None
+
+    return localPath
+
+def _openReceivedFile(info: bytearray, directory: str) -> tuple[int, str] | None:
+    if len(info) < FILE_INFO_SIZE:
+        return None
+
+    fileSize = struct.unpack_from(FILE_INFO_FORMAT, info)[0]
+    localPath = _resolveLocalPath(directory, bytes(info[FILE_INFO_SIZE:]).decode("UTF-8"))
+    if not localPath:
+        return None
+
+    _makeParentDirectory(localPath)
+    return fileSize, localPath
+
+def _checkReceivedFile(fileSize: int, bytesReceived: int, endOffset: int) -> bool:
+    if bytesReceived != fileSize or endOffset != fileSize:
+        print("recvFile() failed: incomplete transfer", file=sys.stderr)
+        return False
+
+    return True
+
+def _readFrameGroups(dataSocket: socket.socket):
+    # Frames are grouped as they arrive, each into its own buffer; a failed
+    # read ends the group with None and the end frame ends the stream.
+    while True:
+        group = []
+        while len(group) < CRYPTO_TASK_BLOCKS:
+            header = receiveBufferTcp(dataSocket, FILE_FRAME_HEADER_SIZE)
+            body = header and receiveBufferTcp(dataSocket, _frameBodySize(header))
+            if not body:
+                print("recvFileFrame() failed", file=sys.stderr)
+                group.append(None)
+                yield group
+                return
+
+            group.append((header, body))
+            if not struct.unpack(FILE_FRAME_FORMAT, header)[1] & FILE_FRAME_LENGTH_MASK:
+                yield group
+                return
+
+        yield group
+
+def _decryptFrameGroup(group: list, aesKey: bytes | bytearray) -> list:
+    frames = []
+    for entry in group:
+        frame = entry and _decryptFileFrame(*entry, aesKey)
+        frames.append(frame)
+        if frame is None:
+            break
+
+    return frames
+
+def _recvFileBlocksParallel(dataSocket: socket.socket, sink: FileSink, fileSize: int, aesKey: bytes | bytearray, workers: int) -> bool:
+    # Decryption runs on the crypto pool; blocks are written here, in order.
+    decryptFrameGroup = functools.partial(_decryptFrameGroup, aesKey=aesKey)
+    results = orderedMap(decryptFrameGroup, _readFrameGroups(dataSocket), workers)
+    try:
+        for frames in results:
+            for frame in frames:
+                if frame is None:
+                    return False
+
+                offset, data = frame
+                if not data:
+                    return _checkReceivedFile(fileSize, sink.bytesWritten, offset)
+
+                if not sink.write(offset, data):
+                    return False
+    finally:
+        results.close()
+
+    return False
+
+def recvFile(dataSocket: socket.socket, directory: str, aesKey: bytes | bytearray, fsync: bool = True, cryptoWorkers: int = None) -> str | None:
+    frame = recvFileFrame(dataSocket, aesKey)
+    target = frame and _openReceivedFile(frame[1], directory)
+    if not target:
+        return None
+
+    fileSize, localPath = target
+    sink = FileSink(localPath, fileSize, fsync)
+    if not sink.open():
+        return None
+
+    workers = _cryptoWorkers(cryptoWorkers, fileSize)
+    if workers > 1:
+        if not _recvFileBlocksParallel(dataSocket, sink, fileSize, aesKey, workers):
+            sink.abort()
+            return None
+        return sink.commit()
+
+    status = False
+    buffer = _frameBuffers.acquire()
+    try:
+        while True:
+            frame = recvFileFrame(dataSocket, aesKey, buffer)
+            if not frame:
+                break
+
+            offset, data = frame
+            if not data:
+                status = _checkReceivedFile(fileSize, sink.bytesWritten, offset)
+                break
+
+            if not sink.write(offset, data):
+                break
+    finally:
+        _frameBuffers.release(buffer)
+
+    if not status:
+        sink.abort()
+        return None
+
+    return sink.commit()
+
+async def recvFileAsync(reader: "asyncio.StreamReader", directory: str, aesKey: bytes | bytearray, fsync: bool = True) -> str | None:
+    import asyncio
+
+    frame = await recvFileFrameAsync(reader, aesKey)
+    target = frame and _openReceivedFile(frame[1], directory)
+    if not target:
+        return None
+
+    fileSize, localPath = target
+    sink = FileSink(localPath, fileSize, fsync)
+    if not sink.open():
+        return None
+
+    status = False
+    try:
+        while True:
+            frame = await recvFileFrameAsync(reader, aesKey)
+            if not frame:
+                break
+
+            offset, data = frame
+            if not data:
+                status = _checkReceivedFile(fileSize, sink.bytesWritten, offset)
+                break
+
+            if not sink.write(offset, data):
+                break
+    finally:
+        if not status:
+            sink.abort()
+
+    if not status:
+        return None
+
+    # The fsync can take a while on a busy disk, so it runs off the loop.
+    return await asyncio.get_running_loop().run_in_executor(None, sink.commit)
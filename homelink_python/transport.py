@@ -0,0 +1,176 @@
+from homelink_python import metrics
+
+import socket
+import sys
+import threading
+
+TRANSPORT_CONNECT_TIMEOUT = 10.0
+TRANSPORT_KEEPALIVE_IDLE = 30
+TRANSPORT_KEEPALIVE_INTERVAL = 10
+TRANSPORT_KEEPALIVE_COUNT = 3
+HEARTBEAT_INTERVAL = 30.0
+HEARTBEAT_MIN_BACKOFF = 0.5
+HEARTBEAT_MAX_BACKOFF = 60.0
+
+class TransportOptions:
+    # ioTimeout bounds a single send()/recv() call; the retry loops in net.py
+    # give up after their retry counts, so a silent peer fails a command
+    # after about ten ioTimeouts. None keeps sockets fully blocking.
+    def __init__(
+        self,
+        nodelay: bool = True,
+        sendBufferSize: int = None,
+        receiveBufferSize: int = None,
+        keepalive: bool = True,
+        keepaliveIdle: int = TRANSPORT_KEEPALIVE_IDLE,
+        keepaliveInterval: int = TRANSPORT_KEEPALIVE_INTERVAL,
+        keepaliveCount: int = TRANSPORT_KEEPALIVE_COUNT,
+        connectTimeout: float = TRANSPORT_CONNECT_TIMEOUT,
+        ioTimeout: float = None,
+    ):
+        self.nodelay = nodelay
+        self.sendBufferSize = sendBufferSize
+        self.receiveBufferSize = receiveBufferSize
+        self.keepalive = keepalive
+        self.keepaliveIdle = keepaliveIdle
+        self.keepaliveInterval = keepaliveInterval
+        self.keepaliveCount = keepaliveCount
+        self.connectTimeout = connectTimeout
+        self.ioTimeout = ioTimeout
+
+DEFAULT_TRANSPORT_OPTIONS = TransportOptions()
+
+def applyTransportOptions(dataSocket: socket.socket, options: TransportOptions):
+    settings = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(options.nodelay))]
+    if options.sendBufferSize:
+        settings.append((socket.SOL_SOCKET, socket.SO_SNDBUF, options.sendBufferSize))
+    if options.receiveBufferSize:
+        settings.append((socket.SOL_SOCKET, socket.SO_RCVBUF, options.receiveBufferSize))
+
+    settings.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, int(options.keepalive)))
+    if options.keepalive:
+        # TCP_KEEPIDLE is called TCP_KEEPALIVE on macOS.
+        idleOption = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+        for option, value in (
+            (idleOption, options.keepaliveIdle),
+            (getattr(socket, "TCP_KEEPINTVL", None), options.keepaliveInterval),
+            (getattr(socket, "TCP_KEEPCNT", None), options.keepaliveCount),
+        ):
+            if option is not None:
+                settings.append((socket.IPPROTO_TCP, option, value))
+
+    for level, option, value in settings:
+        try:
+            dataSocket.setsockopt(level, option, value)
+        except OSError as e:
+            print(f"setsockopt({option}) failed [{e.errno}]", file=sys.stderr)
+
+def openConnection(address: tuple, options: TransportOptions = None) -> socket.socket | None:
+    options = options or DEFAULT_TRANSPORT_OPTIONS
+    dataSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+
+    # Buffer sizes are set before connect() so that they count towards the
+    # negotiated window scale.
+    applyTransportOptions(dataSocket, options)
+    try:
+        dataSocket.settimeout(options.connectTimeout)
+        dataSocket.connect(address)
+    except socket.timeout:
+        print("connect() timed out", file=sys.stderr)
+        metrics.count("connect_timeouts_total")
+        dataSocket.close()
+        return None
+    except socket.error as e:
+        print(f"connect() failed [{e.errno}]", file=sys.stderr)
+        dataSocket.close()
+        return None
+
+    dataSocket.settimeout(options.ioTimeout)
+    return dataSocket
+
+class Heartbeat:
+    # Pings the client's command connection every interval while it is idle.
+    # When the ping fails the client reconnects and logs in again, retrying
+    # with exponential backoff, and a readFileAsync() listener whose
+    # connection died is started again.
+    def __init__(self, client, password: str, interval: float = HEARTBEAT_INTERVAL, maxBackoff: float = HEARTBEAT_MAX_BACKOFF):
+        self.client = client
+        self.password = password
+        self.interval = interval
+        self.maxBackoff = maxBackoff
+        self.stopEvent = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="homelink-heartbeat", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopEvent.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _beat(self) -> bool:
+        from homelink_python.packet import LoginStatus
+
+        client = self.client
+
+        # A command in progress, or a pipeline still waiting for responses,
+        # has its own deadlines; only idle connections are probed.
+        commandPipeline = client.commandPipeline
+        if commandPipeline is not None and not commandPipeline.idle():
+            return True
+        if not client.commandLock.acquire(blocking=False):
+            return True
+
+        try:
+            # A suspended session stays closed until the next command.
+            if client.syncSocket is None:
+                return True
+
+            with metrics.phase("heartbeat.ping"):
+                if client.ping():
+                    return True
+
+            metrics.count("heartbeat_failures_total")
+            if self.stopEvent.is_set():
+                return False
+
+            with metrics.phase("heartbeat.reconnect"):
+                reconnected = client.connect() and client.login(self.password) == LoginStatus.LOGIN_SUCCESS
+            metrics.count("reconnects_total", 1, (("outcome", "success" if reconnected else "failure"),))
+            return reconnected
+        finally:
+            client.commandLock.release()
+
+    def _restartListener(self):
+        client = self.client
+        args = client.asyncFileArgs
+        if args is None or (client.asyncFileThread is not None and not client.asyncFileThread.done()):
+            return
+
+        client.asyncFileThread = None
+        if client.asyncFileSocket:
+            client.asyncFileSocket.close()
+        client.asyncFileSocket = None
+        if client.readFileAsync(*args):
+            metrics.count("listener_restarts_total")
+        elif client.asyncFileArgs is None:
+            # A failed start forgets its arguments; keep them for the next beat.
+            client.asyncFileArgs = args
+
+    def _run(self):
+        delay = self.interval
+        backoff = HEARTBEAT_MIN_BACKOFF
+        while not self.stopEvent.wait(delay):
+            if not self.client.active:
+                delay = self.interval
+                continue
+
+            if self._beat():
+                self._restartListener()
+                delay = self.interval
+                backoff = HEARTBEAT_MIN_BACKOFF
+            else:
+                delay = backoff
+                backoff = min(backoff * 2, self.maxBackoff)
@@ -11,7 +11,8 @@ setup(
     packages=find_packages(),
     entry_points={
         "console_scripts" : [
-            "homelink_python_cli=homelink_python.cli:main"
+            "homelink_python_cli=homelink_python.cli:main",
+            "homelink_python_loadgen=homelink_python.loadgen:main"
         ]
     },
     classifiers=[
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# test.py runs from this directory and imports its siblings as top-level
+# modules; pytest gets the same view.
+sys.path.insert(0, os.path.dirname(__file__))
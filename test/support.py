@@ -0,0 +1,32 @@
+from homelink_python.keys import SharedKeyProvider
+from homelink_python.mockserver import MockHomeLinkServer
+
+from unittest import TestCase
+
+import os
+import tempfile
+
+def _restoreHome(previousHome: str | None):
+    if previousHome is None:
+        os.environ.pop("HOME", None)
+    else:
+        os.environ["HOME"] = previousHome
+
+class HomeTestCase(TestCase):
+    # Every test class gets a temporary HOME, so host keys and session caches
+    # never touch the real one, and one keypair shared by its clients.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.home = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.home.cleanup)
+        cls.addClassCleanup(_restoreHome, os.environ.get("HOME"))
+        os.environ["HOME"] = cls.home.name
+        cls.keyProvider = SharedKeyProvider()
+
+    @classmethod
+    def startServer(cls, **kwargs) -> MockHomeLinkServer:
+        cls.server = MockHomeLinkServer(**kwargs)
+        cls.server.start()
+        cls.addClassCleanup(cls.server.stop)
+        return cls.server
@@ -1,6 +1,27 @@
+from test_agent import TestAgent
+from test_asyncclient import TestAsyncClient
+from test_cli import TestCli
+from test_client import TestClient
+from test_compression import TestCompression
+from test_fanout import TestFanout
+from test_keys import TestKeys
+from test_loadgen import TestLoadgen
+from test_metrics import TestMetrics
+from test_mockserver import TestMockServer
+from test_net import TestNet
+from test_notifications import TestNotifications
+from test_packet import TestPacket
+from test_pipeline import TestPipeline
+from test_pool import TestPool
+from test_resumption import TestResumption
 from test_security import TestSecurity
+from test_sink import TestSink
+from test_sync import TestSync
+from test_transfer import TestTransfer
+from test_transport import TestTransport
+from test_writefiles import TestWriteFiles
 
 import unittest
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,74 @@
+from homelink_python.agent import *
+from homelink_python.cli import HomeLinkConfig
+
+from support import HomeTestCase
+
+from unittest import mock
+
+import os
+import socket
+import tempfile
+import time
+
+class TestAgent(HomeTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startServer(services={("host", "service"): "hi"})
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.socketPath = os.path.join(self.directory.name, "agent", "agent.sock")
+
+        config = HomeLinkConfig()
+        config.hostId = "host"
+        config.serverAddress = "127.0.0.1"
+        config.serverPort = str(self.server.port)
+        self.agent = HomeLinkAgent(config, "hi", self.socketPath, self.keyProvider)
+        self.assertTrue(self.agent.start())
+        self.addCleanup(self.agent.stop)
+
+    def testSessionReuse(self):
+        handshakes = self.server.handshakeCount
+        with mock.patch("homelink_python.cli.handleCommand", side_effect=lambda client, args, output: print(*args, file=output)):
+            for i in range(3):
+                response = forwardToAgent("service", ["echo", str(i)], self.socketPath)
+                self.assertEqual(response, {"ok": True, "output": f"echo {i}\n"})
+
+        self.assertEqual(self.server.handshakeCount, handshakes + 1)
+        self.assertEqual(os.stat(self.socketPath).st_mode & 0o777, 0o600)
+
+    def testCommandFailure(self):
+        with mock.patch("homelink_python.cli.handleCommand", side_effect=RuntimeError("boom")):
+            response = forwardToAgent("service", ["write"], self.socketPath)
+        self.assertEqual(response, {"ok": False, "output": "Agent request failed [boom]\n"})
+
+        with mock.patch("homelink_python.cli.handleCommand", side_effect=lambda client, args, output: print("ok", file=output)):
+            self.assertEqual(forwardToAgent("service", [], self.socketPath), {"ok": True, "output": "ok\n"})
+
+    def testLoginFailure(self):
+        self.assertEqual(forwardToAgent("unknown", [], self.socketPath), {"ok": False, "output": "Login failed\n"})
+
+    def testStop(self):
+        self.assertIsNotNone(requestAgent({"op": "stop"}, self.socketPath))
+        deadline = time.monotonic() + 5
+        while os.path.exists(self.socketPath) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertFalse(os.path.exists(self.socketPath))
+        self.assertIsNone(forwardToAgent("service", [], self.socketPath))
+
+    def testStaleSocket(self):
+        self.agent.stop()
+        staleSocket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        staleSocket.bind(self.socketPath)
+        staleSocket.close()
+
+        self.assertTrue(self.agent.start())
+        self.assertEqual(requestAgent({"op": "ping"}, self.socketPath), {"ok": True, "output": ""})
+
+    def testSecondAgentRefused(self):
+        second = HomeLinkAgent(self.agent.config, "hi", self.socketPath, self.keyProvider)
+        self.assertFalse(second.start())
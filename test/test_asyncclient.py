@@ -0,0 +1,102 @@
+from homelink_python.asyncclient import AsyncHomeLinkClient
+from homelink_python.packet import LoginStatus
+from homelink_python.resumption import MemorySessionCache
+from homelink_python.security import randomBytes
+
+from support import HomeTestCase
+
+import asyncio
+import os
+
+class TestAsyncClient(HomeTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startServer(services={("host", "service"): "password"}, directory=cls.home.name)
+
+    def _client(self, **kwargs) -> AsyncHomeLinkClient:
+        return AsyncHomeLinkClient("host", "service", "127.0.0.1", self.server.port, self.keyProvider, **kwargs)
+
+    def testSession(self):
+        async def session():
+            client = self._client()
+            try:
+                self.assertTrue(await client.connect())
+                self.assertEqual(await client.login("password"), LoginStatus.LOGIN_SUCCESS)
+                self.assertTrue(await client.ping())
+                await client.logout()
+                self.assertFalse(client.active)
+            finally:
+                await client.destruct()
+
+        asyncio.run(session())
+
+    def testWrongPassword(self):
+        async def session():
+            client = self._client()
+            try:
+                self.assertTrue(await client.connect())
+                return await client.login("wrong")
+            finally:
+                await client.destruct()
+
+        self.assertEqual(asyncio.run(session()), LoginStatus.LOGIN_FAILED)
+
+    def testConcurrentSessions(self):
+        async def session():
+            client = self._client()
+            try:
+                if not await client.connect() or await client.login("password") != LoginStatus.LOGIN_SUCCESS:
+                    return False
+                results = await asyncio.gather(*[client.ping() for _ in range(3)])
+                await client.logout()
+                return all(results)
+            finally:
+                await client.destruct()
+
+        async def sessions():
+            return await asyncio.gather(*[session() for _ in range(100)])
+
+        self.assertEqual(asyncio.run(sessions()), [True] * 100)
+
+    def testWriteFile(self):
+        localPath = os.path.join(self.home.name, "source")
+        data = bytes(randomBytes(50000)) + b"compressible " * 4000
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        async def session(compression):
+            client = self._client(compression=compression)
+            try:
+                self.assertTrue(await client.connect())
+                self.assertEqual(await client.login("password"), LoginStatus.LOGIN_SUCCESS)
+                return await client.writeFile("other", "inbox", localPath, "async/file")
+            finally:
+                await client.destruct()
+
+        for compression in (None, "zlib"):
+            self.assertTrue(asyncio.run(session(compression)))
+            with open(os.path.join(self.home.name, "other", "inbox", "async", "file"), "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data)
+
+    def testResume(self):
+        sessionCache = MemorySessionCache()
+
+        async def session():
+            client = self._client(sessionCache=sessionCache)
+            try:
+                await client.connect()
+                await client.login("password")
+            finally:
+                await client.destruct()
+
+            client = self._client(sessionCache=sessionCache)
+            try:
+                self.assertTrue(await client.connect())
+                self.assertTrue(client.resumed)
+                return await client.ping()
+            finally:
+                await client.destruct()
+
+        self.assertTrue(asyncio.run(session()))
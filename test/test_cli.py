@@ -0,0 +1,41 @@
+from homelink_python.cli import *
+
+from unittest import TestCase
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import homelink_python
+
+class TestCli(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.configFilePath = os.path.join(self.directory.name, "cli.conf")
+        open(self.configFilePath, "w").close()
+
+    def testEditConfig(self):
+        editConfig(["--host-id=host", "--server-address=127.0.0.1", "--server-port=10000"], self.configFilePath)
+        editConfig(["--server-port=10001", "ignored"], self.configFilePath)
+
+        config = readConfig(self.configFilePath)
+        self.assertTrue(config.valid())
+        self.assertEqual((config.hostId, config.serverAddress, config.serverPort), ("host", "127.0.0.1", "10001"))
+
+    def testConfigureLoadsNoCrypto(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(homelink_python.__file__)))
+        env["HOMELINK_PYTHON_CLI_CONFIG"] = self.configFilePath
+        script = (
+            "import runpy, sys\n"
+            "sys.argv = ['homelink_python_cli', '--configure', '--host-id=host']\n"
+            "runpy.run_module('homelink_python.cli', run_name='__main__')\n"
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('Crypto', 'asyncio', 'homelink_python')))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), "['homelink_python']")
+        self.assertEqual(readConfig(self.configFilePath).hostId, "host")
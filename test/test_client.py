@@ -0,0 +1,200 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.packet import *
+from homelink_python.security import *
+from homelink_python.transfer import recvFile, sendFile
+
+from unittest import TestCase
+
+import os
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+
+import homelink_python
+
+def decryptCommand(commandPacket: CommandPacket, aesKey: bytearray) -> str:
+    data = commandPacket.data
+    commandData = aesDecrypt(data[:224], aesKey, data[224:240], data[240:256])
+    return commandData[32:].split(b"\x00")[0].decode("UTF-8")
+
+class TestClient(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = HomeLinkClient("host", "service", "127.0.0.1", 0)
+
+    def setUp(self):
+        self.client.aesKey = randomBytes(32)
+        self.client.connectionId = 1
+        self.client.sessionKey = randomBytes(16).hex()
+        self.client.syncSocket, self.serverSocket = socket.socketpair()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.client.syncSocket.close()
+        self.serverSocket.close()
+        self.directory.cleanup()
+
+    def testWriteFile(self):
+        localPath = os.path.join(self.directory.name, "source")
+        data = bytes(randomBytes(100000))
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        result = {}
+        def serve():
+            commandPacket = recvPacket(self.serverSocket, CommandPacket)
+            result["command"] = decryptCommand(commandPacket, self.client.aesKey)
+            sendPacket(self.serverSocket, AckPacket(1))
+            result["path"] = recvFile(self.serverSocket, os.path.join(self.directory.name, "out"), self.client.aesKey)
+            sendPacket(self.serverSocket, AckPacket(1 if result["path"] else 0))
+
+        serverThread = threading.Thread(target=serve)
+        serverThread.start()
+        status = self.client.writeFile("otherHost", "otherService", localPath, "remote/file")
+        serverThread.join()
+
+        self.assertTrue(status)
+        self.assertEqual(result["command"], "WRITE_FILE otherHost otherService")
+        with open(result["path"], "rb") as receivedFile:
+            self.assertEqual(receivedFile.read(), data)
+
+    def testWriteFileRejected(self):
+        localPath = os.path.join(self.directory.name, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(b"data")
+
+        sendPacket(self.serverSocket, AckPacket(0))
+        self.assertFalse(self.client.writeFile("otherHost", "otherService", localPath, "remote/file"))
+        self.assertFalse(self.client.writeFile("otherHost", "otherService", localPath + ".missing", "remote/file"))
+
+    def _serveAsyncFiles(self, listenSocket: socket.socket, files: list, result: dict):
+        serverSocket, _ = listenSocket.accept()
+        with serverSocket:
+            commandPacket = recvPacket(serverSocket, CommandPacket)
+            result["command"] = decryptCommand(commandPacket, self.client.aesKey)
+            sendPacket(serverSocket, AckPacket(1))
+
+            for tag, (localPath, remotePath) in enumerate(files):
+                sendPacket(serverSocket, AsyncNotificationPacket(AsyncEventType.FILE_EVENT, tag))
+                sendFile(serverSocket, localPath, remotePath, self.client.aesKey)
+                result.setdefault("acks", []).append(recvPacket(serverSocket, AckPacket).value)
+
+            result["done"].wait(5)
+
+    def testReadFileAsync(self):
+        files = []
+        for i in range(3):
+            localPath = os.path.join(self.directory.name, f"source{i}")
+            with open(localPath, "wb") as localFile:
+                localFile.write(bytes(randomBytes(5000 * i)))
+            files.append((localPath, f"inbox/file{i}"))
+
+        listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listenSocket.bind(("::", 0))
+        listenSocket.listen()
+        self.client.serverAddress = ("::ffff:127.0.0.1", listenSocket.getsockname()[1])
+
+        result = {"done": threading.Event()}
+        serverThread = threading.Thread(target=self._serveAsyncFiles, args=(listenSocket, files, result))
+        serverThread.start()
+
+        received = []
+        def callback(context, localPath):
+            context.append(localPath)
+            if len(context) == len(files):
+                result["done"].set()
+
+        threadCount = threading.active_count()
+        self.assertTrue(self.client.readFileAsync(os.path.join(self.directory.name, "out"), callback, received))
+        self.assertFalse(self.client.readFileAsync(self.directory.name, callback, received))
+        self.client.waitAsync()
+        serverThread.join()
+        listenSocket.close()
+
+        self.assertLessEqual(threading.active_count(), threadCount + 2)
+        self.assertEqual(result["command"], "READ_FILE_ASYNC")
+        self.assertEqual(result["acks"], [1, 1, 1])
+        self.assertEqual(received, [os.path.join(self.directory.name, "out", "inbox", f"file{i}") for i in range(3)])
+        for (localPath, _), receivedPath in zip(files, received):
+            with open(localPath, "rb") as sourceFile, open(receivedPath, "rb") as receivedFile:
+                self.assertEqual(sourceFile.read(), receivedFile.read())
+
+    def testStopAsync(self):
+        listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listenSocket.bind(("::", 0))
+        listenSocket.listen()
+        self.client.serverAddress = ("::ffff:127.0.0.1", listenSocket.getsockname()[1])
+
+        result = {"done": threading.Event()}
+        serverThread = threading.Thread(target=self._serveAsyncFiles, args=(listenSocket, [], result))
+        serverThread.start()
+
+        self.assertTrue(self.client.readFileAsync(self.directory.name, lambda context, localPath: None, None))
+        self.client.stopAsync()
+        self.assertIsNone(self.client.asyncFileThread)
+        result["done"].set()
+        serverThread.join()
+        listenSocket.close()
+
+    def testReadFileAsyncWrongPacket(self):
+        listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listenSocket.bind(("::", 0))
+        listenSocket.listen()
+        self.addCleanup(listenSocket.close)
+        self.client.serverAddress = ("::ffff:127.0.0.1", listenSocket.getsockname()[1])
+
+        def serve():
+            serverSocket, _ = listenSocket.accept()
+            with serverSocket:
+                recvPacket(serverSocket, CommandPacket)
+                sendPacket(serverSocket, AckPacket(1))
+                serverSocket.sendall(struct.pack(AsyncNotificationPacket.byteFormat, PacketType.ACK, 1, 0))
+                serverSocket.recv(1)
+
+        serverThread = threading.Thread(target=serve)
+        serverThread.start()
+
+        self.assertTrue(self.client.readFileAsync(self.directory.name, lambda context, localPath: None, None))
+        self.client.waitAsync()
+        self.assertIsNone(self.client.asyncFileThread)
+        serverThread.join()
+
+    def testReadFileAsyncRejected(self):
+        listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listenSocket.bind(("::", 0))
+        listenSocket.listen()
+        self.addCleanup(listenSocket.close)
+        self.client.serverAddress = ("::ffff:127.0.0.1", listenSocket.getsockname()[1])
+
+        def serve():
+            serverSocket, _ = listenSocket.accept()
+            with serverSocket:
+                recvPacket(serverSocket, CommandPacket)
+                sendPacket(serverSocket, AckPacket(0))
+                result["closed"] = serverSocket.recv(1) == b""
+
+        result = {}
+        serverThread = threading.Thread(target=serve)
+        serverThread.start()
+
+        self.assertFalse(self.client.readFileAsync(self.directory.name, lambda context, localPath: None, None))
+        serverThread.join(5)
+        self.assertTrue(result["closed"])
+        self.assertIsNone(self.client.asyncFileSocket)
+        self.assertIsNone(self.client.asyncFileArgs)
+
+    def testImportLoadsNoExecutor(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(homelink_python.__file__)))
+        script = (
+            "import sys\n"
+            "import homelink_python.client\n"
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('asyncio', 'concurrent')))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), "[]")
@@ -0,0 +1,111 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.compression import *
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import LoginStatus
+from homelink_python.security import randomBytes
+from homelink_python.transfer import *
+
+from support import HomeTestCase
+
+import json
+import os
+import socket
+import tempfile
+import zlib
+
+def _jsonLines(n: int) -> bytes:
+    return "".join(json.dumps({"id": i, "level": "info", "message": f"request {i} served"}) + "\n" for i in range(n)).encode("UTF-8")
+
+class TestCompression(HomeTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def testNegotiation(self):
+        self.assertIn("zlib", availableCodecs())
+        self.assertEqual(compressionOffer(None), "")
+        self.assertEqual(compressionOffer(["brotli"]), "")
+        self.assertEqual(compressionOffer("zlib"), "COMPRESS=zlib")
+        self.assertTrue(compressionOffer(True).endswith("zlib"))
+
+        self.assertEqual(selectCodec("COMPRESS=brotli,zlib"), CODEC_ZLIB)
+        self.assertEqual(selectCodec("COMPRESS=zlib", []), CODEC_NONE)
+        self.assertEqual(selectCodec("zlib"), CODEC_NONE)
+        self.assertIsNone(compressorForAck(1))
+        self.assertEqual(compressorForAck(1 | CODEC_ZLIB << COMPRESSION_ACK_SHIFT).codec.codecId, CODEC_ZLIB)
+
+    def testAdaptiveSkip(self):
+        compressor = BlockCompressor(ZlibCodec())
+        text = _jsonLines(200)[:FILE_BLOCK_SIZE]
+        codecId, compressed = compressor.compress(text)
+        self.assertEqual(codecId, CODEC_ZLIB)
+        self.assertEqual(zlib.decompress(compressed), text)
+
+        noise = bytes(randomBytes(FILE_BLOCK_SIZE))
+        outcomes = [compressor.compress(noise)[0] for _ in range(8)]
+        self.assertEqual(outcomes, [CODEC_NONE] * 8)
+        # Samples at blocks 0, 2 and 5 failed; the rest were skipped untried.
+        self.assertEqual(compressor.blocksSkipped, 5)
+
+        self.assertEqual(compressor.compress(bytes(100))[0], CODEC_NONE)
+        self.assertGreater(compressor.ratio(), 1.0)
+
+    def testDecompressionLimit(self):
+        bomb = zlib.compress(bytes(FILE_BLOCK_SIZE * 4))
+        self.assertIsNone(decompressBlock(CODEC_ZLIB, bomb, FILE_BLOCK_SIZE))
+        self.assertIsNone(decompressBlock(CODEC_ZLIB, b"garbage", FILE_BLOCK_SIZE))
+        self.assertIsNone(decompressBlock(200, b"", FILE_BLOCK_SIZE))
+
+    def testCompressedFrames(self):
+        aesKey = randomBytes(32)
+        data = _jsonLines(2000)
+        localPath = os.path.join(self.directory.name, "log.json")
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        compressor = BlockCompressor(ZlibCodec())
+        sender, receiver = socket.socketpair()
+        with sender, receiver:
+            buffers = encryptSmallFile(data, "copy", aesKey, compressor)
+            self.assertLess(sum(len(buffer) for buffer in buffers), len(data) // 2)
+
+            frame = encryptFileFrame(0, data[:FILE_BLOCK_SIZE], aesKey, BlockCompressor(ZlibCodec()))
+            sender.sendall(b"".join(frame))
+            self.assertEqual(recvFileFrame(receiver, aesKey), (0, data[:FILE_BLOCK_SIZE]))
+
+    def testWriteFileCompressed(self):
+        server = MockHomeLinkServer(directory=os.path.join(self.directory.name, "server"))
+        server.start()
+        self.addCleanup(server.stop)
+        client = HomeLinkClient("host", "service", "127.0.0.1", server.port, self.keyProvider, compression=["zlib"])
+        self.addCleanup(client.destruct)
+        self.assertTrue(client.connect())
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        files = {"log.json": _jsonLines(5000), "small.json": _jsonLines(20), "noise": os.urandom(FILE_BLOCK_SIZE * 3)}
+        for name, data in files.items():
+            with open(os.path.join(self.directory.name, name), "wb") as localFile:
+                localFile.write(data)
+
+        recorder = metrics.enableMetrics()
+        self.addCleanup(metrics.disableMetrics)
+        self.assertTrue(client.writeFile("other", "inbox", os.path.join(self.directory.name, "log.json"), "log.json"))
+        self.assertTrue(client.writeFiles(
+            "other", "inbox", [(os.path.join(self.directory.name, name), name) for name in ("small.json", "noise")]
+        ))
+
+        for name, data in files.items():
+            with open(os.path.join(server.directory, "other", "inbox", name), "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data, name)
+
+        labels = (("codec", "zlib"),)
+        self.assertGreater(recorder.counter("compression_bytes_in_total", labels), recorder.counter("compression_bytes_out_total", labels))
+        self.assertGreater(recorder.counter("compression_blocks_total", labels + (("outcome", "incompressible"),)), 0)
+        self.assertIsNotNone(recorder.histogram("compression_seconds", labels))
+
+        server.codecs = []
+        recorder.reset()
+        self.assertTrue(client.writeFile("other", "inbox", os.path.join(self.directory.name, "log.json"), "raw.json"))
+        self.assertEqual(recorder.counter("compression_bytes_in_total", labels), 0)
@@ -0,0 +1,84 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.fanout import *
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import LoginStatus
+from homelink_python.security import randomBytes
+from homelink_python.transfer import recvFile
+
+from support import HomeTestCase
+
+import os
+import socket
+import tempfile
+import threading
+
+class TestFanout(HomeTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.localPath = os.path.join(self.directory.name, "bundle")
+
+    def _writeSource(self, data: bytes):
+        with open(self.localPath, "wb") as localFile:
+            localFile.write(data)
+
+    def testSlowReceiverIsDetached(self):
+        data = os.urandom(4 << 20)
+        self._writeSource(data)
+        aesKey = randomBytes(32)
+
+        pairs = {key: socket.socketpair() for key in ("fast1", "fast2", "slow")}
+        fastDone = threading.Event()
+        received = {}
+
+        def receive(key):
+            if key == "slow":
+                fastDone.wait(30)
+            received[key] = recvFile(pairs[key][1], os.path.join(self.directory.name, key), aesKey)
+
+        threads = {key: threading.Thread(target=receive, args=(key,)) for key in pairs}
+        for thread in threads.values():
+            thread.start()
+
+        fanout = FileFanout(self.localPath, "firmware.bin", aesKey, queueDepth=32)
+        runThread = threading.Thread(target=lambda: received.setdefault("results", fanout.run({key: pair[0] for key, pair in pairs.items()})))
+        runThread.start()
+        threads["fast1"].join()
+        threads["fast2"].join()
+        fastDone.set()
+        runThread.join()
+        threads["slow"].join()
+        for sender, receiver in pairs.values():
+            sender.close()
+            receiver.close()
+
+        self.assertEqual(received["results"], dict.fromkeys(pairs, True))
+        # The fast receivers finished before the slow one read anything.
+        self.assertIn("slow", fanout.detached())
+        for key in pairs:
+            with open(received[key], "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data, key)
+
+    def testWriteFileToMany(self):
+        server = MockHomeLinkServer(directory=os.path.join(self.directory.name, "server"))
+        server.start()
+        self.addCleanup(server.stop)
+
+        data = bytes(randomBytes(300000))
+        self._writeSource(data)
+        destinations = [("host", f"service{i}") for i in range(6)]
+
+        for compression in (None, "zlib"):
+            client = HomeLinkClient("host", "admin", "127.0.0.1", server.port, self.keyProvider, compression=compression)
+            self.addCleanup(client.destruct)
+            self.assertTrue(client.connect())
+            self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+            results = client.writeFileToMany(destinations, self.localPath, "config/bundle")
+            self.assertEqual(results, dict.fromkeys(destinations, True))
+            for hostId, serviceId in destinations:
+                with open(os.path.join(server.directory, hostId, serviceId, "config", "bundle"), "rb") as receivedFile:
+                    self.assertEqual(receivedFile.read(), data)
+
+        self.assertEqual(client.writeFileToMany(destinations[:1], os.path.join(self.directory.name, "missing"), "x"), {destinations[0]: False})
@@ -0,0 +1,57 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.keys import *
+from homelink_python.security import RSA_KEY_SIZE
+
+from unittest import TestCase
+
+import os
+import stat
+import tempfile
+
+class TestKeys(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.keyFilePath = os.path.join(self.directory.name, "homelink", "client_key.pem")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testPersistentKeyProvider(self):
+        keypair = PersistentKeyProvider(self.keyFilePath).getKeypair()
+        self.assertEqual(keypair.size_in_bits(), RSA_KEY_SIZE)
+        self.assertTrue(keypair.has_private())
+        self.assertEqual(stat.S_IMODE(os.stat(self.keyFilePath).st_mode), 0o600)
+
+        provider = PersistentKeyProvider(self.keyFilePath)
+        self.assertEqual(provider.getKeypair(), keypair)
+        self.assertIs(provider.getKeypair(), provider.getKeypair())
+
+        os.chmod(self.keyFilePath, 0o644)
+        replaced = PersistentKeyProvider(self.keyFilePath).getKeypair()
+        self.assertNotEqual(replaced, keypair)
+        self.assertEqual(stat.S_IMODE(os.stat(self.keyFilePath).st_mode), 0o600)
+
+    def testRSAKeyPool(self):
+        pool = RSAKeyPool(2)
+        first = pool.getKeypair()
+        second = pool.getKeypair()
+        pool.close()
+
+        self.assertEqual(first.size_in_bits(), RSA_KEY_SIZE)
+        self.assertNotEqual(first, second)
+
+    def testClientLoadsKeypairLazily(self):
+        provider = PersistentKeyProvider(self.keyFilePath)
+        client = HomeLinkClient("host", "service", "127.0.0.1", 0, provider)
+        self.assertIsNone(client.keypair)
+        self.assertFalse(os.path.exists(self.keyFilePath))
+
+        client._loadKeypair()
+        self.assertIs(client.keypair, provider.getKeypair())
+        self.assertIn("PUBLIC KEY", client.clientPublicKey)
+
+    def testProcessKeyProvider(self):
+        provider = processKeyProvider()
+        self.assertIs(processKeyProvider(), provider)
+        self.assertIs(provider.getKeypair(), processKeyProvider().getKeypair())
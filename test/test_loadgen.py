@@ -0,0 +1,58 @@
+from homelink_python.loadgen import *
+
+from support import HomeTestCase
+
+import contextlib
+import io
+import json
+import os
+
+class TestLoadgen(HomeTestCase):
+
+    def _options(self, *args) -> list:
+        return [
+            "--hosts", "2", "--services-per-host", "2", "--duration", "0.5", "--ramp-up", "0.1",
+            "--command-rate", "20", "--write-rate", "4", "--file-size", "1000", *args,
+        ]
+
+    def testPercentile(self):
+        samples = [i / 100 for i in range(1, 101)]
+        recorder = LatencyRecorder()
+        for sample in samples:
+            recorder.record("command", sample, True)
+        recorder.record("command", 0, False)
+        other = LatencyRecorder()
+        other.record("login", 0.5, True)
+        recorder.merge(other.toDict())
+
+        report = recorder.report(10.0)
+        self.assertEqual(list(report), ["login", "command"])
+        self.assertEqual(report["command"]["count"], 100)
+        self.assertEqual(report["command"]["errors"], 1)
+        self.assertAlmostEqual(report["command"]["rate"], 10.0)
+        self.assertAlmostEqual(report["command"]["p50_ms"], 510)
+        self.assertAlmostEqual(report["command"]["p99_ms"], 1000)
+
+    def testModes(self):
+        for mode in ("threads", "asyncio"):
+            report = runLoad(parseArgs(self._options("--mode", mode)))
+            operations = report["operations"]
+            self.assertEqual(report["services"], 4)
+            self.assertEqual(operations["connect"]["count"], 4)
+            self.assertEqual(operations["register_host"]["count"], 2)
+            self.assertEqual(operations["login"]["count"], 4)
+            self.assertGreater(operations["command"]["count"], 4)
+            self.assertGreater(operations["write_file"]["count"], 0)
+            self.assertFalse(any(entry["errors"] for entry in operations.values()))
+
+    def testMain(self):
+        reportPath = os.path.join(self.home.name, "report.json")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(self._options("--mode", "processes", "--processes", "2", "--json", reportPath))
+
+        self.assertIn("command", output.getvalue())
+        with open(reportPath) as reportFile:
+            report = json.load(reportFile)
+        self.assertEqual(report["mode"], "processes")
+        self.assertEqual(report["operations"]["login"]["count"], 4)
@@ -0,0 +1,97 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.metrics import *
+from homelink_python.packet import LoginStatus
+
+from support import HomeTestCase
+
+import logging
+import os
+
+class TestMetrics(HomeTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startServer()
+        cls.keyProvider.getKeypair()
+
+    def tearDown(self):
+        disableMetrics()
+
+    def _session(self):
+        client = HomeLinkClient("host", "service", "127.0.0.1", self.server.port, self.keyProvider)
+        self.assertTrue(client.connect())
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.assertTrue(client.ping())
+        client.logout()
+        client.destruct()
+
+    def testDisabledByDefault(self):
+        self.assertIsNone(metrics.current)
+        self._session()
+        self.assertIsNone(metrics.current)
+
+    def testSessionMetrics(self):
+        recorder = enableMetrics()
+        self._session()
+
+        for phaseName in ("connect.tcp", "connect.round_trip", "connect.rsa_decrypt", "login.rsa_encrypt", "login.round_trip"):
+            self.assertEqual(recorder.histogram("phase_seconds", (("phase", phaseName),)).count, 1)
+
+        self.assertEqual(recorder.counter("packets_sent_total", (("type", "KEY_REQUEST"),)), 1)
+        self.assertEqual(recorder.counter("packets_received_total", (("type", "LOGIN_RESPONSE"),)), 1)
+        self.assertEqual(recorder.counter("packets_sent_total", (("type", "COMMAND"),)), 1)
+        # The mock server runs in this process, so its RSA work is counted too.
+        self.assertGreaterEqual(recorder.counter("crypto_operations_total", (("op", "rsa_decrypt"),)), 1)
+        self.assertGreater(recorder.counter("bytes_sent_total"), 0)
+        self.assertGreater(recorder.counter("bytes_received_total"), 0)
+
+    def testHistogram(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.toDict()["buckets"], {"0.1": 2, "1.0": 3, "+Inf": 4})
+        self.assertEqual(histogram.count, 4)
+
+    def testPrometheus(self):
+        recorder = Metrics()
+        recorder.increment("packets_sent_total", 3, (("type", "ACK"),))
+        recorder.observe("phase_seconds", 0.002, (("phase", "login.round_trip"),))
+        recorder.set("notification_queue_depth", 7)
+        text = recorder.toPrometheus()
+
+        self.assertIn("# TYPE homelink_packets_sent_total counter", text)
+        self.assertIn('homelink_packets_sent_total{type="ACK"} 3', text)
+        self.assertIn("# TYPE homelink_phase_seconds histogram", text)
+        self.assertIn('homelink_phase_seconds_bucket{phase="login.round_trip",le="0.0025"} 1', text)
+        self.assertIn('homelink_phase_seconds_count{phase="login.round_trip"} 1', text)
+        self.assertIn("# TYPE homelink_notification_queue_depth gauge", text)
+        self.assertIn("homelink_notification_queue_depth 7", text)
+        self.assertEqual(recorder.gauge("notification_queue_depth"), 7)
+
+        filePath = os.path.join(self.home.name, "homelink.prom")
+        PrometheusSink(filePath).emit(recorder)
+        with open(filePath) as promFile:
+            self.assertEqual(promFile.read(), text)
+
+    def testSinks(self):
+        snapshots = []
+        recorder = Metrics([CallbackSink(snapshots.append)])
+        recorder.increment("send_timeouts_total")
+        recorder.flush()
+        self.assertEqual(snapshots[0]["counters"], {"send_timeouts_total": 1})
+
+        with self.assertLogs("homelink_python", logging.INFO) as logs:
+            LogSink().emit(recorder)
+        self.assertIn('"send_timeouts_total": 1', logs.output[0])
+
+    def testPeriodicFlush(self):
+        snapshots = []
+        recorder = Metrics([CallbackSink(snapshots.append)], interval=0.01)
+        recorder.increment("bytes_sent_total", 10)
+        while not snapshots:
+            recorder.stopped.wait(0.01)
+        recorder.close()
+        self.assertEqual(snapshots[-1]["counters"]["bytes_sent_total"], 10)
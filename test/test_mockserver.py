@@ -0,0 +1,98 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import LoginStatus, RegisterStatus
+from homelink_python.security import randomBytes
+
+from support import HomeTestCase
+
+import os
+import tempfile
+import threading
+
+class TestMockServer(HomeTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.server = MockHomeLinkServer(services={}, directory=self.directory.name)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def _client(self, hostId: str, serviceId: str) -> HomeLinkClient:
+        client = HomeLinkClient(hostId, serviceId, "127.0.0.1", self.server.port, self.keyProvider)
+        self.addCleanup(client.destruct)
+        self.assertTrue(client.connect())
+        return client
+
+    def testRegistration(self):
+        client = self._client("host", "service")
+        self.assertEqual(client.login("password"), LoginStatus.NO_SUCH_SERVICE)
+
+        self.assertEqual(client.registerHost(), RegisterStatus.REGISTER_SUCCESS)
+        self.assertEqual(client.registerService("service", "password"), RegisterStatus.REGISTER_SUCCESS)
+        self.assertEqual(client.registerService("service", "password"), RegisterStatus.ALREADY_EXISTS)
+        self.assertEqual(client.registerService("s" * 33, "password"), RegisterStatus.REGISTER_FAILED)
+
+        self.assertEqual(client.login("wrong"), LoginStatus.LOGIN_FAILED)
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.assertTrue(client.ping())
+
+    def testServiceNeedsHost(self):
+        client = self._client("host", "service")
+        self.assertEqual(client.registerService("service", "password"), RegisterStatus.REGISTER_FAILED)
+
+    def testFileNotification(self):
+        listener = self._client("host", "inbox")
+        listener.registerHost()
+        listener.registerService("inbox", "password")
+        listener.registerService("outbox", "password")
+        self.assertEqual(listener.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        received = []
+        event = threading.Event()
+        def callback(context, localPath):
+            received.append((context, localPath))
+            event.set()
+
+        outputDirectory = os.path.join(self.directory.name, "listener")
+        self.assertTrue(listener.readFileAsync(outputDirectory, callback, "context"))
+
+        writer = self._client("host", "outbox")
+        self.assertEqual(writer.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        localPath = os.path.join(self.directory.name, "source")
+        data = bytes(randomBytes(50000))
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+        self.assertTrue(writer.writeFile("host", "inbox", localPath, "notes/file"))
+
+        self.assertTrue(event.wait(10))
+        self.assertEqual(received, [("context", os.path.join(outputDirectory, "notes", "file"))])
+        with open(received[0][1], "rb") as receivedFile:
+            self.assertEqual(receivedFile.read(), data)
+
+    def testReadFile(self):
+        reader = self._client("host", "inbox")
+        reader.registerHost()
+        reader.registerService("inbox", "password")
+        reader.registerService("outbox", "password")
+        self.assertEqual(reader.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        outputDirectory = os.path.join(self.directory.name, "reader")
+        self.assertIsNone(reader.readFile(outputDirectory))
+
+        writer = self._client("host", "outbox")
+        self.assertEqual(writer.login("password"), LoginStatus.LOGIN_SUCCESS)
+        localPath = os.path.join(self.directory.name, "source")
+        files = {"a/one": bytes(randomBytes(100000)), "a/two": b""}
+        for remotePath, data in files.items():
+            with open(localPath, "wb") as localFile:
+                localFile.write(data)
+            self.assertTrue(writer.writeFile("host", "inbox", localPath, remotePath))
+
+        for remotePath, data in files.items():
+            receivedPath = reader.readFile(outputDirectory)
+            self.assertEqual(receivedPath, os.path.join(outputDirectory, remotePath))
+            with open(receivedPath, "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data)
+        self.assertIsNone(reader.readFile(outputDirectory))
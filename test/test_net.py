@@ -0,0 +1,104 @@
+from homelink_python import metrics
+from homelink_python.metrics import Metrics
+from homelink_python.net import *
+
+from unittest import TestCase
+
+import socket
+import threading
+import time
+
+class TestNet(TestCase):
+
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def testReceiveBufferTcpManyChunks(self):
+        data = bytes(range(256)) * 64
+
+        def trickle():
+            for i in range(0, len(data), 512):
+                self.sender.sendall(data[i:i + 512])
+                time.sleep(0.001)
+
+        senderThread = threading.Thread(target=trickle)
+        senderThread.start()
+        received = receiveBufferTcp(self.receiver, len(data))
+        senderThread.join()
+
+        self.assertIsInstance(received, bytearray)
+        self.assertEqual(received, data)
+
+    def testReceiveBufferTcpIntoBuffer(self):
+        buffer = bytearray(64)
+        self.sender.sendall(b"0123456789")
+        received = receiveBufferTcp(self.receiver, 10, buffer)
+
+        self.assertIsInstance(received, memoryview)
+        self.assertEqual(received, b"0123456789")
+        self.assertEqual(buffer[:10], b"0123456789")
+
+    def testReceiveBufferTcpClosed(self):
+        self.sender.sendall(b"short")
+        self.sender.close()
+        self.assertIsNone(receiveBufferTcp(self.receiver, 10))
+
+    def testBufferPool(self):
+        pool = BufferPool(128, 1)
+        first = pool.acquire()
+        self.assertEqual(len(first), 128)
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertIsNot(pool.acquire(), first)
+        self.assertEqual(len(pool.acquire(1000)), 1000)
+
+        pool.release(bytearray(128))
+        pool.release(bytearray(128))
+        self.assertEqual(len(pool.buffers), 1)
+
+    def _receiveAll(self, n: int, result: list):
+        result.append(receiveBufferTcp(self.receiver, n))
+
+    def testSendBufferTcpLarge(self):
+        data = bytes(range(256)) * 16384
+        result = []
+        receiverThread = threading.Thread(target=self._receiveAll, args=(len(data), result))
+        receiverThread.start()
+        self.assertTrue(sendBufferTcp(self.sender, bytearray(data)))
+        receiverThread.join()
+        self.assertEqual(result[0], data)
+
+    def testSendBuffersTcp(self):
+        buffers = [bytes([i % 256]) * (i * 37 % 5000) for i in range(2 * SEND_IOV_MAX)]
+        buffers.append(bytearray(1 << 20))
+        data = b"".join(buffers)
+        result = []
+        receiverThread = threading.Thread(target=self._receiveAll, args=(len(data), result))
+        receiverThread.start()
+        self.assertTrue(sendBuffersTcp(self.sender, buffers))
+        receiverThread.join()
+        self.assertEqual(result[0], data)
+
+    def testSendRetryMetrics(self):
+        recorder = metrics.enableMetrics(Metrics())
+        self.addCleanup(metrics.disableMetrics)
+
+        class SlowSocket:
+            def __init__(self):
+                self.calls = 0
+
+            def sendmsg(self, buffers):
+                # A timeout first, then one byte per call.
+                self.calls += 1
+                if self.calls == 1:
+                    raise socket.timeout()
+                return 1
+
+        self.assertTrue(sendBuffersTcp(SlowSocket(), [b"abc", b"de"]))
+        self.assertEqual(recorder.counter("bytes_sent_total"), 5)
+        self.assertEqual(recorder.counter("send_timeouts_total"), 1)
+        self.assertEqual(recorder.counter("send_retries_total"), 1)
@@ -0,0 +1,134 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.metrics import Metrics
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.notifications import *
+from homelink_python.packet import AsyncEventType, LoginStatus
+from homelink_python.security import randomBytes
+
+from support import HomeTestCase
+
+import os
+import threading
+
+class TestNotifications(HomeTestCase):
+
+    def _dispatcher(self, **kwargs) -> NotificationDispatcher:
+        dispatcher = NotificationDispatcher(**kwargs)
+        self.addCleanup(dispatcher.close)
+        return dispatcher
+
+    def testCoalescing(self):
+        dispatcher = self._dispatcher(workers=1, coalesceWindow=0.2)
+        received = []
+        dispatcher.subscribe(AsyncEventType.FILE_EVENT, received.append)
+
+        for i in range(5):
+            self.assertTrue(dispatcher.dispatch(AsyncEventType.FILE_EVENT, 1, f"path{i}"))
+        self.assertTrue(dispatcher.dispatch(AsyncEventType.FILE_EVENT, 2, "other"))
+        self.assertTrue(dispatcher.drain(5))
+
+        self.assertEqual([(n.tag, n.payload, n.count) for n in received], [(1, "path4", 5), (2, "other", 1)])
+        self.assertEqual(dispatcher.coalesced, 4)
+        self.assertEqual(dispatcher.dispatched, 2)
+
+    def testSubscriptions(self):
+        dispatcher = self._dispatcher(coalesceWindow=0)
+        fileEvents = []
+        allEvents = []
+        dispatcher.subscribe(AsyncEventType.FILE_EVENT, fileEvents.append)
+        dispatcher.subscribe(AsyncEventType.ANY_EVENT, allEvents.append)
+
+        dispatcher.dispatch(AsyncEventType.FILE_EVENT, 1)
+        dispatcher.dispatch(7, 1)
+        self.assertTrue(dispatcher.drain(5))
+        self.assertEqual([n.eventType for n in fileEvents], [AsyncEventType.FILE_EVENT])
+        self.assertEqual(sorted(n.eventType for n in allEvents), [AsyncEventType.FILE_EVENT, 7])
+
+        dispatcher.unsubscribe(AsyncEventType.ANY_EVENT, allEvents.append)
+        dispatcher.dispatch(7, 2)
+        self.assertTrue(dispatcher.drain(5))
+        self.assertEqual(len(allEvents), 2)
+
+    def testFullQueueDrops(self):
+        recorder = metrics.enableMetrics(Metrics())
+        self.addCleanup(metrics.disableMetrics)
+
+        dispatcher = self._dispatcher(workers=1, maxQueue=4, coalesceWindow=0)
+        release = threading.Event()
+        started = threading.Event()
+        def handler(notification):
+            started.set()
+            release.wait(10)
+        dispatcher.subscribe(AsyncEventType.ANY_EVENT, handler)
+
+        dispatcher.dispatch(1, 0)
+        self.assertTrue(started.wait(5))
+        results = [dispatcher.dispatch(1, tag) for tag in range(1, 8)]
+        release.set()
+        self.assertTrue(dispatcher.drain(5))
+
+        self.assertEqual(results, [True] * 4 + [False] * 3)
+        self.assertEqual(dispatcher.dropped, 3)
+        self.assertEqual(recorder.counter("notifications_total", (("outcome", "dropped"),)), 3)
+        self.assertEqual(recorder.counter("notifications_dispatched_total"), 5)
+        self.assertEqual(recorder.gauge("notification_queue_depth"), 0)
+
+    def testHandlerFailure(self):
+        dispatcher = self._dispatcher(coalesceWindow=0)
+        received = []
+        def failing(notification):
+            raise RuntimeError("handler")
+        dispatcher.subscribe(1, failing)
+        dispatcher.subscribe(1, received.append)
+
+        dispatcher.dispatch(1, 1)
+        self.assertTrue(dispatcher.drain(5))
+        self.assertEqual(len(received), 1)
+
+    def testCloseRunsQueuedEvents(self):
+        dispatcher = NotificationDispatcher(coalesceWindow=10)
+        received = []
+        dispatcher.subscribe(1, received.append)
+        dispatcher.dispatch(1, 1)
+        dispatcher.close()
+
+        self.assertEqual(len(received), 1)
+        self.assertFalse(dispatcher.dispatch(1, 2))
+
+    def testClientDispatch(self):
+        server = MockHomeLinkServer(services={}, directory=self.home.name)
+        server.start()
+        self.addCleanup(server.stop)
+
+        dispatcher = self._dispatcher(coalesceWindow=0)
+        listener = HomeLinkClient("host", "inbox", "127.0.0.1", server.port, self.keyProvider, notificationDispatcher=dispatcher)
+        self.addCleanup(listener.destruct)
+        self.assertTrue(listener.connect())
+        listener.registerHost()
+        listener.registerService("inbox", "password")
+        listener.registerService("outbox", "password")
+        self.assertEqual(listener.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        received = []
+        event = threading.Event()
+        def callback(context, localPath):
+            received.append((context, localPath))
+            event.set()
+
+        outputDirectory = os.path.join(self.home.name, "listener")
+        self.assertTrue(listener.readFileAsync(outputDirectory, callback, "context"))
+
+        writer = HomeLinkClient("host", "outbox", "127.0.0.1", server.port, self.keyProvider)
+        self.addCleanup(writer.destruct)
+        self.assertTrue(writer.connect())
+        self.assertEqual(writer.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        localPath = os.path.join(self.home.name, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(bytes(randomBytes(50000)))
+        self.assertTrue(writer.writeFile("host", "inbox", localPath, "file"))
+
+        self.assertTrue(event.wait(10))
+        self.assertEqual(received, [("context", os.path.join(outputDirectory, "file"))])
+        self.assertEqual(dispatcher.dispatched, 1)
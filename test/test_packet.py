@@ -0,0 +1,53 @@
+from homelink_python.packet import *
+
+from unittest import TestCase
+
+import socket
+
+class TestPacket(TestCase):
+
+    def setUp(self):
+        self.packets = [
+            AckPacket(7),
+            ConnectionRequestPacket(1, "key"),
+            ConnectionResponsePacket(True, "key", bytes(256)),
+            CommandPacket(1, bytes(80), bytes(256)),
+            PipelinedCommandPacket(1, 2, bytes(80), bytes(256)),
+            CommandResponsePacket(2, 1),
+            LoginRequestPacket(1, "host", "service", bytes(256)),
+            LoginResponsePacket(LoginStatus.LOGIN_SUCCESS, bytes(80)),
+            RegisterRequestPacket(RegistrationType.HOST_REGISTRATION, "host", "", bytes(256)),
+            RegisterResponsePacket(RegisterStatus.REGISTER_SUCCESS),
+            LogoutPacket(1, bytes(256)),
+            AsyncNotificationPacket(AsyncEventType.FILE_EVENT, 3),
+        ]
+
+    def testRoundTrip(self):
+        for packet in self.packets:
+            PacketClass = packet.__class__
+            data = PacketClass.serialize(packet)
+            self.assertEqual(len(data), PacketClass.size())
+            self.assertIs(PACKET_CLASSES[packet.packetType], PacketClass)
+            self.assertEqual(PacketClass.serialize(PacketClass.deserialize(data)), data)
+            self.assertEqual(PacketClass.serialize(PacketClass.deserialize(b"xx" + data, 2)), data)
+            self.assertFalse(hasattr(packet, "__dict__"))
+
+    def testWrongPacketType(self):
+        data = AckPacket.serialize(AckPacket(1))
+        with self.assertRaises(PacketTypeException):
+            RegisterResponsePacket.deserialize(data[:2])
+
+    def testRecvAnyPacket(self):
+        sender, receiver = socket.socketpair()
+        for packet in self.packets:
+            sendPacket(sender, packet)
+
+        for packet in self.packets:
+            received = recvAnyPacket(receiver)
+            self.assertIs(received.__class__, packet.__class__)
+            self.assertEqual(packet.__class__.serialize(received), packet.__class__.serialize(packet))
+
+        sender.sendall(bytes([PacketType.HANDSHAKE]))
+        self.assertIsNone(recvAnyPacket(receiver))
+        sender.close()
+        receiver.close()
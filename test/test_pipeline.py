@@ -0,0 +1,66 @@
+from homelink_python.client import HomeLinkClient, COMMAND_MAX_LENGTH
+from homelink_python.packet import LoginStatus, PacketTypeException
+
+from support import HomeTestCase
+
+from unittest import mock
+
+import threading
+
+class TestPipeline(HomeTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startServer()
+
+    def _client(self) -> HomeLinkClient:
+        client = HomeLinkClient("host", "service", "127.0.0.1", self.server.port, self.keyProvider)
+        self.assertTrue(client.connect())
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.addCleanup(client.destruct)
+        return client
+
+    def testSubmitCommands(self):
+        client = self._client()
+        futures = client.submitCommands(["PING", "UNKNOWN", "PING"] * 50)
+        results = [future.result(5) for future in futures]
+        self.assertEqual(results, [True, False, True] * 50)
+
+    def testSubmitFromThreads(self):
+        client = self._client()
+        results = [None] * 8
+
+        def submit(i):
+            results[i] = [future.result(5) for future in client.submitCommands(["PING"] * 20)]
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(results))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [[True] * 20] * len(results))
+
+    def testCommandTooLong(self):
+        client = self._client()
+        self.assertFalse(client.submitCommand("P" * (COMMAND_MAX_LENGTH + 1)).result(5))
+        self.assertTrue(client.submitCommand("PING").result(5))
+
+    def testSyncAfterPipeline(self):
+        client = self._client()
+        self.assertTrue(client.submitCommand("PING").result(5))
+        self.assertTrue(client.ping())
+
+    def testSyncWaitsForPipeline(self):
+        client = self._client()
+        futures = client.submitCommands(["PING"] * 300)
+        self.assertTrue(client.ping())
+        self.assertEqual([future.result(5) for future in futures], [True] * 300)
+
+    def testReaderFailure(self):
+        client = self._client()
+        with mock.patch("homelink_python.pipeline.recvPacket", side_effect=PacketTypeException()):
+            futures = client.submitCommands(["PING"] * 3)
+            self.assertEqual([future.result(5) for future in futures], [False] * 3)
+        self.assertTrue(client.commandPipeline.idle())
@@ -0,0 +1,88 @@
+from homelink_python.pool import *
+
+from support import HomeTestCase
+
+from unittest import mock
+
+class TestPool(HomeTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startServer(services={("host", "service"): "password"})
+
+    def _pool(self, **kwargs) -> HomeLinkClientPool:
+        pool = HomeLinkClientPool("127.0.0.1", self.server.port, keyProvider=self.keyProvider, **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def testSessionReuse(self):
+        pool = self._pool()
+        with pool.session("host", "service", "password") as client:
+            self.assertTrue(client.ping())
+            first = client
+
+        with pool.session("host", "service", "password") as client:
+            self.assertIs(client, first)
+            self.assertTrue(client.ping())
+
+    def testMaxSize(self):
+        pool = self._pool(maxSize=1)
+        client = pool.acquire("host", "service", "password")
+        self.assertIsNotNone(client)
+        self.assertIsNone(pool.acquire("host", "service", "password", timeout=0.05))
+
+        pool.release(client)
+        self.assertIs(pool.acquire("host", "service", "password", timeout=0.05), client)
+        pool.release(client)
+
+    def testIdleEviction(self):
+        pool = self._pool(maxIdleTime=0)
+        with pool.session("host", "service", "password") as client:
+            first = client
+
+        with pool.session("host", "service", "password") as client:
+            self.assertIsNot(client, first)
+        self.assertFalse(first.active)
+
+    def testReloginAfterSessionLoss(self):
+        pool = self._pool(healthCheckAge=0)
+        with pool.session("host", "service", "password") as client:
+            first = client
+            connectionId = client.connectionId
+
+        with self.server.lock:
+            self.server.sessions.clear()
+
+        with pool.session("host", "service", "password") as client:
+            self.assertIs(client, first)
+            self.assertNotEqual(client.connectionId, connectionId)
+            self.assertTrue(client.ping())
+
+    def testFailedLogin(self):
+        pool = self._pool()
+        with self.assertRaises(HomeLinkPoolException):
+            with pool.session("host", "service", "wrong"):
+                pass
+        self.assertEqual(pool.sizes[("host", "service")], 0)
+
+    def testBrokenSessionNotReturned(self):
+        pool = self._pool()
+        with self.assertRaises(RuntimeError):
+            with pool.session("host", "service", "password") as client:
+                first = client
+                raise RuntimeError()
+
+        with pool.session("host", "service", "password") as client:
+            self.assertIsNot(client, first)
+
+    def testFailedCreationFreesSlot(self):
+        pool = self._pool(maxSize=1)
+        with mock.patch.object(HomeLinkClient, "connect", side_effect=OSError("refused")):
+            with self.assertRaises(OSError):
+                pool.acquire("host", "service", "password")
+        self.assertEqual(pool.sizes[("host", "service")], 0)
+
+        client = pool.acquire("host", "service", "password", timeout=1)
+        self.assertIsNotNone(client)
+        pool.release(client)
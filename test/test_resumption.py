@@ -0,0 +1,104 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.packet import LoginStatus
+from homelink_python.resumption import *
+
+from support import HomeTestCase
+
+import os
+import stat
+
+class TestResumption(HomeTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.startServer()
+
+    def _client(self, sessionCache) -> HomeLinkClient:
+        client = HomeLinkClient("host", "service", "127.0.0.1", self.server.port, self.keyProvider, sessionCache)
+        self.addCleanup(client.destruct)
+        return client
+
+    def _loggedIn(self, sessionCache) -> HomeLinkClient:
+        client = self._client(sessionCache)
+        self.assertTrue(client.connect())
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.assertFalse(client.resumed)
+        return client
+
+    def testResume(self):
+        sessionCache = MemorySessionCache()
+        self._loggedIn(sessionCache).destruct()
+        handshakeCount = self.server.handshakeCount
+
+        client = self._client(sessionCache)
+        self.assertTrue(client.connect())
+        self.assertTrue(client.resumed)
+        self.assertIsNone(client.keypair)
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.assertTrue(client.ping())
+        self.assertEqual(self.server.handshakeCount, handshakeCount)
+
+    def testResumeRejected(self):
+        sessionCache = MemorySessionCache()
+        self._loggedIn(sessionCache).destruct()
+        with self.server.lock:
+            self.server.sessions.clear()
+
+        client = self._client(sessionCache)
+        self.assertTrue(client.connect())
+        self.assertFalse(client.resumed)
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.assertTrue(client.ping())
+
+    def testLogoutForgetsSession(self):
+        sessionCache = MemorySessionCache()
+        client = self._loggedIn(sessionCache)
+        client.logout()
+
+        self.assertIsNone(sessionCache.load(client._sessionCacheKey()))
+
+    def testExpiredSession(self):
+        sessionCache = MemorySessionCache(ttl=0)
+        self._loggedIn(sessionCache).destruct()
+
+        client = self._client(sessionCache)
+        self.assertTrue(client.connect())
+        self.assertFalse(client.resumed)
+
+    def testFileSessionCache(self):
+        cacheFilePath = os.path.join(self.home.name, "cache", "sessions.cache")
+        client = self._loggedIn(FileSessionCache(cacheFilePath))
+        client.destruct()
+
+        self.assertEqual(stat.S_IMODE(os.stat(cacheFilePath).st_mode), 0o600)
+
+        resumed = self._client(FileSessionCache(cacheFilePath))
+        self.assertTrue(resumed.connect())
+        self.assertTrue(resumed.resumed)
+        self.assertTrue(resumed.ping())
+
+        os.chmod(cacheFilePath, 0o644)
+        self.assertIsNone(FileSessionCache(cacheFilePath).load(client._sessionCacheKey()))
+
+    def testFileSessionCacheIsBestEffort(self):
+        blockingPath = os.path.join(self.home.name, "not-a-directory")
+        open(blockingPath, "w").close()
+
+        client = self._loggedIn(FileSessionCache(os.path.join(blockingPath, "sessions.cache")))
+        self.assertTrue(client.ping())
+
+    def testSuspend(self):
+        client = self._loggedIn(None)
+        handshakeCount = self.server.handshakeCount
+
+        self.assertTrue(client.suspend())
+        self.assertIsNone(client.syncSocket)
+        self.assertFalse(client.suspend())
+
+        self.assertTrue(client.ping())
+        self.assertIsNotNone(client.syncSocket)
+        self.assertEqual(self.server.handshakeCount, handshakeCount)
+
+        self.assertTrue(client.suspend())
+        self.assertEqual([future.result() for future in client.submitCommands(["PING", "PING"])], [True, True])
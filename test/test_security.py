@@ -17,4 +17,37 @@ class TestSecurity(TestCase):
         self.assertEqual(key.size_in_bits(), RSA_KEY_SIZE)
         self.assertTrue(key.can_encrypt())
         self.assertTrue(key.has_private())
-        self.assertTrue(key.can_sign())
\ No newline at end of file
+        self.assertTrue(key.can_sign())
+
+    def testCryptoContext(self):
+        keypair = generateRSAKeys()
+        aesKey = randomBytes(32)
+        context = CryptoContext(getRSAPublicKey(keypair), aesKey, "s" * 32, keypair)
+
+        data = randomBytes(192)
+        self.assertEqual(rsaDecrypt(context.rsaEncrypt(data), keypair), data)
+        self.assertEqual(context.rsaDecrypt(rsaEncrypt(data, getRSAPublicKey(keypair))), data)
+        self.assertEqual(decryptSessionKey(context.encryptSessionKey(), aesKey).rstrip("\x00"), "s" * 32)
+
+        iv = randomBytes(16)
+        self.assertEqual(context.aesEncrypt(data, iv), aesEncrypt(data, aesKey, iv))
+
+        blocks = [randomBytes(n) for n in [0, 1, 100, 8192]]
+        encrypted = context.aesEncryptBatch(blocks)
+        self.assertEqual(len({bytes(iv) for _, iv, _ in encrypted}), len(blocks))
+        self.assertEqual(context.aesDecryptBatch(encrypted), blocks)
+
+    def testSharedKeys(self):
+        keypair = generateRSAKeys()
+        serverKeypair = generateRSAKeys()
+        first = CryptoContext(getRSAPublicKey(serverKeypair), keypair=keypair)
+        second = CryptoContext(getRSAPublicKey(serverKeypair), keypair=keypair)
+
+        data = randomBytes(32)
+        self.assertEqual(rsaDecrypt(first.rsaEncrypt(data), serverKeypair), data)
+        self.assertEqual(rsaDecrypt(second.rsaEncrypt(data), serverKeypair), data)
+        self.assertIs(first.serverPublicKey, second.serverPublicKey)
+        self.assertIs(first.serverRsaCipher, second.serverRsaCipher)
+        self.assertIs(first.clientRsaCipher, second.clientRsaCipher)
+        self.assertIs(clientIdentity(keypair).publicKey, clientIdentity(keypair).publicKey)
+        self.assertFalse(hasattr(first, "__dict__"))
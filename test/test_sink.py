@@ -0,0 +1,83 @@
+from homelink_python import net
+from homelink_python.sink import *
+
+from unittest import TestCase, mock
+
+import os
+import tempfile
+
+class TestSink(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.localPath = os.path.join(self.directory.name, "file")
+
+    def testOutOfOrderWrites(self):
+        data = os.urandom(30000)
+        sink = FileSink(self.localPath, len(data))
+        self.assertTrue(sink.open())
+        self.assertEqual(os.path.getsize(sink.tempPath), len(data))
+
+        for offset in (20000, 0, 10000):
+            self.assertTrue(sink.write(offset, data[offset:offset + 10000]))
+        self.assertFalse(os.path.exists(self.localPath))
+
+        self.assertEqual(sink.commit(), self.localPath)
+        self.assertEqual(os.listdir(self.directory.name), ["file"])
+        with open(self.localPath, "rb") as localFile:
+            self.assertEqual(localFile.read(), data)
+
+    def testReplayedBlock(self):
+        data = os.urandom(30000)
+        sink = FileSink(self.localPath, len(data), fsync=False)
+        self.assertTrue(sink.open())
+        self.assertTrue(sink.write(0, data[:10000]))
+        self.assertTrue(sink.write(10000, data[10000:20000]))
+        self.assertFalse(sink.write(10000, data[10000:20000]))
+        self.assertFalse(sink.write(5000, data[5000:15000]))
+        self.assertFalse(sink.complete())
+
+        self.assertIsNone(sink.commit())
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def testCommitSyncsDirectory(self):
+        sink = FileSink(self.localPath, 3)
+        self.assertTrue(sink.open())
+        self.assertTrue(sink.write(0, b"abc"))
+
+        with mock.patch("homelink_python.sink.os.fsync", wraps=os.fsync) as fsync:
+            self.assertEqual(sink.commit(), self.localPath)
+        self.assertEqual(fsync.call_count, 2)
+
+    def testAbort(self):
+        with open(self.localPath, "wb") as localFile:
+            localFile.write(b"previous")
+
+        sink = FileSink(self.localPath, 10, fsync=False)
+        self.assertTrue(sink.open())
+        self.assertFalse(sink.write(5, b"too long!"))
+        sink.abort()
+
+        self.assertEqual(os.listdir(self.directory.name), ["file"])
+        with open(self.localPath, "rb") as localFile:
+            self.assertEqual(localFile.read(), b"previous")
+
+    def testEmptyFile(self):
+        sink = FileSink(self.localPath, 0)
+        self.assertTrue(sink.open())
+        self.assertEqual(sink.commit(), self.localPath)
+        self.assertEqual(os.path.getsize(self.localPath), 0)
+
+    def testParentDirectoryCache(self):
+        localPath = os.path.join(self.directory.name, "a", "b", "file")
+        net._makeParentDirectory(localPath)
+        self.assertIn(os.path.dirname(localPath), net._createdDirectories)
+
+        # A cached directory that disappeared is created again on open().
+        os.rmdir(os.path.dirname(localPath))
+        net._makeParentDirectory(localPath)
+        sink = FileSink(localPath, 3, fsync=False)
+        self.assertTrue(sink.open())
+        self.assertTrue(sink.write(0, b"abc"))
+        self.assertEqual(sink.commit(), localPath)
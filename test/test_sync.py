@@ -0,0 +1,164 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import LoginStatus
+from homelink_python.security import randomBytes
+from homelink_python.sync import *
+from homelink_python.sync import _rollingSearch
+
+from support import HomeTestCase
+
+import os
+import socket
+import tempfile
+import threading
+import zlib
+
+class TestSync(HomeTestCase):
+
+    def setUp(self):
+        self.aesKey = randomBytes(32)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.recorder = metrics.enableMetrics()
+        self.addCleanup(metrics.disableMetrics)
+
+    def _sync(self, data: bytes) -> str | None:
+        localPath = os.path.join(self.directory.name, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        self.recorder.reset()
+        sender, receiver = socket.socketpair()
+        result = {}
+        sendThread = threading.Thread(
+            target=lambda: result.setdefault("status", sendSyncFile(sender, localPath, "remote/file", self.aesKey))
+        )
+        sendThread.start()
+        receivedPath = recvSyncFile(receiver, os.path.join(self.directory.name, "out"), self.aesKey)
+        sendThread.join()
+        sender.close()
+        receiver.close()
+
+        self.assertTrue(result["status"])
+        with open(receivedPath, "rb") as receivedFile:
+            self.assertEqual(receivedFile.read(), data)
+        return receivedPath
+
+    def _bytes(self, kind: str) -> int:
+        return self.recorder.counter("sync_bytes_total", (("kind", kind),))
+
+    def testRollChecksum(self):
+        data = os.urandom(SYNC_BLOCK_SIZE + 50)
+        checksum = zlib.adler32(data[:SYNC_BLOCK_SIZE])
+        for i in range(50):
+            checksum = rollChecksum(checksum, data[i], data[i + SYNC_BLOCK_SIZE], SYNC_BLOCK_SIZE)
+            self.assertEqual(checksum, zlib.adler32(data[i + 1:i + 1 + SYNC_BLOCK_SIZE]))
+
+    def testRollingSearch(self):
+        basis = os.urandom(SYNC_BLOCK_SIZE * 4)
+        index = {}
+        for blockIndex in range(4):
+            block = basis[blockIndex * SYNC_BLOCK_SIZE:(blockIndex + 1) * SYNC_BLOCK_SIZE]
+            index.setdefault(zlib.adler32(block), []).append((blockIndex, hashBytes(block)))
+
+        for shift in (1, 7, SYNC_BLOCK_SIZE - 1):
+            shifted = os.urandom(shift) + basis
+            self.assertEqual(_rollingSearch(shifted, 0, len(shifted), index), (shift, 0))
+
+        self.assertIsNone(_rollingSearch(basis, 0, len(basis), {}))
+
+    def testDeltaInstructions(self):
+        basis = os.urandom(SYNC_BLOCK_SIZE * 8 + 100)
+        entries = [(zlib.adler32(basis[i:i + SYNC_BLOCK_SIZE]), hashBytes(basis[i:i + SYNC_BLOCK_SIZE])) for i in range(0, len(basis), SYNC_BLOCK_SIZE)]
+
+        self.assertEqual(list(deltaInstructions(basis, len(basis), 0, entries)), [("copy", 0, 0, len(basis))])
+        self.assertEqual(list(deltaInstructions(basis, len(basis), 0, [])), [("data", 0, len(basis))])
+
+        inserted = basis[:1000] + b"inserted" + basis[1000:]
+        instructions = list(deltaInstructions(inserted, len(inserted), 0, entries))
+        literal = sum(instruction[2] - instruction[1] for instruction in instructions if instruction[0] == "data")
+        self.assertLessEqual(literal, SYNC_BLOCK_SIZE + 8)
+        self.assertEqual(instructions[-1], ("copy", SYNC_BLOCK_SIZE + 8, SYNC_BLOCK_SIZE, len(basis) - SYNC_BLOCK_SIZE))
+
+    def testDeltaSync(self):
+        data = bytes(randomBytes(SYNC_BLOCK_SIZE * 20 + 123))
+        receivedPath = self._sync(data)
+        self.assertEqual(self._bytes("literal"), len(data))
+        self.assertFalse(os.path.exists(receivedPath + SYNC_PARTIAL_SUFFIX))
+
+        changed = bytearray(data)
+        changed[SYNC_BLOCK_SIZE * 5 + 7] ^= 0xFF
+        changed[-10:] = b"0123456789"
+        self._sync(bytes(changed))
+        self.assertEqual(self._bytes("literal"), SYNC_BLOCK_SIZE + 123)
+        self.assertEqual(self._bytes("copied"), len(data) - SYNC_BLOCK_SIZE - 123)
+
+        self._sync(b"")
+        self._sync(b"short")
+
+    def testResume(self):
+        data = bytes(randomBytes(SYNC_BLOCK_SIZE * 6 + 10))
+        targetPath = os.path.join(self.directory.name, "out", "remote", "file")
+        os.makedirs(os.path.dirname(targetPath))
+
+        # A broken transfer leaves a partial file with an unaligned tail.
+        with open(targetPath + SYNC_PARTIAL_SUFFIX, "wb") as partialFile:
+            partialFile.write(data[:SYNC_BLOCK_SIZE * 4 + 500])
+        self._sync(data)
+        self.assertEqual(self._bytes("resumed"), SYNC_BLOCK_SIZE * 4)
+        self.assertEqual(self._bytes("literal"), SYNC_BLOCK_SIZE * 2 + 10)
+
+        # A partial file from some other content is discarded.
+        with open(targetPath + SYNC_PARTIAL_SUFFIX, "wb") as partialFile:
+            partialFile.write(os.urandom(SYNC_BLOCK_SIZE * 2))
+        os.remove(targetPath)
+        self._sync(data)
+        self.assertEqual(self._bytes("resumed"), 0)
+        self.assertEqual(self._bytes("literal"), len(data))
+
+    def testInterruptedTransfer(self):
+        data = bytes(randomBytes(SYNC_BLOCK_SIZE * 4))
+        localPath = os.path.join(self.directory.name, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        sender, receiver = socket.socketpair()
+        def interruptedSender():
+            with open(localPath, "rb") as localFile:
+                info = struct.pack(FILE_INFO_FORMAT, len(data)) + b"remote/file"
+                sendBuffersTcp(sender, encryptFileFrame(0, info, self.aesKey))
+                recvManifest(sender, self.aesKey)
+                for offset in range(0, SYNC_BLOCK_SIZE * 2, FILE_BLOCK_SIZE):
+                    sendBuffersTcp(sender, encryptFileFrame(offset, data[offset:offset + FILE_BLOCK_SIZE], self.aesKey))
+            sender.close()
+
+        sendThread = threading.Thread(target=interruptedSender)
+        sendThread.start()
+        self.assertIsNone(recvSyncFile(receiver, os.path.join(self.directory.name, "out"), self.aesKey))
+        sendThread.join()
+        receiver.close()
+
+        self._sync(data)
+        self.assertEqual(self._bytes("resumed"), SYNC_BLOCK_SIZE * 2)
+
+    def testSyncFile(self):
+        server = MockHomeLinkServer(directory=os.path.join(self.directory.name, "server"))
+        server.start()
+        self.addCleanup(server.stop)
+        client = HomeLinkClient("host", "service", "127.0.0.1", server.port, self.keyProvider)
+        self.addCleanup(client.destruct)
+        self.assertTrue(client.connect())
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        localPath = os.path.join(self.directory.name, "source")
+        data = os.urandom(SYNC_BLOCK_SIZE * 3)
+        for content in (data, data[:100] + data[101:]):
+            with open(localPath, "wb") as localFile:
+                localFile.write(content)
+            self.recorder.reset()
+            self.assertTrue(client.syncFile("other", "inbox", localPath, "synced"))
+            with open(os.path.join(server.directory, "other", "inbox", "synced"), "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), content)
+
+        self.assertEqual(self._bytes("literal"), SYNC_BLOCK_SIZE - 1)
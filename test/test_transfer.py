@@ -0,0 +1,138 @@
+from homelink_python.compression import BlockCompressor, ZlibCodec
+from homelink_python.security import *
+from homelink_python.transfer import *
+
+from unittest import TestCase
+
+import os
+import socket
+import struct
+import tempfile
+import threading
+
+class TestTransfer(TestCase):
+
+    def setUp(self):
+        self.aesKey = randomBytes(32)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _transfer(self, data: bytes, remotePath: str, sendWorkers: int = None, recvWorkers: int = None, compressor=None):
+        localPath = os.path.join(self.directory.name, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        sender, receiver = socket.socketpair()
+        result = {}
+        sendThread = threading.Thread(
+            target=lambda: result.setdefault(
+                "status", sendFile(sender, localPath, remotePath, self.aesKey, compressor, sendWorkers)
+            )
+        )
+        sendThread.start()
+        receivedPath = recvFile(receiver, os.path.join(self.directory.name, "out"), self.aesKey, True, recvWorkers)
+        sendThread.join()
+        sender.close()
+        receiver.close()
+
+        return result["status"], receivedPath
+
+    def testFileFrame(self):
+        sender, receiver = socket.socketpair()
+        data = randomBytes(1000)
+        self.assertTrue(sendFileFrame(sender, 4096, data, self.aesKey))
+        self.assertEqual(recvFileFrame(receiver, self.aesKey), (4096, data))
+
+        frame = bytearray(b"".join(encryptFileFrame(0, data, self.aesKey)))
+        frame[FILE_FRAME_HEADER_SIZE] ^= 1
+        sender.sendall(frame)
+        self.assertIsNone(recvFileFrame(receiver, self.aesKey))
+        sender.close()
+        receiver.close()
+
+    def testSendFile(self):
+        for size in [0, 1, FILE_BLOCK_SIZE, FILE_BLOCK_SIZE * 40 + 17]:
+            data = bytes(randomBytes(size))
+            status, receivedPath = self._transfer(data, f"nested/dir/file{size}")
+            self.assertTrue(status)
+            self.assertEqual(receivedPath, os.path.join(self.directory.name, "out", "nested", "dir", f"file{size}"))
+            with open(receivedPath, "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data)
+
+    def testParallelCrypto(self):
+        data = bytes(randomBytes(FILE_BLOCK_SIZE * 100 + 5)) + bytes(FILE_BLOCK_SIZE * 60)
+        for sendWorkers, recvWorkers, compressor in [
+            (4, 4, None),
+            (4, 1, None),
+            (1, 3, None),
+            (3, 4, BlockCompressor(ZlibCodec())),
+        ]:
+            status, receivedPath = self._transfer(data, "parallel", sendWorkers, recvWorkers, compressor)
+            self.assertTrue(status)
+            with open(receivedPath, "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data)
+
+    def testParallelCompressionStats(self):
+        data = b"".join(f"request {i} served\n".encode("UTF-8") for i in range(40000))
+        compressor = BlockCompressor(ZlibCodec())
+        status, receivedPath = self._transfer(data, "stats", 4, 1, compressor)
+        self.assertTrue(status)
+        self.assertEqual(compressor.bytesIn, len(data))
+        self.assertEqual(compressor.blocksCompressed, -(-len(data) // FILE_BLOCK_SIZE))
+        self.assertGreater(compressor.ratio(), 2.0)
+        self.assertGreater(compressor.cpuSeconds, 0.0)
+
+    def testParallelRecvRejectsTampering(self):
+        sender, receiver = socket.socketpair()
+        info = struct.pack(FILE_INFO_FORMAT, FILE_BLOCK_SIZE * 40) + b"tampered"
+        frames = [encryptFileFrame(0, info, self.aesKey)]
+        for i in range(40):
+            frames.append(encryptFileFrame(i * FILE_BLOCK_SIZE, bytes(FILE_BLOCK_SIZE), self.aesKey))
+        frames.append(encryptFileFrame(FILE_BLOCK_SIZE * 40, b"", self.aesKey))
+        frames[25][1][0] ^= 1
+
+        def send():
+            try:
+                sender.sendall(b"".join(buffer for frame in frames for buffer in frame))
+            except OSError:
+                pass
+
+        sendThread = threading.Thread(target=send)
+        sendThread.start()
+        self.assertIsNone(recvFile(receiver, self.directory.name, self.aesKey, False, 4))
+        receiver.close()
+        sendThread.join()
+        sender.close()
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def testRejectsPathTraversal(self):
+        status, receivedPath = self._transfer(b"data", "../escaped")
+        self.assertIsNone(receivedPath)
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "escaped")))
+
+    def testPackFiles(self):
+        files = [("big", "big", FILE_PACK_THRESHOLD + 1)] + [(f"small{i}", f"small{i}", 10) for i in range(FILE_PACK_MAX_FILES + 1)]
+        batches = packFiles(files)
+
+        self.assertEqual(batches[0], [("big", "big", FILE_PACK_THRESHOLD + 1)])
+        self.assertEqual([len(batch) for batch in batches[1:]], [FILE_PACK_MAX_FILES, 1])
+
+    def testSmallFileStream(self):
+        localPath = os.path.join(self.directory.name, "small")
+        data = bytes(randomBytes(FILE_BLOCK_SIZE + 100))
+        with open(localPath, "wb") as localFile:
+            localFile.write(data)
+
+        buffers = encryptSmallFile(readSmallFile(localPath), "copy", self.aesKey)
+
+        sender, receiver = socket.socketpair()
+        with sender, receiver:
+            sendThread = threading.Thread(target=lambda: sender.sendall(b"".join(buffers)))
+            sendThread.start()
+            receivedPath = recvFile(receiver, os.path.join(self.directory.name, "out"), self.aesKey)
+            sendThread.join()
+
+        with open(receivedPath, "rb") as receivedFile:
+            self.assertEqual(receivedFile.read(), data)
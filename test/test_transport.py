@@ -0,0 +1,150 @@
+from homelink_python import metrics
+from homelink_python.client import HomeLinkClient
+from homelink_python.metrics import Metrics
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import LoginStatus
+from homelink_python.security import randomBytes
+from homelink_python.transport import *
+
+from support import HomeTestCase
+
+import os
+import socket
+import threading
+import time
+
+class TestTransport(HomeTestCase):
+
+    def _listen(self) -> socket.socket:
+        listenSocket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        listenSocket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        listenSocket.bind(("::", 0))
+        listenSocket.listen(8)
+        self.addCleanup(listenSocket.close)
+        return listenSocket
+
+    def _address(self, port: int) -> tuple:
+        return ("::ffff:127.0.0.1", port)
+
+    def testSocketOptions(self):
+        listenSocket = self._listen()
+        options = TransportOptions(sendBufferSize=1 << 16, keepaliveIdle=5, keepaliveCount=2, ioTimeout=0.5)
+        dataSocket = openConnection(self._address(listenSocket.getsockname()[1]), options)
+        self.assertIsNotNone(dataSocket)
+        self.addCleanup(dataSocket.close)
+
+        self.assertEqual(dataSocket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY), 1)
+        self.assertEqual(dataSocket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE), 1)
+        self.assertGreaterEqual(dataSocket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF), 1 << 16)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            self.assertEqual(dataSocket.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE), 5)
+            self.assertEqual(dataSocket.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT), 2)
+        self.assertEqual(dataSocket.gettimeout(), 0.5)
+
+        dataSocket = openConnection(self._address(listenSocket.getsockname()[1]), TransportOptions(nodelay=False, keepalive=False))
+        self.addCleanup(dataSocket.close)
+        self.assertEqual(dataSocket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY), 0)
+        self.assertEqual(dataSocket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE), 0)
+        self.assertIsNone(dataSocket.gettimeout())
+
+    def testConnectRefused(self):
+        listenSocket = self._listen()
+        port = listenSocket.getsockname()[1]
+        listenSocket.close()
+        self.assertIsNone(openConnection(self._address(port)))
+
+    def testSilentPeerTimesOut(self):
+        listenSocket = self._listen()
+        client = HomeLinkClient(
+            "host", "service", "127.0.0.1", listenSocket.getsockname()[1], self.keyProvider,
+            transportOptions=TransportOptions(ioTimeout=0.02),
+        )
+        self.addCleanup(client.destruct)
+
+        start = time.monotonic()
+        self.assertFalse(client.connect())
+        self.assertLess(time.monotonic() - start, 5)
+
+    def testHeartbeatReconnects(self):
+        recorder = metrics.enableMetrics(Metrics())
+        self.addCleanup(metrics.disableMetrics)
+
+        server = MockHomeLinkServer(services={}, directory=self.home.name)
+        server.start()
+        self.addCleanup(server.stop)
+
+        listener = HomeLinkClient("host", "inbox", "127.0.0.1", server.port, self.keyProvider)
+        self.addCleanup(listener.destruct)
+        self.assertTrue(listener.connect())
+        listener.registerHost()
+        listener.registerService("inbox", "password")
+        listener.registerService("outbox", "password")
+        self.assertEqual(listener.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        received = []
+        event = threading.Event()
+        def callback(context, localPath):
+            received.append(localPath)
+            event.set()
+
+        outputDirectory = os.path.join(self.home.name, "listener")
+        self.assertTrue(listener.readFileAsync(outputDirectory, callback, None))
+        listener.startHeartbeat("password", interval=0.05)
+
+        # Drop both connections underneath the client.
+        syncSocket = listener.syncSocket
+        syncSocket.shutdown(socket.SHUT_RDWR)
+        listener.asyncFileSocket.shutdown(socket.SHUT_RDWR)
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not recorder.counter("listener_restarts_total"):
+            time.sleep(0.02)
+        self.assertIsNot(listener.syncSocket, syncSocket)
+        self.assertGreaterEqual(recorder.counter("reconnects_total", (("outcome", "success"),)), 1)
+        self.assertEqual(recorder.counter("listener_restarts_total"), 1)
+        self.assertTrue(listener.ping())
+
+        writer = HomeLinkClient("host", "outbox", "127.0.0.1", server.port, self.keyProvider)
+        self.addCleanup(writer.destruct)
+        self.assertTrue(writer.connect())
+        self.assertEqual(writer.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+        localPath = os.path.join(self.home.name, "source")
+        with open(localPath, "wb") as localFile:
+            localFile.write(bytes(randomBytes(1000)))
+        self.assertTrue(writer.writeFile("host", "inbox", localPath, "file"))
+        self.assertTrue(event.wait(10))
+        self.assertEqual(received, [os.path.join(outputDirectory, "file")])
+
+        listener.stopHeartbeat()
+        self.assertIsNone(listener.heartbeat)
+
+    def testHeartbeatAfterPipeline(self):
+        recorder = metrics.enableMetrics(Metrics())
+        self.addCleanup(metrics.disableMetrics)
+
+        server = MockHomeLinkServer()
+        server.start()
+        self.addCleanup(server.stop)
+
+        client = HomeLinkClient("host", "service", "127.0.0.1", server.port, self.keyProvider)
+        self.addCleanup(client.destruct)
+        self.assertTrue(client.connect())
+        self.assertEqual(client.login("password"), LoginStatus.LOGIN_SUCCESS)
+        self.assertTrue(client.submitCommand("PING").result(5))
+
+        def pings() -> int:
+            histogram = recorder.histogram("phase_seconds", (("phase", "heartbeat.ping"),))
+            return histogram.count if histogram else 0
+
+        client.startHeartbeat("password", interval=0.02)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and pings() < 3:
+            time.sleep(0.02)
+        self.assertGreaterEqual(pings(), 3)
+
+        self.assertTrue(client.suspend())
+        beats = pings()
+        time.sleep(0.2)
+        self.assertEqual(pings(), beats)
+        self.assertIsNone(client.syncSocket)
@@ -0,0 +1,65 @@
+from homelink_python.client import HomeLinkClient
+from homelink_python.mockserver import MockHomeLinkServer
+from homelink_python.packet import LoginStatus
+from homelink_python.transfer import FILE_PACK_THRESHOLD
+
+from support import HomeTestCase
+
+import os
+import tempfile
+
+class TestWriteFiles(HomeTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.server = MockHomeLinkServer(directory=os.path.join(self.directory.name, "server"))
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        self.client = HomeLinkClient("host", "service", "127.0.0.1", self.server.port, self.keyProvider)
+        self.addCleanup(self.client.destruct)
+        self.assertTrue(self.client.connect())
+        self.assertEqual(self.client.login("password"), LoginStatus.LOGIN_SUCCESS)
+
+    def _makeTree(self) -> dict:
+        tree = {f"dir{i % 5}/file{i}": os.urandom(i * 37) for i in range(150)}
+        tree["large/blob"] = os.urandom(FILE_PACK_THRESHOLD * 3 + 5)
+        tree["empty"] = b""
+
+        for relativePath, data in tree.items():
+            localPath = os.path.join(self.directory.name, "source", relativePath)
+            os.makedirs(os.path.dirname(localPath), exist_ok=True)
+            with open(localPath, "wb") as localFile:
+                localFile.write(data)
+
+        return tree
+
+    def _assertReceived(self, tree: dict, remoteDirectory: str):
+        for relativePath, data in tree.items():
+            with open(os.path.join(self.server.directory, "other", "inbox", remoteDirectory, relativePath), "rb") as receivedFile:
+                self.assertEqual(receivedFile.read(), data, relativePath)
+
+    def testWriteDirectory(self):
+        tree = self._makeTree()
+        updates = []
+        status = self.client.writeDirectory(
+            "other", "inbox", os.path.join(self.directory.name, "source"), "backup", connections=3,
+            progress=lambda *update: updates.append(update),
+        )
+
+        self.assertTrue(status)
+        self._assertReceived(tree, "backup")
+        totalBytes = sum(len(data) for data in tree.values())
+        self.assertEqual(updates[-1], (len(tree), len(tree), totalBytes, totalBytes))
+        self.assertEqual([update[0] for update in updates], sorted(update[0] for update in updates))
+        self.assertTrue(self.client.ping())
+
+    def testSingleConnection(self):
+        tree = self._makeTree()
+        files = [(os.path.join(self.directory.name, "source", relativePath), relativePath) for relativePath in tree]
+        self.assertTrue(self.client.writeFiles("other", "inbox", files, connections=1))
+        self._assertReceived(tree, "")
+
+    def testMissingFile(self):
+        self.assertFalse(self.client.writeFiles("other", "inbox", [(os.path.join(self.directory.name, "missing"), "x")]))